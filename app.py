@@ -1,22 +1,83 @@
 import os
-from flask import Flask, request, abort, jsonify
+import json
+import math
+import random
+import hashlib
+import click
+from urllib.parse import urlencode
+from datetime import datetime, timezone
+from functools import wraps
+from flask import Flask, request, abort, jsonify, Response, \
+    stream_with_context, make_response, g
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import true
 from flask_migrate import Migrate
 from flask_cors import CORS
-from auth.auth import AuthError, requires_auth
-from database.database import db_drop_and_create_all, setup_db
+from auth.auth import AuthError, requires_auth, token_cache
+from database.database import db, db_drop_and_create_all, setup_db
+from database.pagination import keyset_page, sorted_keyset_page, \
+    encode_cursor, decode_cursor
+from database.filters import parse_filters, parse_sort
+from database.expand import parse_expand, expand_models, \
+    expanded_card_query, expanded_card_from_row
+from database.cache import MemoryBackend, catalog_cache
+from database.catalog_version import CatalogVersion
+from database.bulk import validate_items, check_references, check_unique, \
+    bulk_insert, bulk_where, bulk_update, bulk_delete, to_integer
 from database.character import Character
-from database.card import Card
+from database.card import Card, STAT_FIELDS
 from database.skill import Skill
+from database.banner import Banner, BannerRate
+from database.inventory import Inventory, record_pull
+from database.pool import pool_metrics
+from database.routing import replica_router
+from metrics.registry import registry
+from metrics.instrument import init_app as init_metrics
+from metrics.queries import query_budget
+from database.search import SEARCH_TABLES, NgramIndex, normalize, sql_search
+from gacha.pool import Pool, card_weights
+from gacha.montecarlo import run_simulations, summarize
 
 
 app = Flask(__name__)
 
+# Page sizes for the list endpoints
+DEFAULT_PAGE_SIZE = int(os.environ.get('DEFAULT_PAGE_SIZE', 100))
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', 500))
+# Maximum number of cards of GET /cards/top
+TOP_MAX_N = int(os.environ.get('TOP_MAX_N', 100))
+# Maximum number of items of a bulk create
+BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', 10000))
+# Maximum number of cards of a single pull
+MAX_PULL_COUNT = int(os.environ.get('MAX_PULL_COUNT', 100))
+# Pull pools of recently pulled banners, built once per process and
+# catalog version
+pull_pools = MemoryBackend(
+    max_entries=int(os.environ.get('PULL_POOL_CACHE_SIZE', 100)))
+PULL_POOL_TTL = 3600
+# Simulations of a banner analysis, and the processes running them. The
+# memory of an analysis is bounded by the NumPy batch sizes of
+# gacha.montecarlo, its time grows with sims times the cycles of the
+# target, about 0.7s for 200000 sims of a card holding 0.5% of its rarity
+ANALYSIS_MAX_SIMS = int(os.environ.get('ANALYSIS_MAX_SIMS', 200000))
+ANALYSIS_PROCESSES = int(os.environ.get('ANALYSIS_PROCESSES', 1))
+# Random number generator of the pulls, set PULL_SEED for reproducible
+# pulls in tests
+pull_rng = random.Random(os.environ.get('PULL_SEED'))
+# Search results, and the in-process search index used on databases
+# other than PostgreSQL, rebuilt after writes to the searched tables
+SEARCH_MAX_RESULTS = int(os.environ.get('SEARCH_MAX_RESULTS', 100))
+search_indexes = MemoryBackend(max_entries=1)
+SEARCH_INDEX_TTL = 3600
+# Rows fetched per round trip by the streaming exports
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+
 
 def create_app(test_config=None):
     # create and configure the app
     setup_db(app)
     CORS(app)
+    init_metrics(app)
 
     return app
 
@@ -31,6 +92,421 @@ if __name__ == '__main__':
     APP.run(host='0.0.0.0', port=8080, debug=True)
 
 
+# Connection pool gauges of GET /metrics
+registry.gauge('db_pool_checked_out', 'Connections checked out.',
+               lambda: pool_metrics.stats(db.engine.pool).get(
+                   'checked_out', 0))
+registry.gauge('db_pool_timeouts', 'Checkouts that timed out.',
+               lambda: pool_metrics.stats()['timeouts'])
+registry.gauge('db_pool_wait_seconds',
+               'Total time spent waiting for a connection.',
+               lambda: pool_metrics.stats()['wait_seconds_total'])
+
+# ----------------------------------------------------------------------------#
+# Helpers
+# ----------------------------------------------------------------------------#
+
+def current_version(*models):
+    """Returns CatalogVersion.current(*models), read at most once per
+        request.
+    """
+    versions = g.setdefault('catalog_versions', {})
+    if models not in versions:
+        versions[models] = CatalogVersion.current(*models)
+    return versions[models]
+
+
+def conditional(*models, expandable=False):
+    """Returns the decorator which adds ETag and Last-Modified validators
+        to a GET endpoint reading the tables of models.
+
+    The strong ETag is derived from the request path and query string and
+    the CatalogVersion of the tables, so it is computed with a primary key
+    lookup instead of running the endpoint. A request whose If-None-Match
+    matches the ETag (or, without If-None-Match, whose If-Modified-Since is
+    not older than the last write) gets a 304 with no body and no database
+    access.
+
+    Args:
+        models: the names of the tables the endpoint reads.
+        expandable: whether the endpoint also reads the tables named by
+            its ?expand= parameter.
+    """
+    def conditional_decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            tables = models + expand_models(get_expand()) if expandable \
+                else models
+            version, modified = current_version(*tables)
+
+            etag = hashlib.sha1('{} {}'.format(
+                request.full_path, version).encode('utf-8')).hexdigest()
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            else:
+                since = request.if_modified_since
+                if since is not None and since.tzinfo is None:
+                    since = since.replace(tzinfo=timezone.utc)
+                not_modified = modified is not None and since is not None \
+                    and modified <= since.timestamp()
+
+            if not_modified:
+                response = Response(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            if modified is not None:
+                response.last_modified = datetime.fromtimestamp(
+                    modified, timezone.utc)
+            return response
+        return wrapper
+    return conditional_decorator
+
+
+def get_expand():
+    """Parses the ?expand=character,skill query parameter of the card
+        endpoints, aborting with 422 for columns that cannot be expanded.
+    """
+    try:
+        return parse_expand(request.args.get('expand'))
+    except ValueError:
+        abort(422)
+
+
+def get_number_arg(name, default=None, type=int):
+    """Returns the query parameter name converted with type.
+
+    Unlike request.args.get(name, default, type=type), which falls back to
+    the default, a parameter that does not convert aborts with 422.
+
+    Args:
+        name: the name of the query parameter.
+        default: the value returned when the parameter is absent.
+        type: int or float.
+    """
+    value = request.args.get(name, None)
+    if value is None:
+        return default
+    try:
+        return type(value)
+    except (TypeError, ValueError):
+        abort(422)
+
+
+def get_page_args(cursor=int):
+    """Parses the keyset pagination query parameters ?after=<id>&limit=N.
+
+    The limit defaults to DEFAULT_PAGE_SIZE and is capped at MAX_PAGE_SIZE,
+    a limit that is not a positive integer aborts with 422. A cursor that
+    does not parse aborts with 400 rather than restarting from the first
+    page.
+
+    Args:
+        cursor: the function parsing the after parameter, int for pages
+            ordered by id.
+
+    Returns:
+        A tuple (after, limit) where after is None for the first page.
+    """
+    after = request.args.get('after', None)
+    if after is not None:
+        try:
+            after = cursor(after)
+        except (TypeError, ValueError):
+            abort(400)
+    limit = get_number_arg('limit', DEFAULT_PAGE_SIZE)
+    if limit < 1:
+        abort(422)
+    return after, min(limit, MAX_PAGE_SIZE)
+
+
+def get_card_stats(body):
+    """Returns the stats of a card request body as integers.
+
+    The total_stats and score of a card are computed in Python from its
+    stats, so integer strings such as "41" are converted here rather than
+    by the database, with the rule of the bulk endpoints. Raises
+    ValueError or TypeError on other values, booleans and floats included,
+    which the routes turn into a 422.
+
+    Args:
+        body: the json request body (dict).
+
+    Returns:
+        A dict mapping each stat of the body that is not null to its
+        integer value.
+    """
+    return {field: to_integer(body[field]) for field in STAT_FIELDS
+            if body.get(field) is not None}
+
+
+def invalid_items(errors):
+    """Returns the 422 response listing the errors of invalid items."""
+    return jsonify({
+        'success': False,
+        'error': 422,
+        'message': 'Unprocessable',
+        'errors': errors
+    }), 422
+
+
+def bulk_create(model, key, fields, check=None):
+    """Creates the rows of a JSON array request body in one transaction.
+
+    Every item is validated before anything is written. If any item is
+    invalid nothing is inserted and the response lists the errors of each
+    invalid item by index, otherwise all rows are inserted with batched
+    multi-row INSERT statements.
+
+    Args:
+        model: the model class of the rows.
+        key: the json key of the list of created rows (string).
+        fields: the accepted fields of each item, in representation order.
+        check: optional function(rows, errors) appending batch-level errors
+            (references, uniqueness).
+
+    Returns:
+        A status code 200 and json {"success": True, key: rows, "created":
+        n} where rows are the created rows in the order of the request, or
+        a status code 422 and json {"success": False, "errors": errors}.
+    """
+    body = request.get_json(silent=True)
+    if not isinstance(body, list) or not body or len(body) > BULK_MAX_ITEMS:
+        abort(422)
+
+    rows, errors = validate_items(model, body, fields)
+    if check is not None and not errors:
+        check(rows, errors)
+    if errors:
+        return invalid_items(errors)
+
+    try:
+        ids = bulk_insert(model, rows)
+    except Exception as e:
+        abort(422)
+
+    return jsonify({
+        'success': True,
+        key: [dict(id=row_id, **row) for row_id, row in zip(ids, rows)],
+        'created': len(ids)
+    }), 200
+
+
+def get_bulk_where(model, filter_fields):
+    """Returns the WHERE clause of a bulk update or delete.
+
+    Rows are selected with query parameters: `ids`, a comma separated list
+    of ids, and/or one parameter per filter field, e.g. ?rarity=SSR&
+    character=5. Aborts with 422 on unknown or invalid parameters and when
+    no selector is given, so a bare request never matches a whole table.
+
+    Args:
+        model: the model class of the rows.
+        filter_fields: the columns that can be filtered on.
+    """
+    args = request.args.to_dict()
+    ids = args.pop('ids', None)
+    try:
+        ids = [int(i) for i in ids.split(',')] if ids else None
+    except ValueError:
+        abort(422)
+    filters, errors = validate_items(model, [args], filter_fields, True)
+    if errors:
+        abort(422)
+    where = bulk_where(model, ids, filters[0])
+    if where is None:
+        abort(422)
+    return where
+
+
+def bulk_change(model, filter_fields, fields, check=None):
+    """Applies the values of the json request body to the selected rows.
+
+    Args:
+        model: the model class of the rows.
+        filter_fields: the columns that can be filtered on.
+        fields: the columns that can be updated.
+        check: optional function(rows, errors) appending errors for the
+            values (references).
+
+    Returns:
+        A status code 200 and json {"success": True, "updated": n} or a
+        status code 422 and json {"success": False, "errors": errors}.
+    """
+    where = get_bulk_where(model, filter_fields)
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict) or not body:
+        abort(422)
+
+    values, errors = validate_items(model, [body], fields, True)
+    if check is not None and not errors:
+        check(values, errors)
+    if errors:
+        return invalid_items(errors)
+
+    try:
+        count = bulk_update(model, where, values[0])
+    except Exception as e:
+        abort(422)
+
+    return jsonify({
+        'success': True,
+        'updated': count
+    }), 200
+
+
+def bulk_remove(model, filter_fields):
+    """Deletes the selected rows and the cards referencing them.
+
+    Returns:
+        A status code 200 and json {"success": True, "deleted": counts}
+        where counts maps each table name to its number of deleted rows.
+    """
+    where = get_bulk_where(model, filter_fields)
+    try:
+        counts = bulk_delete(model, where)
+    except Exception as e:
+        abort(422)
+
+    return jsonify({
+        'success': True,
+        'deleted': counts
+    }), 200
+
+
+def load_page(query, column, serialize, after, limit, sort=None,
+              descending=False):
+    """Loads one keyset page of query.
+
+    Pages are ordered by column unless a sort column is given, in which
+    case they are ordered by sort and then column, with "<value>:<id>"
+    cursors.
+
+    Returns:
+        A dict {"rows": rows, "next_cursor": cursor} where rows are the
+        serialized rows of the page.
+    """
+    if sort is None:
+        selection, next_cursor = keyset_page(query, column, after, limit)
+    else:
+        selection, next_cursor = sorted_keyset_page(
+            query, sort, column, descending, after, limit)
+        next_cursor = encode_cursor(next_cursor)
+    return {
+        'rows': [serialize(row) for row in selection],
+        'next_cursor': next_cursor
+    }
+
+
+def load_character(character_id):
+    """Returns the character.profile() of character_id or None."""
+    row = Character.profile_query().filter(
+        Character.id == character_id).one_or_none()
+    return Character.profile_from_row(row) if row is not None else None
+
+
+def load_card(card_id, expand=()):
+    """Returns the card.info() of card_id, with the expand columns
+        embedded, or None.
+    """
+    row = expanded_card_query(expand).filter(
+        Card.id == card_id).one_or_none()
+    return expanded_card_from_row(row, expand) if row is not None else None
+
+
+def load_skill(skill_id):
+    """Returns the skill.info() of skill_id or None."""
+    row = Skill.info_query().filter(Skill.id == skill_id).one_or_none()
+    return Skill.info_from_row(row) if row is not None else None
+
+
+def load_pool(banner_id):
+    """Returns the Pool of banner_id or None if there is no such banner.
+
+    Pools are cached per process under the current Banner and Card
+    versions, so the alias table of a banner is only rebuilt after a write
+    to the banners or the cards.
+
+    Raises:
+        ValueError: if a rarity of the banner has no card.
+    """
+    key = '{}:{}'.format(banner_id, current_version('Banner', 'Card')[0])
+    pool = pull_pools.get(key)
+    if pool is None:
+        banner = Banner.query.get(banner_id)
+        if banner is None:
+            return None
+        rates = {rate.rarity: rate.rate for rate in banner.rates}
+        cards = [Card.info_from_row(row) for row in Card.info_query()
+                 .filter(Card.rarity.in_(rates)).order_by(Card.id)]
+        featured = {card.id for card in banner.featured}
+        pool = Pool(cards, card_weights(
+            rates, banner.featured_rate, cards, featured))
+        pull_pools.set(key, pool, PULL_POOL_TTL)
+    return pool
+
+
+def load_search(q, limit):
+    """Returns the ranked search results of the normalized q.
+
+    PostgreSQL runs the search through the trigram indexes of the searched
+    columns, other databases through an NgramIndex built once per process
+    and catalog version.
+    """
+    if db.engine.dialect.name == 'postgresql':
+        return sql_search(q, limit)
+    key = current_version(*SEARCH_TABLES)[0]
+    index = search_indexes.get(key)
+    if index is None:
+        index = NgramIndex.build(SEARCH_MAX_RESULTS)
+        search_indexes.set(key, index, SEARCH_INDEX_TTL)
+    return index.search(q, limit)
+
+
+def stream_export(key, query, serialize):
+    """Streams every row of query as JSON while the rows are fetched.
+
+    Rows are read through a server-side cursor in batches of
+    EXPORT_BATCH_SIZE and written out one by one, so memory use does not
+    grow with the size of the table. With ?format=ndjson each row is
+    written as one line of newline delimited JSON, otherwise the rows are
+    written as the json {"success": True, key: [...]} of the list
+    endpoints.
+
+    Args:
+        key: the json key of the list of rows (string).
+        query: the query of the rows to export.
+        serialize: a function returning the dict representation of a row.
+
+    Returns:
+        A streaming response.
+    """
+    export_format = request.args.get('format', 'json')
+    if export_format not in ('json', 'ndjson'):
+        abort(422)
+    rows = query.yield_per(EXPORT_BATCH_SIZE)
+
+    def generate_ndjson():
+        for row in rows:
+            yield json.dumps(serialize(row)) + '\n'
+
+    def generate_json():
+        yield '{"success": true, "%s": [' % key
+        separator = ''
+        for row in rows:
+            yield separator + json.dumps(serialize(row))
+            separator = ','
+        yield ']}'
+
+    if export_format == 'ndjson':
+        return Response(stream_with_context(generate_ndjson()),
+                        mimetype='application/x-ndjson')
+    return Response(stream_with_context(generate_json()),
+                    mimetype='application/json')
+
+
 # ----------------------------------------------------------------------------#
 # Routes
 # ----------------------------------------------------------------------------#
@@ -38,29 +514,41 @@ if __name__ == '__main__':
 # Characters
 # ----------------------------------------------------------------------------#
 @app.route('/characters', methods=['GET'])
+@query_budget(2)
 @requires_auth('get:characters')
+@conditional('Character')
 def get_characters(jwt):
     """GET /characters
 
-    An endpoint that retrieves the list of characters. Requires the
-    'get:characters' permission.
+    An endpoint that retrieves one page of the list of characters, ordered by
+    id. Requires the 'get:characters' permission.
+
+    Query parameters:
+        after: the next_cursor of the previous page (optional).
+        limit: the page size, at most MAX_PAGE_SIZE (optional).
 
     Args:
         jwt: a json web token (string).
 
     Returns:
         A status code 200 and json {"success": True, "characters":
-        characters} where characters is the list of characters in the
-        characters.profile() representation or appropriate status code
-        indicating reason for failure.
+        characters, "next_cursor": cursor} where characters is the list of
+        characters in the characters.profile() representation and cursor is the
+        value of after for the next page (null on the last page) or
+        appropriate status code indicating reason for failure.
     """
+    after, limit = get_page_args()
     try:
-        selection = Character.query.order_by(Character.id).all()
-        characters = [character.profile() for character in selection]
+        page = catalog_cache.get_or_load_page(
+            'Character', current_version('Character')[0],
+            'after={}&limit={}'.format(after, limit),
+            lambda: load_page(Character.profile_query(), Character.id,
+                              Character.profile_from_row, after, limit))
 
         response = jsonify({
             'success': True,
-            'character': characters
+            'character': page['rows'],
+            'next_cursor': page['next_cursor']
         })
         response.status_code = 200
         return response
@@ -69,12 +557,15 @@ def get_characters(jwt):
 
 
 @app.route('/characters/<int:character_id>', methods=['GET'])
+@query_budget(2)
 @requires_auth('get:character')
+@conditional('Character')
 def get_character(jwt, character_id):
     """GET /characters/<id>
 
     An endpoint that retrieves the character for the corresponding
-    row for <id>. Requires the 'get:character' permission.
+    row for <id>. Requires the 'get:character' permission. Served from the
+    catalog_cache when the character has been read recently.
 
     Args:
         jwt: a json web token (string).
@@ -87,12 +578,15 @@ def get_character(jwt, character_id):
         indicating reason for failure.
     """
     try:
-        character = Character.query.filter(
-            Character.id == character_id).one_or_none()
+        character = catalog_cache.get_or_load(
+            'Character', character_id, current_version('Character')[0],
+            lambda: load_character(character_id))
+        if character is None:
+            abort(404)
 
         response = jsonify({
             'success': True,
-            'character': [character.profile()]
+            'character': [character]
         })
         response.status_code = 200
         return response
@@ -158,6 +652,52 @@ def create_character(jwt):
         abort(422)
 
 
+@app.route('/characters/bulk', methods=['POST'])
+@requires_auth('post:character')
+def create_characters(jwt):
+    """POST /characters/bulk
+
+    An endpoint that creates one row in the characters table for each item
+    of a json array, in a single transaction. Requires the
+    'post:character' permission.
+
+    Args:
+        jwt: a json web token (string).
+
+    Returns:
+        A status code 200 and json {"success": True, "character":
+        characters, "created": n} where characters are the created
+        characters in the character.profile() representation, in the order
+        of the request, or a status code 422 and json {"success": False,
+        "errors": errors} listing the errors of each invalid item.
+    """
+    return bulk_create(
+        Character, 'character', Character.profile_fields[1:],
+        lambda rows, errors: check_unique(rows, 'name', Character, errors))
+
+
+@app.route('/characters/bulk', methods=['PATCH'])
+@requires_auth('patch:character')
+def update_characters(jwt):
+    """PATCH /characters/bulk
+
+    An endpoint that updates every row of the characters table selected by
+    the `ids` and/or `class_type` query parameters with a single UPDATE
+    statement. Names are unique and cannot be updated in bulk. Requires the
+    'patch:character' permission.
+
+    Args:
+        jwt: a json web token (string).
+
+    Returns:
+        A status code 200 and json {"success": True, "updated": n} where n
+        is the number of updated characters or appropriate status code
+        indicating reason for failure.
+    """
+    return bulk_change(
+        Character, ('class_type',), Character.profile_fields[2:])
+
+
 @app.route('/characters/<int:character_id>', methods=['PATCH'])
 @requires_auth('patch:character')
 def update_character(jwt, character_id):
@@ -229,6 +769,27 @@ def update_character(jwt, character_id):
         abort(422)
 
 
+@app.route('/characters/bulk', methods=['DELETE'])
+@requires_auth('delete:character')
+def delete_characters(jwt):
+    """DELETE /characters/bulk
+
+    An endpoint that deletes every row of the characters table selected by
+    the `ids` and/or `class_type` query parameters, and their cards, with
+    one DELETE statement per table. Requires the 'delete:character'
+    permission.
+
+    Args:
+        jwt: a json web token (string).
+
+    Returns:
+        A status code 200 and json {"success": True, "deleted": counts}
+        where counts maps "Character" and "Card" to their number of deleted
+        rows or appropriate status code indicating reason for failure.
+    """
+    return bulk_remove(Character, ('class_type',))
+
+
 @app.route('/characters/<int:character_id>', methods=['DELETE'])
 @requires_auth('delete:character')
 def delete_character(jwt, character_id):
@@ -268,29 +829,73 @@ def delete_character(jwt, character_id):
 # Cards
 # ----------------------------------------------------------------------------#
 @app.route('/cards', methods=['GET'])
+@query_budget(2)
 @requires_auth('get:cards')
+@conditional('Card', expandable=True)
 def get_cards(jwt):
     """GET /cards
 
-    An endpoint that retrieves the list of cards. Requires the
-    'get:cards' permission.
+    An endpoint that retrieves one page of the list of cards, filtered and
+    sorted in SQL. Requires the 'get:cards' permission.
+
+    Query parameters:
+        rarity, character, skill: only cards with this value, or one of a
+            comma separated list of values (optional).
+        stat_1_min, stat_1_max, ... stat_4_max: only cards whose stat is
+            at least / at most the value (optional).
+        sort: <field>[:asc|:desc] with field one of Card.sort_fields,
+            ordered by id by default (optional).
+        expand: character and/or skill, comma separated, to embed the
+            related rows in each card (optional).
+        after: the next_cursor of the previous page (optional).
+        limit: the page size, at most MAX_PAGE_SIZE (optional).
 
     Args:
         jwt: a json web token (string).
 
     Returns:
         A status code 200 and json {"success": True, "cards":
-        cards} where cards is the list of cards in the
-        cards.info() representation or appropriate status code
-        indicating reason for failure.
+        cards, "next_cursor": cursor} where cards is the list of
+        cards in the cards.info() representation and cursor is the
+        value of after for the next page (null on the last page) or
+        appropriate status code indicating reason for failure.
     """
     try:
-        selection = Card.query.order_by(Card.id).all()
-        cards = [card.info() for card in selection]
+        clauses, params = parse_filters(
+            Card, request.args, Card.filter_fields, Card.range_fields)
+        sort, descending = parse_sort(
+            Card, request.args.get('sort'), Card.sort_fields)
+    except ValueError:
+        abort(422)
+    if sort is Card.id and not descending:
+        sort = None
+    if sort is None:
+        after, limit = get_page_args()
+    else:
+        after, limit = get_page_args(lambda v: decode_cursor(v, sort))
+        params.append(('sort', request.args['sort']))
+    expand = get_expand()
+    if expand:
+        params.append(('expand', ','.join(expand)))
+
+    query = expanded_card_query(expand).filter(*clauses)
+    if sort is not None and sort.key not in Card.info_fields:
+        # select the sort column, the next cursor is read from the last row
+        query = query.add_columns(sort)
+
+    try:
+        page = catalog_cache.get_or_load_page(
+            'Card', current_version('Card', *expand_models(expand))[0],
+            urlencode([('after', after), ('limit', limit)] + params),
+            lambda: load_page(
+                query, Card.id,
+                lambda row: expanded_card_from_row(row, expand), after,
+                limit, sort, descending))
 
         response = jsonify({
             'success': True,
-            'card': cards
+            'card': page['rows'],
+            'next_cursor': page['next_cursor']
         })
         response.status_code = 200
         return response
@@ -298,13 +903,105 @@ def get_cards(jwt):
         abort(404)
 
 
+@app.route('/cards/export', methods=['GET'])
+@requires_auth('get:cards')
+@conditional('Card', expandable=True)
+def export_cards(jwt):
+    """GET /cards/export
+
+    An endpoint that streams the full list of cards, ordered by id.
+    Requires the 'get:cards' permission.
+
+    Query parameters:
+        format: 'json' (default) or 'ndjson' (optional).
+        expand: character and/or skill, comma separated, to embed the
+            related rows in each card (optional).
+
+    Args:
+        jwt: a json web token (string).
+
+    Returns:
+        A status code 200 and a streamed json {"success": True, "card":
+        cards} where cards is the list of all cards in the card.info()
+        representation, or one card.info() json object per line for
+        ndjson, or appropriate status code indicating reason for failure.
+    """
+    expand = get_expand()
+    return stream_export(
+        'card', expanded_card_query(expand).order_by(Card.id),
+        lambda row: expanded_card_from_row(row, expand))
+
+
+@app.route('/cards/top', methods=['GET'])
+@query_budget(2)
+@requires_auth('get:cards')
+@conditional('Card')
+def get_top_cards(jwt):
+    """GET /cards/top
+
+    An endpoint that retrieves the highest scoring cards, read from the
+    stored score through the (score, id) or (rarity, score, id) index and
+    cached per catalog version, so its cost does not grow with the number
+    of cards. Requires the 'get:cards' permission.
+
+    Query parameters:
+        n: the number of cards, at most TOP_MAX_N (optional, 50).
+        rarity: only cards of this rarity (optional).
+
+    Args:
+        jwt: a json web token (string).
+
+    Returns:
+        A status code 200 and json {"success": True, "card": cards} where
+        cards are the card.info() representations of the top n cards,
+        with their total_stats and score, ordered by descending score,
+        or appropriate status code indicating reason for failure.
+    """
+    try:
+        n = int(request.args.get('n', 50))
+    except ValueError:
+        abort(422)
+    if not 0 < n <= TOP_MAX_N:
+        abort(422)
+    rarity = request.args.get('rarity')
+    params = [('n', n)] + ([('rarity', rarity)] if rarity else [])
+
+    def load_top():
+        query = Card.info_query().add_columns(
+            *[getattr(Card, field) for field in Card.rank_fields])
+        if rarity:
+            query = query.filter(Card.rarity == rarity)
+        rows = query.order_by(Card.score.desc(), Card.id.desc()).limit(n)
+        return [dict(zip(Card.info_fields + Card.rank_fields, row))
+                for row in rows]
+
+    try:
+        cards = catalog_cache.get_or_load_page(
+            'Card', current_version('Card')[0],
+            urlencode([('top', 1)] + params), load_top)
+    except Exception as e:
+        abort(422)
+
+    return jsonify({
+        'success': True,
+        'card': cards
+    }), 200
+
+
 @app.route('/cards/<int:card_id>', methods=['GET'])
+@query_budget(2)
 @requires_auth('get:card')
+@conditional('Card', expandable=True)
 def get_card(jwt, card_id):
     """GET /cards/<id>
 
     An endpoint that retrieves the card for the corresponding
-    row for <id>. Requires the 'get:card' permission.
+    row for <id>. Requires the 'get:card' permission. Served from the
+    catalog_cache when the card has been read recently.
+
+    Query parameters:
+        expand: character and/or skill, comma separated, to embed the
+            related rows in the card (optional).
 
     Args:
         jwt: a json web token (string).
@@ -316,13 +1013,24 @@ def get_card(jwt, card_id):
         card.info() representation or appropriate status code
         indicating reason for failure.
     """
+    expand = get_expand()
     try:
-        card = Card.query.filter(
-            Card.id == card_id).one_or_none()
+        if expand:
+            # keyed by the versions of the expanded tables as well
+            card = catalog_cache.get_or_load_page(
+                'Card', current_version('Card', *expand_models(expand))[0],
+                'id={}&expand={}'.format(card_id, ','.join(expand)),
+                lambda: load_card(card_id, expand))
+        else:
+            card = catalog_cache.get_or_load(
+                'Card', card_id, current_version('Card')[0],
+                lambda: load_card(card_id))
+        if card is None:
+            abort(404)
 
         response = jsonify({
             'success': True,
-            'card': [card.info()]
+            'card': [card]
         })
         response.status_code = 200
         return response
@@ -354,20 +1062,14 @@ def create_card(jwt):
         character = body.get('character', None)
         skill = body.get('skill', None)
         rarity = body.get('rarity', None)
-        stat_1 = body.get('stat_1', None)
-        stat_2 = body.get('stat_2', None)
-        stat_3 = body.get('stat_3', None)
-        stat_4 = body.get('stat_4', None)
+        stats = get_card_stats(body)
 
         card = Card(
             name=name,
             character=character,
             skill=skill,
             rarity=rarity,
-            stat_1=stat_1,
-            stat_2=stat_2,
-            stat_3=stat_3,
-            stat_4=stat_4
+            **stats
         )
         card.insert()
 
@@ -382,6 +1084,56 @@ def create_card(jwt):
         abort(422)
 
 
+@app.route('/cards/bulk', methods=['POST'])
+@requires_auth('post:card')
+def create_cards(jwt):
+    """POST /cards/bulk
+
+    An endpoint that creates one row in the cards table for each item of a
+    json array, in a single transaction. Requires the 'post:card'
+    permission.
+
+    Args:
+        jwt: a json web token (string).
+
+    Returns:
+        A status code 200 and json {"success": True, "card": cards,
+        "created": n} where cards are the created cards in the card.info()
+        representation, in the order of the request, or a status code 422
+        and json {"success": False, "errors": errors} listing the errors of
+        each invalid item.
+    """
+    def check(rows, errors):
+        check_references(rows, 'character', Character, errors)
+        check_references(rows, 'skill', Skill, errors)
+
+    return bulk_create(Card, 'card', Card.info_fields[1:], check)
+
+
+@app.route('/cards/bulk', methods=['PATCH'])
+@requires_auth('patch:card')
+def update_cards(jwt):
+    """PATCH /cards/bulk
+
+    An endpoint that updates every row of the cards table selected by the
+    `ids`, `rarity`, `character` and/or `skill` query parameters with a
+    single UPDATE statement. Requires the 'patch:card' permission.
+
+    Args:
+        jwt: a json web token (string).
+
+    Returns:
+        A status code 200 and json {"success": True, "updated": n} where n
+        is the number of updated cards or appropriate status code
+        indicating reason for failure.
+    """
+    def check(rows, errors):
+        check_references(rows, 'character', Character, errors)
+        check_references(rows, 'skill', Skill, errors)
+
+    return bulk_change(Card, Card.filter_fields, Card.info_fields[1:], check)
+
+
 @app.route('/cards/<int:card_id>', methods=['PATCH'])
 @requires_auth('patch:card')
 def update_card(jwt, card_id):
@@ -412,10 +1164,7 @@ def update_card(jwt, card_id):
         character = body.get('character', None)
         skill = body.get('skill', None)
         rarity = body.get('rarity', None)
-        stat_1 = body.get('stat_1', None)
-        stat_2 = body.get('stat_2', None)
-        stat_3 = body.get('stat_3', None)
-        stat_4 = body.get('stat_4', None)
+        stats = get_card_stats(body)
 
         if name is not None:
             card.name = name
@@ -425,14 +1174,8 @@ def update_card(jwt, card_id):
             card.skill = skill
         if rarity is not None:
             card.rarity = rarity
-        if stat_1 is not None:
-            card.stat_1 = stat_1
-        if stat_2 is not None:
-            card.stat_2 = stat_2
-        if stat_3 is not None:
-            card.stat_3 = stat_3
-        if stat_4 is not None:
-            card.stat_4 = stat_4
+        for field, value in stats.items():
+            setattr(card, field, value)
         card.update()
 
         return jsonify({
@@ -444,6 +1187,26 @@ def update_card(jwt, card_id):
         abort(422)
 
 
+@app.route('/cards/bulk', methods=['DELETE'])
+@requires_auth('delete:card')
+def delete_cards(jwt):
+    """DELETE /cards/bulk
+
+    An endpoint that deletes every row of the cards table selected by the
+    `ids`, `rarity`, `character` and/or `skill` query parameters with a
+    single DELETE statement. Requires the 'delete:card' permission.
+
+    Args:
+        jwt: a json web token (string).
+
+    Returns:
+        A status code 200 and json {"success": True, "deleted": counts}
+        where counts maps "Card" to the number of deleted cards or
+        appropriate status code indicating reason for failure.
+    """
+    return bulk_remove(Card, Card.filter_fields)
+
+
 @app.route('/cards/<int:card_id>', methods=['DELETE'])
 @requires_auth('delete:card')
 def delete_card(jwt, card_id):
@@ -484,29 +1247,41 @@ def delete_card(jwt, card_id):
 # Skills
 # ----------------------------------------------------------------------------#
 @app.route('/skills', methods=['GET'])
+@query_budget(2)
 @requires_auth('get:skills')
+@conditional('Skill')
 def get_skills(jwt):
     """GET /skills
 
-    An endpoint that retrieves the list of skills. Requires the
-    'get:skills' permission.
+    An endpoint that retrieves one page of the list of skills, ordered by
+    id. Requires the 'get:skills' permission.
+
+    Query parameters:
+        after: the next_cursor of the previous page (optional).
+        limit: the page size, at most MAX_PAGE_SIZE (optional).
 
     Args:
         jwt: a json web token (string).
 
     Returns:
         A status code 200 and json {"success": True, "skills":
-        skills} where skills is the list of skills in the
-        skills.info() representation or appropriate status code
-        indicating reason for failure.
+        skills, "next_cursor": cursor} where skills is the list of
+        skills in the skills.info() representation and cursor is the
+        value of after for the next page (null on the last page) or
+        appropriate status code indicating reason for failure.
     """
+    after, limit = get_page_args()
     try:
-        selection = Skill.query.order_by(Skill.id).all()
-        skills = [skill.info() for skill in selection]
+        page = catalog_cache.get_or_load_page(
+            'Skill', current_version('Skill')[0],
+            'after={}&limit={}'.format(after, limit),
+            lambda: load_page(Skill.info_query(), Skill.id,
+                              Skill.info_from_row, after, limit))
 
         response = jsonify({
             'success': True,
-            'skill': skills
+            'skill': page['rows'],
+            'next_cursor': page['next_cursor']
         })
         response.status_code = 200
         return response
@@ -515,12 +1290,15 @@ def get_skills(jwt):
 
 
 @app.route('/skills/<int:skill_id>', methods=['GET'])
+@query_budget(2)
 @requires_auth('get:skill')
+@conditional('Skill')
 def get_skill(jwt, skill_id):
     """GET /skills/<id>
 
     An endpoint that retrieves the skill for the corresponding
-    row for <id>. Requires the 'get:skill' permission.
+    row for <id>. Requires the 'get:skill' permission. Served from the
+    catalog_cache when the skill has been read recently.
 
     Args:
         jwt: a json web token (string).
@@ -533,12 +1311,15 @@ def get_skill(jwt, skill_id):
         indicating reason for failure.
     """
     try:
-        skill = Skill.query.filter(
-            Skill.id == skill_id).one_or_none()
+        skill = catalog_cache.get_or_load(
+            'Skill', skill_id, current_version('Skill')[0],
+            lambda: load_skill(skill_id))
+        if skill is None:
+            abort(404)
 
         response = jsonify({
             'success': True,
-            'skill': [skill.info()]
+            'skill': [skill]
         })
         response.status_code = 200
         return response
@@ -586,6 +1367,48 @@ def create_skill(jwt):
         abort(422)
 
 
+@app.route('/skills/bulk', methods=['POST'])
+@requires_auth('post:skill')
+def create_skills(jwt):
+    """POST /skills/bulk
+
+    An endpoint that creates one row in the skills table for each item of
+    a json array, in a single transaction. Requires the 'post:skill'
+    permission.
+
+    Args:
+        jwt: a json web token (string).
+
+    Returns:
+        A status code 200 and json {"success": True, "skill": skills,
+        "created": n} where skills are the created skills in the
+        skill.info() representation, in the order of the request, or a
+        status code 422 and json {"success": False, "errors": errors}
+        listing the errors of each invalid item.
+    """
+    return bulk_create(Skill, 'skill', Skill.info_fields[1:])
+
+
+@app.route('/skills/bulk', methods=['PATCH'])
+@requires_auth('patch:skill')
+def update_skills(jwt):
+    """PATCH /skills/bulk
+
+    An endpoint that updates every row of the skills table selected by the
+    `ids` query parameter with a single UPDATE statement. Requires the
+    'patch:skill' permission.
+
+    Args:
+        jwt: a json web token (string).
+
+    Returns:
+        A status code 200 and json {"success": True, "updated": n} where n
+        is the number of updated skills or appropriate status code
+        indicating reason for failure.
+    """
+    return bulk_change(Skill, (), Skill.info_fields[1:])
+
+
 @app.route('/skills/<int:skill_id>', methods=['PATCH'])
 @requires_auth('patch:skill')
 def update_skill(jwt, skill_id):
@@ -630,6 +1453,26 @@ def update_skill(jwt, skill_id):
         abort(422)
 
 
+@app.route('/skills/bulk', methods=['DELETE'])
+@requires_auth('delete:skill')
+def delete_skills(jwt):
+    """DELETE /skills/bulk
+
+    An endpoint that deletes every row of the skills table selected by the
+    `ids` query parameter, and their cards, with one DELETE statement per
+    table. Requires the 'delete:skill' permission.
+
+    Args:
+        jwt: a json web token (string).
+
+    Returns:
+        A status code 200 and json {"success": True, "deleted": counts}
+        where counts maps "Skill" and "Card" to their number of deleted
+        rows or appropriate status code indicating reason for failure.
+    """
+    return bulk_remove(Skill, ())
+
+
 @app.route('/skills/<int:skill_id>', methods=['DELETE'])
 @requires_auth('delete:skill')
 def delete_skill(jwt, skill_id):
@@ -666,11 +1509,466 @@ def delete_skill(jwt, skill_id):
     except Exception as e:
         abort(422)
 
+
+# Banners
+# ----------------------------------------------------------------------------#
+@app.route('/banners', methods=['GET'])
+@query_budget(4)
+@requires_auth('get:banners')
+@conditional('Banner', 'Card')
+def get_banners(jwt):
+    """GET /banners
+
+    An endpoint that retrieves the list of banners. Requires the
+    'get:banners' permission.
+
+    Args:
+        jwt: a json web token (string).
+
+    Returns:
+        A status code 200 and json {"success": True, "banner": banners}
+        where banners is the list of banners in the banner.info()
+        representation or appropriate status code indicating reason for
+        failure.
+    """
+    try:
+        banners = Banner.query.order_by(Banner.id).all()
+
+        return jsonify({
+            'success': True,
+            'banner': [banner.info() for banner in banners]
+        }), 200
+
+    except Exception as e:
+        abort(404)
+
+
+@app.route('/banners/<int:banner_id>', methods=['GET'])
+@query_budget(4)
+@requires_auth('get:banner')
+@conditional('Banner', 'Card')
+def get_banner(jwt, banner_id):
+    """GET /banners/<id>
+
+    An endpoint that retrieves the banner for the corresponding row for
+    <id>. Requires the 'get:banner' permission.
+
+    Args:
+        jwt: a json web token (string).
+        banner_id: where <banner_id> is the existing model id (int).
+
+    Returns:
+        A status code 200 and json {"success": True, "banner": banner}
+        where banner is an array containing only the banner in the
+        banner.info() representation or appropriate status code indicating
+        reason for failure.
+    """
+    banner = Banner.query.get(banner_id)
+    if banner is None:
+        abort(404)
+
+    return jsonify({
+        'success': True,
+        'banner': [banner.info()]
+    }), 200
+
+
+@app.route('/banners', methods=['POST'])
+@requires_auth('post:banner')
+def create_banner(jwt):
+    """POST /banners
+
+    An endpoint that creates a new banner from a json body {"name",
+    "rates": {rarity: rate}, "featured": [card ids], "featured_rate"}.
+    Rates are relative weights of the Card.rarity values, featured cards
+    must have one of these rarities. Requires the 'post:banner'
+    permission.
+
+    Args:
+        jwt: a json web token (string).
+
+    Returns:
+        A status code 200 and json {"success": True, "banner": banner}
+        where banner is an array containing only the newly created banner
+        in the banner.info() representation or appropriate status code
+        indicating reason for failure.
+    """
+    try:
+        body = request.get_json()
+        name = body.get('name', None)
+        rates = body.get('rates', None)
+        featured_ids = body.get('featured', [])
+        featured_rate = float(body.get('featured_rate', 0.5))
+
+        rates = {str(rarity): float(rate) for rarity, rate in rates.items()}
+        if not name or not rates or min(rates.values()) < 0 or \
+                sum(rates.values()) <= 0 or not 0 <= featured_rate <= 1:
+            abort(422)
+        featured = Card.query.filter(Card.id.in_(featured_ids)).all()
+        if len(featured) != len(set(featured_ids)) or any(
+                card.rarity not in rates for card in featured):
+            abort(422)
+
+        banner = Banner(
+            name=name,
+            featured_rate=featured_rate,
+            rates=[BannerRate(rarity=rarity, rate=rate)
+                   for rarity, rate in rates.items()],
+            featured=featured
+        )
+        banner.insert()
+
+        return jsonify({
+            'success': True,
+            'banner': [banner.info()]
+        }), 200
+
+    except Exception as e:
+        abort(422)
+
+
+@app.route('/banners/<int:banner_id>', methods=['DELETE'])
+@requires_auth('delete:banner')
+def delete_banner(jwt, banner_id):
+    """DELETE /banners/<id>
+
+    An endpoint that deletes the corresponding row for <id>. Requires the
+    'delete:banner' permission.
+
+    Args:
+        jwt: a json web token (string).
+        banner_id: where <banner_id> is the existing model id (int).
+
+    Returns:
+        A status code 200 and json {"success": True, "delete": banner_id}
+        where banner_id is the id of the deleted banner or appropriate
+        status code indicating reason for failure.
+    """
+    banner = Banner.query.get(banner_id)
+    if banner is None:
+        abort(404)
+
+    try:
+        banner.delete()
+
+        return jsonify({
+            'success': True,
+            'delete': banner_id
+        }), 200
+
+    except Exception as e:
+        abort(422)
+
+
+@app.route('/banners/<int:banner_id>/pull', methods=['POST'])
+@query_budget(7)
+@requires_auth('post:pull')
+def pull_banner(jwt, banner_id):
+    """POST /banners/<id>/pull
+
+    An endpoint that draws cards from the banner for <id>, with
+    replacement. Each draw is an O(1) lookup in the alias table of the
+    banner's pool, which is built once per process and catalog version.
+    Requires the 'post:pull' permission.
+
+    Query parameters:
+        count: the number of cards to draw, 1 to MAX_PULL_COUNT (default
+            1).
+
+    Args:
+        jwt: a json web token (string).
+        banner_id: where <banner_id> is the existing model id (int).
+
+    Returns:
+        A status code 200 and json {"success": True, "banner": banner_id,
+        "card": cards} where cards are the drawn cards in the card.info()
+        representation, in draw order, or appropriate status code
+        indicating reason for failure.
+    """
+    count = get_number_arg('count', 1)
+    if not 1 <= count <= MAX_PULL_COUNT:
+        abort(422)
+    try:
+        pool = load_pool(banner_id)
+    except ValueError:
+        abort(422)
+    if pool is None:
+        abort(404)
+
+    cards = pool.pull(count, pull_rng)
+    try:
+        # the drawn cards are added to the inventory of the user and to
+        # the pull history in one transaction
+        record_pull(jwt['sub'], banner_id, [card['id'] for card in cards])
+    except Exception as e:
+        abort(422)
+
+    return jsonify({
+        'success': True,
+        'banner': banner_id,
+        'card': cards
+    }), 200
+
+
+# Inventory
+# ----------------------------------------------------------------------------#
+@app.route('/me/inventory', methods=['GET'])
+@query_budget(1)
+@requires_auth('get:inventory')
+def get_inventory(jwt):
+    """GET /me/inventory
+
+    An endpoint that retrieves one page of the cards owned by the user of
+    the access token, ordered by card id. Requires the 'get:inventory'
+    permission.
+
+    Query parameters:
+        after: the next_cursor of the previous page (optional).
+        limit: the page size, at most MAX_PAGE_SIZE (optional).
+
+    Args:
+        jwt: a json web token (string).
+
+    Returns:
+        A status code 200 and json {"success": True, "inventory": cards,
+        "next_cursor": cursor} where cards is the list of owned cards in
+        the inventory.info() representation and cursor is the value of
+        after for the next page (null on the last page) or appropriate
+        status code indicating reason for failure.
+    """
+    after, limit = get_page_args()
+    try:
+        page = load_page(Inventory.info_query(jwt['sub']), Inventory.card,
+                         Inventory.info_from_row, after, limit)
+
+        return jsonify({
+            'success': True,
+            'inventory': page['rows'],
+            'next_cursor': page['next_cursor']
+        }), 200
+
+    except Exception as e:
+        abort(404)
+
+
+@app.route('/banners/<int:banner_id>/analysis', methods=['GET'])
+@query_budget(5)
+@requires_auth('get:banner')
+def analyze_banner(jwt, banner_id):
+    """GET /banners/<id>/analysis
+
+    An endpoint that estimates how many pulls it takes to get a card, or
+    any card of a rarity, on the banner for <id> by simulating pull
+    sequences with NumPy. The pity rule applies to the rarity of the
+    target. Results are cached until the banners or cards change. Requires
+    the 'get:banner' permission.
+
+    Query parameters:
+        card: the id of the target card, or
+        rarity: the target rarity.
+        pity: the pull, counted since the last pull of the target's
+            rarity, that is guaranteed to be of it (optional).
+        sims: the number of simulations, at most ANALYSIS_MAX_SIMS
+            (default 100000).
+        cost: the cost of one pull, to report the spend (optional).
+        seed: the seed of the simulations (optional).
+
+    Args:
+        jwt: a json web token (string).
+        banner_id: where <banner_id> is the existing model id (int).
+
+    Returns:
+        A status code 200 and json {"success": True, "banner": banner_id,
+        "p_target": p, "analysis": summary} where summary holds the mean,
+        standard deviation and percentiles of the number of pulls (and of
+        the spend) or appropriate status code indicating reason for
+        failure.
+    """
+    card_id = get_number_arg('card')
+    rarity = request.args.get('rarity', None)
+    pity = get_number_arg('pity')
+    sims = get_number_arg('sims', 100000)
+    cost = get_number_arg('cost', type=float)
+    seed = get_number_arg('seed')
+    if (card_id is None) == (rarity is None) or \
+            not 1 <= sims <= ANALYSIS_MAX_SIMS or \
+            (cost is not None and not math.isfinite(cost)):
+        abort(422)
+
+    def analyze():
+        pool = load_pool(banner_id)
+        if pool is None:
+            return None
+        p_target, p_rarity = pool.probabilities(card_id, rarity)
+        pulls = run_simulations(p_target, p_rarity, pity, sims, seed,
+                                ANALYSIS_PROCESSES)
+        return {
+            'p_target': p_target,
+            'analysis': summarize(pulls, pull_cost=cost)
+        }
+
+    try:
+        result = catalog_cache.get_or_load_page(
+            'Banner', current_version('Banner', 'Card')[0],
+            'analysis:' + urlencode(sorted(request.args.items())), analyze)
+    except ValueError:
+        abort(422)
+    if result is None:
+        abort(404)
+
+    return jsonify({
+        'success': True,
+        'banner': banner_id,
+        'p_target': result['p_target'],
+        'analysis': result['analysis']
+    }), 200
+
+
+# Search
+# ----------------------------------------------------------------------------#
+@app.route('/search', methods=['GET'])
+@query_budget(5)
+@requires_auth('get:search')
+@conditional(*SEARCH_TABLES)
+def search(jwt):
+    """GET /search
+
+    An endpoint that searches card names, character names and skill names
+    and descriptions, case insensitively, for a full or partial text.
+    Requires the 'get:search' permission.
+
+    Query parameters:
+        q: the searched text.
+        limit: the number of results, at most SEARCH_MAX_RESULTS
+            (optional, 20).
+
+    Args:
+        jwt: a json web token (string).
+
+    Returns:
+        A status code 200 and json {"success": True, "results": results}
+        where results are {"type", "id", "name", "match", "score"} dicts,
+        exact matches first, then prefix and substring matches, name
+        matches before description matches, or appropriate status code
+        indicating reason for failure.
+    """
+    q = normalize(request.args.get('q', ''))
+    try:
+        limit = int(request.args.get('limit', 20))
+    except ValueError:
+        abort(422)
+    if not q or not 0 < limit <= SEARCH_MAX_RESULTS:
+        abort(422)
+
+    try:
+        results = catalog_cache.get_or_load_page(
+            'Search', current_version(*SEARCH_TABLES)[0],
+            urlencode([('q', q), ('limit', limit)]),
+            lambda: load_search(q, limit))
+    except Exception as e:
+        abort(422)
+
+    return jsonify({
+        'success': True,
+        'results': results
+    }), 200
+
+
+# Versions
+# ----------------------------------------------------------------------------#
+@app.route('/versions', methods=['GET'])
+@query_budget(1)
+def get_versions():
+    """GET /versions
+
+    An endpoint that reports the change version of every catalog table.
+    The version of a table is incremented by every write to it, so clients
+    and caches can tell whether a table changed since they last read it.
+    Does not require authentication.
+
+    Returns:
+        A status code 200 and json {"success": True, "versions": versions}
+        where versions maps each table name to its version and the time of
+        its last write.
+    """
+    return jsonify({
+        'success': True,
+        'versions': CatalogVersion.all()
+    }), 200
+
+
+# Stats
+# ----------------------------------------------------------------------------#
+@app.route('/stats', methods=['GET'])
+def get_stats():
+    """GET /stats
+
+    An endpoint that reports the hit/miss counters of the in-process caches
+    and the connection pool and replica routing metrics of this process.
+    Does not require authentication and does not touch the database.
+
+    Returns:
+        A status code 200 and json {"success": True, "token_cache": stats,
+        "catalog_cache": stats, "db_pool": stats, "db_replicas": stats}
+        where stats are the counters of the verified token cache, of the
+        single-entity read-through cache, of the database connection pool
+        and of the read replica router.
+    """
+    return jsonify({
+        'success': True,
+        'token_cache': token_cache.stats(),
+        'catalog_cache': catalog_cache.stats(),
+        'db_pool': pool_metrics.stats(db.engine.pool),
+        'db_replicas': replica_router.stats()
+    }), 200
+
+
+# Metrics
+# ----------------------------------------------------------------------------#
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """GET /metrics
+
+    An endpoint that reports the request, authentication, database and
+    serialization metrics of this process in the Prometheus text format.
+    Does not require authentication.
+
+    Returns:
+        A status code 200 and the metrics as text/plain.
+    """
+    return Response(registry.render(),
+                    mimetype='text/plain; version=0.0.4'), 200
+
+
+# Commands
+# ----------------------------------------------------------------------------#
+@app.cli.command('rescore-cards')
+def rescore_cards():
+    """flask rescore-cards
+
+    Recomputes the stored total_stats and score of every card with a single
+    UPDATE, to run after changing CARD_SCORE_WEIGHTS.
+    """
+    count = bulk_update(Card, true(), Card.derived_values({}))
+    click.echo('Rescored {} cards'.format(count))
+
 # ----------------------------------------------------------------------------#
 # Error Handling
 # ----------------------------------------------------------------------------#
 
 
+"""
+Error handler for malformed requests
+"""
+@app.errorhandler(400)
+def bad_request(error):
+    return jsonify({
+        "success": False,
+        "error": 400,
+        "message": "Bad request"
+    }), 400
+
+
 """
 Error handling for unprocessable entity
 """
@@ -1,14 +1,33 @@
-import json
+import os
 from flask import request, _request_ctx_stack, abort
 from functools import wraps
 from jose import jwt
-from urllib.request import urlopen
+from metrics.instrument import timed
+from .jwks import JWKSCache
+from .token_cache import TokenCache
 
 
 AUTH0_DOMAIN = 'dev-2s1k6c84.auth0.com'
 ALGORITHMS = ['RS256']
 API_AUDIENCE = 'idol'
 
+# JWKS source may be an https URL, a file:// URL or a local path
+JWKS_SOURCE = os.environ.get(
+    'AUTH0_JWKS_SOURCE', f'https://{AUTH0_DOMAIN}/.well-known/jwks.json')
+JWKS_CACHE_TTL = int(os.environ.get('JWKS_CACHE_TTL', 3600))
+JWKS_REFRESH_MARGIN = int(os.environ.get('JWKS_REFRESH_MARGIN', 300))
+
+jwks_cache = JWKSCache(
+    JWKS_SOURCE,
+    ttl=JWKS_CACHE_TTL,
+    refresh_margin=JWKS_REFRESH_MARGIN
+)
+
+# Verified payloads are kept until their 'exp' claim
+TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', 10000))
+
+token_cache = TokenCache(max_entries=TOKEN_CACHE_SIZE)
+
 
 """ AuthError Exception """
 
@@ -100,6 +119,9 @@ def check_permissions(permission, payload):
 def verify_decode_jwt(token):
     """Verifies the token using Auth0 /.well-known/jwks.json.
 
+    Signing keys are looked up in the process-wide jwks_cache rather than
+    fetched per call.
+
     Args:
         token: a json web token (string).
 
@@ -111,10 +133,15 @@ def verify_decode_jwt(token):
         AuthError: if the header is malformed.
         AuthError: if the token is expired.
         AuthError: if the claims are invalid.
+        AuthError: if the key set cannot be fetched.
     """
-    jsonurl = urlopen(f'https://{AUTH0_DOMAIN}/.well-known/jwks.json')
-    jwks = json.loads(jsonurl.read())
-    unverified_header = jwt.get_unverified_header(token)
+    try:
+        unverified_header = jwt.get_unverified_header(token)
+    except Exception:
+        raise AuthError({
+            'code': 'invalid_header',
+            'description': 'Unable to parse authentication token.'
+        }, 400)
     rsa_key = {}
     if 'kid' not in unverified_header:
         raise AuthError({
@@ -122,24 +149,33 @@ def verify_decode_jwt(token):
             'description': 'Authorization malformed.'
         }, 401)
 
-    for key in jwks['keys']:
-        if key['kid'] == unverified_header['kid']:
-            rsa_key = {
-                'kty': key['kty'],
-                'kid': key['kid'],
-                'use': key['use'],
-                'n': key['n'],
-                'e': key['e']
-            }
+    try:
+        with timed('auth_duration_seconds', ('jwks',)):
+            key = jwks_cache.get_key(unverified_header['kid'])
+    except Exception:
+        raise AuthError({
+            'code': 'jwks_unavailable',
+            'description': 'Unable to fetch the signing keys.'
+        }, 503)
+
+    if key is not None:
+        rsa_key = {
+            'kty': key['kty'],
+            'kid': key['kid'],
+            'use': key['use'],
+            'n': key['n'],
+            'e': key['e']
+        }
     if rsa_key:
         try:
-            payload = jwt.decode(
-                token,
-                rsa_key,
-                algorithms=ALGORITHMS,
-                audience=API_AUDIENCE,
-                issuer='https://' + AUTH0_DOMAIN + '/'
-            )
+            with timed('auth_duration_seconds', ('decode',)):
+                payload = jwt.decode(
+                    token,
+                    rsa_key,
+                    algorithms=ALGORITHMS,
+                    audience=API_AUDIENCE,
+                    issuer='https://' + AUTH0_DOMAIN + '/'
+                )
 
             return payload
 
@@ -170,6 +206,11 @@ def requires_auth(permission=''):
     """Returns the decorator which passes the decoded payload to the decorated
         method.
 
+    Payloads of previously verified tokens are served from token_cache, so
+    only the first request with a given token pays for signature
+    verification. Permissions are still checked on every request. The time
+    of each step is recorded in the auth_duration_seconds histogram.
+
     Args:
         permission: string permission (i.e. 'post:card').
     """
@@ -177,9 +218,13 @@ def requires_auth(permission=''):
         @wraps(f)
         def wrapper(*args, **kwargs):
             try:
-                token = get_token_auth_header()
-                payload = verify_decode_jwt(token)
-                check_permissions(permission, payload)
+                with timed('auth_duration_seconds', ('total',)):
+                    token = get_token_auth_header()
+                    payload = token_cache.get(token)
+                    if payload is None:
+                        payload = token_cache.put(
+                            token, verify_decode_jwt(token))
+                    check_permissions(permission, payload)
                 return f(payload, *args, **kwargs)
             except AuthError as e:
                 abort(401)
@@ -0,0 +1,156 @@
+import json
+import logging
+import threading
+import time
+from urllib.request import urlopen
+
+
+logger = logging.getLogger(__name__)
+
+
+""" JWKS Cache """
+
+"""
+A process-wide cache of the signing keys published by Auth0, so that token
+verification does not pay a round trip to /.well-known/jwks.json per request
+"""
+
+
+class JWKSCache:
+    """Caches a JSON Web Key Set keyed by key id (kid).
+
+    The key set is fetched once and kept for `ttl` seconds. Within
+    `refresh_margin` seconds of expiry the next lookup triggers a refresh in
+    a background thread while the current keys keep being served. A lookup
+    for an unknown kid forces a single refetch (key rotation), rate limited
+    to one every `min_refetch_interval` seconds so that garbage kids cannot
+    be used to hammer the JWKS endpoint.
+
+    Args:
+        source: an http(s) URL, a file:// URL or a local path to a jwks.json.
+        ttl: seconds a fetched key set is considered fresh.
+        refresh_margin: seconds before expiry at which a background refresh
+            is started.
+        min_refetch_interval: minimum seconds between two fetches triggered
+            by an unknown kid.
+        timeout: network timeout in seconds for URL sources.
+    """
+
+    def __init__(self, source, ttl=3600, refresh_margin=300,
+                 min_refetch_interval=30, timeout=5):
+        self.source = source
+        self.ttl = ttl
+        self.refresh_margin = min(refresh_margin, ttl)
+        self.min_refetch_interval = min_refetch_interval
+        self.timeout = timeout
+        self._keys = {}
+        self._fetched_at = None
+        self._expires_at = 0.0
+        self._fetch_lock = threading.Lock()
+        # guards the background refresh thread, never held while fetching
+        self._lock = threading.Lock()
+        self._background = None
+
+    def load(self):
+        """Reads the key set from the configured source.
+
+        Returns:
+            A dict mapping each kid to its JWK.
+        """
+        if self.source.startswith(('https://', 'http://')):
+            with urlopen(self.source, timeout=self.timeout) as response:
+                jwks = json.loads(response.read())
+        else:
+            path = self.source
+            if path.startswith('file://'):
+                path = path[len('file://'):]
+            with open(path) as f:
+                jwks = json.load(f)
+        return {
+            key['kid']: key for key in jwks.get('keys', []) if 'kid' in key
+        }
+
+    def refresh(self, force=False):
+        """Fetches the key set unless another thread just did.
+
+        Only one thread fetches at a time; threads that were waiting on the
+        fetch reuse its result. If the fetch fails and keys are already
+        cached, the stale keys are kept and the error is logged.
+
+        Args:
+            force: fetch even if the cached keys have not expired.
+
+        Returns:
+            The dict of cached keys.
+        """
+        requested_at = time.monotonic()
+        with self._fetch_lock:
+            fetched_at = self._fetched_at
+            if fetched_at is not None and fetched_at >= requested_at:
+                return self._keys
+            if not force and requested_at < self._expires_at - \
+                    self.refresh_margin:
+                return self._keys
+            try:
+                keys = self.load()
+            except Exception:
+                if not self._keys:
+                    raise
+                logger.exception('JWKS refresh failed, serving cached keys')
+                # retry no sooner than min_refetch_interval
+                self._fetched_at = time.monotonic()
+                self._expires_at = max(
+                    self._expires_at,
+                    self._fetched_at + self.min_refetch_interval)
+                return self._keys
+            now = time.monotonic()
+            self._keys = keys
+            self._fetched_at = now
+            self._expires_at = now + self.ttl
+            return keys
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._background is not None and \
+                    self._background.is_alive():
+                return
+            self._background = threading.Thread(
+                target=self._background_refresh, name='jwks-refresh',
+                daemon=True)
+            self._background.start()
+
+    def _background_refresh(self):
+        try:
+            self.refresh(force=True)
+        except Exception:
+            logger.exception('Background JWKS refresh failed')
+
+    def get_key(self, kid):
+        """Returns the JWK for a key id.
+
+        Args:
+            kid: the key id from the token header.
+
+        Returns:
+            The JWK dict or None if the key set does not contain kid, even
+            after a forced refetch.
+        """
+        now = time.monotonic()
+        keys = self._keys
+        if now >= self._expires_at:
+            keys = self.refresh()
+        elif now >= self._expires_at - self.refresh_margin:
+            self._refresh_in_background()
+
+        key = keys.get(kid)
+        if key is None and (self._fetched_at is None or now - self._fetched_at
+                            >= self.min_refetch_interval):
+            key = self.refresh(force=True).get(kid)
+        return key
+
+    def clear(self):
+        """Drops the cached keys so the next lookup fetches again."""
+        with self._fetch_lock:
+            self._keys = {}
+            self._fetched_at = None
+            self._expires_at = 0.0
@@ -0,0 +1,98 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+""" Verified Token Cache """
+
+"""
+A bounded LRU cache of verified token payloads, so that a client reusing the
+same access token only pays for RS256 signature verification once
+"""
+
+class TokenCache:
+    """Caches the decoded payloads of verified tokens.
+
+    Entries are keyed by the SHA-256 digest of the raw token so the tokens
+    themselves are not kept in memory, and expire at the token's 'exp'
+    claim. Once `max_entries` is reached the least recently used entry is
+    evicted.
+
+    Args:
+        max_entries: the maximum number of cached payloads. A value of 0
+            disables the cache.
+        clock: a function returning the current unix time.
+    """
+
+    def __init__(self, max_entries=10000, clock=time.time):
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(token):
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
+    def get(self, token):
+        """Returns the cached payload for token or None on a miss.
+
+        Args:
+            token: a json web token (string).
+        """
+        key = self.key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, payload = entry
+                if expires_at > self.clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return payload
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, token, payload):
+        """Caches the payload of a verified token until its 'exp' claim.
+
+        Tokens without an 'exp' claim are not cached.
+
+        Args:
+            token: a json web token (string).
+            payload: the verified, decoded payload.
+
+        Returns:
+            The payload.
+        """
+        expires_at = payload.get('exp')
+        if self.max_entries <= 0 or not isinstance(expires_at, (int, float)):
+            return payload
+        key = self.key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return payload
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Returns the hit/miss counters and current size of the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'size': len(self._entries),
+                'max_entries': self.max_entries
+            }
@@ -0,0 +1,4 @@
+"""Benchmarks for the Mobile Gacha API.
+
+Each module can be run directly, e.g. `python -m benchmarks.bench_auth`.
+"""
@@ -0,0 +1,76 @@
+"""Microbenchmark of the per-request overhead of requires_auth.
+
+Measures, inside a single request context, the cost of calling a view
+through requires_auth with:
+
+    - no decorator at all (baseline),
+    - a cached token, so only the header and permissions are checked,
+    - the token cache disabled, so every call verifies the RS256 signature.
+
+Usage:
+    python -m benchmarks.bench_auth [iterations]
+"""
+import os
+import sys
+import tempfile
+import timeit
+
+from flask import Flask
+
+from auth import auth
+from auth.jwks import JWKSCache
+from auth.token_cache import TokenCache
+from .tokens import CONTRIBUTOR_PERMISSIONS, make_key, mint_token, write_jwks
+
+
+def view(payload):
+    return payload
+
+
+def per_call(func, iterations):
+    seconds = min(timeit.repeat(func, number=iterations, repeat=3))
+    return seconds / iterations * 1e6
+
+
+def run(iterations=100000):
+    pem, jwk = make_key('bench')
+    fd, jwks_path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    write_jwks(jwks_path, [jwk])
+    original_jwks_cache = auth.jwks_cache
+    original_token_cache = auth.token_cache
+    auth.jwks_cache = JWKSCache(jwks_path)
+
+    # the last permission is the worst case for the permissions scan
+    permission = CONTRIBUTOR_PERMISSIONS[-1]
+    token = mint_token(pem, 'bench', CONTRIBUTOR_PERMISSIONS)
+    headers = {'Authorization': 'Bearer {0}'.format(token)}
+    protected = auth.requires_auth(permission)(view)
+    results = {}
+
+    try:
+        with Flask(__name__).test_request_context(headers=headers):
+            results['bare view'] = per_call(lambda: view({}), iterations)
+
+            auth.token_cache = TokenCache()
+            protected()
+            results['cached token'] = per_call(protected, iterations)
+
+            auth.token_cache = TokenCache(max_entries=0)
+            results['uncached, RS256 verify'] = per_call(
+                protected, max(iterations // 1000, 10))
+    finally:
+        auth.jwks_cache = original_jwks_cache
+        auth.token_cache = original_token_cache
+        os.remove(jwks_path)
+
+    baseline = results['bare view']
+    print('{:<28} {:>12} {:>14}'.format('path', 'us/call', 'overhead us'))
+    for name, micros in results.items():
+        print('{:<28} {:>12.2f} {:>14.2f}'.format(
+            name, micros, micros - baseline))
+    return results
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,68 @@
+"""Benchmark of bulk card imports.
+
+Compares importing cards one Card.insert() per row (one INSERT and one
+commit each, as a client looping over POST /cards does) against
+database.bulk.bulk_insert() in a single transaction.
+
+Usage:
+    python -m benchmarks.bench_bulk_insert [cards] [database_uri]
+"""
+import sys
+import time
+
+from database.database import db
+from database.bulk import bulk_insert
+from database.card import Card
+from .catalog import RARITIES, create_bench_app, seed_catalog
+
+
+def card_rows(cards):
+    return [{
+        'name': 'Imported {}'.format(i),
+        'character': i % 10 + 1,
+        'skill': i % 10 + 1,
+        'rarity': RARITIES[i % len(RARITIES)],
+        'stat_1': i % 9000,
+        'stat_2': i % 9000,
+        'stat_3': i % 9000,
+        'stat_4': i % 9000
+    } for i in range(cards)]
+
+
+def per_row(rows):
+    for row in rows:
+        Card(**row).insert()
+
+
+def bulk(rows):
+    bulk_insert(Card, rows)
+
+
+def rows_per_second(app, func, cards):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        seed_catalog(cards=0)
+        rows = card_rows(cards)
+        start = time.perf_counter()
+        func(rows)
+        elapsed = time.perf_counter() - start
+        assert Card.query.count() == cards
+        db.session.remove()
+    return cards / elapsed
+
+
+def run(cards=10000, database_uri='sqlite://'):
+    app = create_bench_app(database_uri)
+    single = rows_per_second(app, per_row, cards)
+    batched = rows_per_second(app, bulk, cards)
+    print('{:<24} {:>14}'.format('path', 'rows/s'))
+    print('{:<24} {:>14,.0f}'.format('Card.insert() per row', single))
+    print('{:<24} {:>14,.0f}'.format('bulk_insert', batched))
+    print('speedup: {:.1f}x'.format(batched / single))
+    return single, batched
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 10000,
+        *sys.argv[2:3])
@@ -0,0 +1,77 @@
+"""Benchmark of deleting a character and its cards.
+
+Deletes one character owning `cards` cards out of a catalog of ten such
+characters, three ways:
+
+    - ORM cascade without an index on Card.character, the previous path:
+      the relationship loads every card and deletes them one by one,
+    - database ON DELETE CASCADE without the index,
+    - Character.delete(): database ON DELETE CASCADE with the
+      ix_Card_character_id index.
+
+Usage:
+    python -m benchmarks.bench_cascade_delete [cards] [database_uri]
+"""
+import sys
+import time
+
+from database.database import db
+from database.card import Card
+from database.character import Character
+from .catalog import create_bench_app, seed_catalog
+
+CHARACTERS = 10
+
+
+def orm_cascade(character):
+    # what relationship(cascade="delete") without passive_deletes does
+    for card in Card.query.filter(Card.character == character.id).all():
+        db.session.delete(card)
+    db.session.delete(character)
+    db.session.commit()
+
+
+def database_cascade(character):
+    character.delete()
+
+
+def delete_seconds(app, delete, cards, index, repeat=3):
+    best = None
+    for _ in range(repeat):
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            if not index:
+                db.session.execute('DROP INDEX "ix_Card_character_id"')
+            seed_catalog(characters=CHARACTERS, skills=CHARACTERS,
+                         cards=cards * CHARACTERS)
+            character = Character.query.get(1)
+            start = time.perf_counter()
+            delete(character)
+            elapsed = time.perf_counter() - start
+            assert Card.query.filter(Card.character == 1).count() == 0
+            assert Card.query.count() == cards * (CHARACTERS - 1)
+            db.session.remove()
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run(cards=5000, database_uri='sqlite://'):
+    app = create_bench_app(database_uri)
+    results = {
+        'ORM cascade, no index': delete_seconds(
+            app, orm_cascade, cards, False),
+        'ON DELETE CASCADE, no index': delete_seconds(
+            app, database_cascade, cards, False),
+        'ON DELETE CASCADE, index': delete_seconds(
+            app, database_cascade, cards, True),
+    }
+    print('{:<30} {:>10}'.format('path', 'ms'))
+    for name, seconds in results.items():
+        print('{:<30} {:>10.1f}'.format(name, seconds * 1000))
+    return results
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+        *sys.argv[2:3])
@@ -0,0 +1,75 @@
+"""Benchmark of the cost of the metrics.
+
+Measures, on a one-route Flask app answering through the test client:
+
+    - the time of one histogram observation from 1 and from 8 threads,
+    - the latency of a request without and with the request hooks and
+      timed JSON encoder of metrics.instrument installed.
+
+Usage:
+    python -m benchmarks.bench_metrics [requests]
+"""
+import sys
+import threading
+import time
+
+from flask import Flask, jsonify
+
+from metrics.instrument import init_app
+from metrics.registry import Registry
+
+OBSERVATIONS = 200000
+
+
+def observe_ns(threads):
+    registry = Registry()
+    registry.histogram('bench_seconds', 'Benchmark.', ['endpoint'])
+
+    def work():
+        for _ in range(OBSERVATIONS):
+            registry.observe('bench_seconds', ('bench',), 0.003)
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    return elapsed / (OBSERVATIONS * threads) * 1e9
+
+
+def request_us(instrumented, requests):
+    app = Flask(__name__)
+    if instrumented:
+        init_app(app)
+
+    @app.route('/ping')
+    def ping():
+        return jsonify({'card': [{'id': i, 'name': 'Card'}
+                                 for i in range(10)]})
+
+    client = app.test_client()
+    for _ in range(100):
+        client.get('/ping')
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get('/ping')
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def run(requests=5000):
+    print('observe, 1 thread:  {:.0f} ns'.format(observe_ns(1)))
+    print('observe, 8 threads: {:.0f} ns'.format(observe_ns(8)))
+    # best of 5 interleaved runs, the test client is noisy
+    runs = [(request_us(False, requests), request_us(True, requests))
+            for _ in range(5)]
+    plain = min(run[0] for run in runs)
+    instrumented = min(run[1] for run in runs)
+    print('request, no metrics: {:.1f} us'.format(plain))
+    print('request, metrics:    {:.1f} us (+{:.1f} us)'.format(
+        instrumented, instrumented - plain))
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,72 @@
+"""Benchmark of the banner pull simulations.
+
+Simulates pulls until a featured SSR (0.75% per pull, 3% SSR rate, pity on
+the 90th pull) with:
+
+    - a Python loop over simulations and pulls,
+    - gacha.montecarlo.run_simulations in the calling process,
+    - gacha.montecarlo.run_simulations over a process pool.
+
+Usage:
+    python -m benchmarks.bench_montecarlo [sims] [processes]
+"""
+import os
+import random
+import sys
+import time
+
+from gacha.montecarlo import run_simulations, summarize
+
+P_TARGET = 0.0075
+P_RARITY = 0.03
+PITY = 90
+
+
+def python_loop(sims, seed=0):
+    rng = random.Random(seed)
+    results = []
+    for _ in range(sims):
+        pulls = 0
+        since = 0
+        while True:
+            pulls += 1
+            since += 1
+            u = rng.random()
+            if since == PITY:
+                u *= P_RARITY
+            if u < P_TARGET:
+                break
+            if u < P_RARITY:
+                since = 0
+        results.append(pulls)
+    return results
+
+
+def sims_per_second(func, sims):
+    start = time.perf_counter()
+    func(sims)
+    return sims / (time.perf_counter() - start)
+
+
+def run(sims=10000000, processes=None):
+    processes = processes or os.cpu_count() or 1
+    results = {
+        'python loop': sims_per_second(python_loop, max(sims // 100, 1000)),
+        'numpy, 1 process': sims_per_second(
+            lambda n: run_simulations(P_TARGET, P_RARITY, PITY, n, 0), sims),
+    }
+    if processes > 1:
+        results['numpy, {} processes'.format(processes)] = sims_per_second(
+            lambda n: run_simulations(P_TARGET, P_RARITY, PITY, n, 0,
+                                      processes), sims)
+    print('{:<26} {:>14}'.format('simulator', 'sims/s'))
+    for name, rate in results.items():
+        print('{:<26} {:>14,.0f}'.format(name, rate))
+    summary = summarize(run_simulations(P_TARGET, P_RARITY, PITY, sims, 0))
+    print('mean {mean:.1f} pulls, percentiles {percentiles}'.format(
+        **summary))
+    return results
+
+
+if __name__ == '__main__':
+    run(*[int(arg) for arg in sys.argv[1:3]])
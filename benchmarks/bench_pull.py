@@ -0,0 +1,81 @@
+"""Benchmark of banner draws.
+
+Draws cards from a pool of `cards` cards over five rarities with:
+
+    - a weighted linear scan of the pool per draw,
+    - random.choices with cumulative weights (a bisection per draw),
+    - the Vose alias table of gacha.pool.Pool (O(1) per draw).
+
+Usage:
+    python -m benchmarks.bench_pull [cards] [draws]
+"""
+import itertools
+import random
+import sys
+import time
+
+from gacha.pool import Pool, card_weights
+from .catalog import RARITIES
+
+RATES = {'N': 50, 'R': 30, 'SR': 14, 'SSR': 5, 'UR': 1}
+
+
+def make_pool(cards, seed=0):
+    rng = random.Random(seed)
+    infos = [{'id': i + 1, 'rarity': rng.choice(RARITIES)}
+             for i in range(cards)]
+    featured = {card['id'] for card in infos[:4]}
+    weights = card_weights(RATES, 0.5, infos, featured)
+    return infos, weights
+
+
+def linear_scan(cards, weights, draws, rng):
+    total = sum(weights)
+    pulled = []
+    for _ in range(draws):
+        target = rng.random() * total
+        for card, weight in zip(cards, weights):
+            target -= weight
+            if target < 0:
+                break
+        pulled.append(card)
+    return pulled
+
+
+def bisection(cards, weights, draws, rng):
+    cumulative = list(itertools.accumulate(weights))
+    return rng.choices(cards, cum_weights=cumulative, k=draws)
+
+
+def alias(pool):
+    # the pool is built once per banner and cached, only draws are timed
+    return lambda cards, weights, draws, rng: pool.pull(draws, rng)
+
+
+def draws_per_second(func, cards, weights, draws):
+    rng = random.Random(1)
+    start = time.perf_counter()
+    pulled = func(cards, weights, draws, rng)
+    elapsed = time.perf_counter() - start
+    assert len(pulled) == draws
+    return draws / elapsed
+
+
+def run(cards=1000, draws=1000000):
+    infos, weights = make_pool(cards)
+    results = {
+        'linear scan': draws_per_second(
+            linear_scan, infos, weights, max(draws // 100, 1000)),
+        'random.choices (bisect)': draws_per_second(
+            bisection, infos, weights, draws),
+        'alias table': draws_per_second(
+            alias(Pool(infos, weights)), infos, weights, draws),
+    }
+    print('{:<26} {:>14}'.format('sampler', 'draws/s'))
+    for name, rate in results.items():
+        print('{:<26} {:>14,.0f}'.format(name, rate))
+    return results
+
+
+if __name__ == '__main__':
+    run(*[int(arg) for arg in sys.argv[1:3]])
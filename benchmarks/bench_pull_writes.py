@@ -0,0 +1,72 @@
+"""Benchmark of recording 10-pulls.
+
+Records `pulls` 10-pulls of one user two ways:
+
+    - one ORM read-modify-commit of the inventory row and one history row
+      commit per drawn card,
+    - database.inventory.record_pull(): one multi-row history INSERT and one
+      multi-row upsert of the counts in a single transaction.
+
+Usage:
+    python -m benchmarks.bench_pull_writes [pulls] [database_uri]
+"""
+import random
+import sys
+import time
+from datetime import datetime
+
+from database.database import db
+from database.inventory import Inventory, PullHistory, record_pull
+from .catalog import create_bench_app, seed_catalog
+
+SUB = 'auth0|bench'
+
+
+def per_card(card_ids):
+    for card_id in card_ids:
+        db.session.add(PullHistory(sub=SUB, banner=1, card=card_id,
+                                   pulled_at=datetime.utcnow()))
+        db.session.commit()
+        owned = Inventory.query.get((SUB, card_id))
+        if owned is None:
+            db.session.add(Inventory(sub=SUB, card=card_id, count=1))
+        else:
+            owned.count += 1
+        db.session.commit()
+
+
+def batched(card_ids):
+    record_pull(SUB, 1, card_ids)
+
+
+def pulls_per_second(app, record, pulls):
+    rng = random.Random(0)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        seed_catalog(cards=200)
+        draws = [[rng.randint(1, 200) for _ in range(10)]
+                 for _ in range(pulls)]
+        start = time.perf_counter()
+        for card_ids in draws:
+            record(card_ids)
+        elapsed = time.perf_counter() - start
+        assert PullHistory.query.count() == pulls * 10
+        db.session.remove()
+    return pulls / elapsed
+
+
+def run(pulls=1000, database_uri='sqlite://'):
+    app = create_bench_app(database_uri)
+    single = pulls_per_second(app, per_card, pulls)
+    multi = pulls_per_second(app, batched, pulls)
+    print('{:<28} {:>14}'.format('path', '10-pulls/s'))
+    print('{:<28} {:>14,.0f}'.format('commit per card', single))
+    print('{:<28} {:>14,.0f}'.format('record_pull', multi))
+    print('speedup: {:.1f}x'.format(multi / single))
+    return single, multi
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000,
+        *sys.argv[2:3])
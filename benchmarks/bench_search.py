@@ -0,0 +1,58 @@
+"""Benchmark of GET /search.
+
+Searches a catalog of `cards` cards, with as many characters and skills as
+a tenth of the cards, for full names, partial names and short prefixes,
+two ways:
+
+    - sql_search(): LIKE '%q%' per searched column, a full scan of each
+      table on SQLite, served by the trigram GIN indexes on PostgreSQL,
+    - NgramIndex.search(): the in-process trigram index used on databases
+      other than PostgreSQL.
+
+Usage:
+    python -m benchmarks.bench_search [cards] [database_uri]
+"""
+import sys
+import time
+
+from database.database import db
+from database.search import NgramIndex, normalize, sql_search
+from .catalog import create_bench_app, seed_catalog
+
+QUERIES = ('Card 4242', 'card', 'character 7', 'ard 99', 'ard', 's', 'sk',
+           'no such name')
+LIMIT = 20
+
+
+def best_ms(search, q, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        search(q, LIMIT)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def run(cards=100000, database_uri='sqlite://'):
+    app = create_bench_app(database_uri)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        seed_catalog(characters=cards // 10, skills=cards // 10, cards=cards)
+        start = time.perf_counter()
+        index = NgramIndex.build()
+        print('NgramIndex.build() of {} texts: {:.0f} ms'.format(
+            len(index.documents), (time.perf_counter() - start) * 1000))
+        print('{:<16} {:>12} {:>12}'.format('q', 'sql ms', 'index ms'))
+        for q in QUERIES:
+            q = normalize(q)
+            assert index.search(q, LIMIT) == sql_search(q, LIMIT)
+            print('{:<16} {:>12.2f} {:>12.2f}'.format(
+                q, best_ms(sql_search, q), best_ms(index.search, q)))
+        db.session.remove()
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+        *sys.argv[2:3])
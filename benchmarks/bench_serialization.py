@@ -0,0 +1,55 @@
+"""Benchmark of the read path of the list endpoints.
+
+Compares serializing the Card table from fully hydrated ORM instances with
+Card.info() against selecting only the serialized columns with
+Card.info_query() and building the dicts from row tuples.
+
+Usage:
+    python -m benchmarks.bench_serialization [cards] [database_uri]
+"""
+import sys
+import time
+
+from database.database import db
+from database.card import Card
+from .catalog import create_bench_app, seed_catalog
+
+
+def rows_per_second(func, expected, repeat=5):
+    best = None
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        rows = func()
+        elapsed = time.perf_counter() - start
+        assert len(rows) == expected
+        best = elapsed if best is None else min(best, elapsed)
+    return expected / best
+
+
+def orm_path():
+    return [card.info() for card in Card.query.order_by(Card.id).all()]
+
+
+def column_path():
+    return [Card.info_from_row(row)
+            for row in Card.info_query().order_by(Card.id).all()]
+
+
+def run(cards=50000, database_uri='sqlite://'):
+    app = create_bench_app(database_uri)
+    with app.app_context():
+        seed_catalog(cards=cards)
+        assert orm_path() == column_path()
+        orm = rows_per_second(orm_path, cards)
+        columns = rows_per_second(column_path, cards)
+    print('{:<24} {:>14}'.format('path', 'rows/s'))
+    print('{:<24} {:>14,.0f}'.format('ORM + info()', orm))
+    print('{:<24} {:>14,.0f}'.format('columns + info_from_row', columns))
+    print('speedup: {:.1f}x'.format(columns / orm))
+    return orm, columns
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 50000,
+        *sys.argv[2:3])
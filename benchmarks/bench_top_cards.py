@@ -0,0 +1,64 @@
+"""Benchmark of ranking the strongest cards.
+
+Reads the 50 highest scoring cards of catalogs of growing size, two ways:
+
+    - client side, the previous path: every card is read and the stats
+      summed and sorted in Python,
+    - the query of GET /cards/top: an index scan of the stored score
+      through ix_Card_score_id, reading only the returned rows.
+
+Usage:
+    python -m benchmarks.bench_top_cards [database_uri]
+"""
+import sys
+import time
+
+from database.database import db
+from database.card import Card
+from .catalog import create_bench_app, seed_catalog
+
+SIZES = (1000, 10000, 100000)
+TOP_N = 50
+
+
+def client_side():
+    cards = [Card.info_from_row(row) for row in Card.info_query()]
+    cards.sort(key=lambda card: (card['stat_1'] + card['stat_2'] +
+                                 card['stat_3'] + card['stat_4'],
+                                 card['id']), reverse=True)
+    return [card['id'] for card in cards[:TOP_N]]
+
+
+def stored_score():
+    rows = Card.info_query().order_by(
+        Card.score.desc(), Card.id.desc()).limit(TOP_N)
+    return [Card.info_from_row(row)['id'] for row in rows]
+
+
+def best_ms(rank, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ids = rank()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, ids
+
+
+def run(database_uri='sqlite://'):
+    app = create_bench_app(database_uri)
+    print('{:>8} {:>14} {:>14}'.format('cards', 'client ms', 'top ms'))
+    for size in SIZES:
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            seed_catalog(cards=size)
+            client_ms, client_ids = best_ms(client_side)
+            top_ms, top_ids = best_ms(stored_score)
+            assert client_ids == top_ids
+            db.session.remove()
+        print('{:>8} {:>14.2f} {:>14.2f}'.format(size, client_ms, top_ms))
+
+
+if __name__ == '__main__':
+    run(*sys.argv[1:2])
@@ -0,0 +1,63 @@
+import random
+
+from flask import Flask
+
+from database.database import db, setup_db
+from database.card import Card
+from database.character import Character
+from database.skill import Skill
+
+
+""" Synthetic catalog for benchmarks """
+
+RARITIES = ['N', 'R', 'SR', 'SSR', 'UR']
+
+
+def create_bench_app(database_uri='sqlite://'):
+    """Creates a Flask app bound to database_uri with empty tables.
+
+    Defaults to an in-memory SQLite database.
+    """
+    app = Flask(__name__)
+    setup_db(app, database_uri)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    return app
+
+
+def seed_catalog(characters=10, skills=10, cards=1000, seed=0):
+    """Fills the catalog tables with synthetic rows.
+
+    Must be called inside an app context. Rows are inserted with executemany
+    so seeding large catalogs stays fast.
+
+    Args:
+        characters: number of Character rows.
+        skills: number of Skill rows.
+        cards: number of Card rows, spread over characters and skills.
+        seed: seed of the random stats.
+    """
+    rng = random.Random(seed)
+    db.session.execute(Character.__table__.insert(), [{
+        'name': 'Character {}'.format(i),
+        'age': str(rng.randint(14, 30)),
+        'height': '{} cm'.format(rng.randint(140, 180)),
+        'class_type': rng.choice(['Cool', 'Cute', 'Passion'])
+    } for i in range(characters)])
+    db.session.execute(Skill.__table__.insert(), [{
+        'name': 'Skill {}'.format(i),
+        'description': 'Score increased by {}%'.format(rng.randint(5, 60))
+    } for i in range(skills)])
+    if cards:
+        db.session.execute(Card.__table__.insert(), [{
+            'name': 'Card {}'.format(i),
+            'character': i % characters + 1,
+            'skill': i % skills + 1,
+            'rarity': rng.choice(RARITIES),
+            'stat_1': rng.randint(1, 9000),
+            'stat_2': rng.randint(1, 9000),
+            'stat_3': rng.randint(1, 9000),
+            'stat_4': rng.randint(1, 9000)
+        } for i in range(cards)])
+    db.session.commit()
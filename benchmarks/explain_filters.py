@@ -0,0 +1,76 @@
+"""EXPLAIN check of the GET /cards filters.
+
+Seeds a synthetic catalog, compiles the first page query of the common
+GET /cards filters the way the endpoint does and asserts that the query
+plan of each uses the matching Card index instead of scanning the table.
+Works on SQLite (EXPLAIN QUERY PLAN) and Postgres (EXPLAIN).
+
+Usage:
+    python -m benchmarks.explain_filters [cards] [database_uri]
+"""
+import sys
+
+from werkzeug.datastructures import MultiDict
+
+from database.database import db
+from database.card import Card
+from database.filters import parse_filters
+from .catalog import create_bench_app, seed_catalog
+
+# query string of each checked filter and the index it must use
+FILTERS = {
+    'rarity=SSR': 'ix_Card_rarity_id',
+    'character=5': 'ix_Card_character_id',
+    'skill=3': 'ix_Card_skill_id',
+    'character=5&stat_3_min=4000': 'ix_Card_character_id',
+}
+
+
+def compile_page_query(query_string, limit=100):
+    args = MultiDict(pair.split('=') for pair in query_string.split('&'))
+    clauses, _ = parse_filters(
+        Card, args, Card.filter_fields, Card.range_fields)
+    query = Card.info_query().filter(*clauses).order_by(Card.id) \
+        .limit(limit + 1)
+    statement = query.statement.compile(
+        dialect=db.engine.dialect, compile_kwargs={'literal_binds': True})
+    return str(statement)
+
+
+def explain(query_string):
+    statement = compile_page_query(query_string)
+    if db.engine.dialect.name == 'sqlite':
+        rows = db.session.execute('EXPLAIN QUERY PLAN ' + statement)
+        return '\n'.join(str(row[-1]) for row in rows)
+    rows = db.session.execute('EXPLAIN ' + statement)
+    return '\n'.join(row[0] for row in rows)
+
+
+def check_plans():
+    """Returns {query string: plan} and raises AssertionError if a filter
+    does not use its index. Must be called inside an app context."""
+    if db.engine.dialect.name == 'postgresql':
+        db.session.execute('ANALYZE "Card"')
+    plans = {}
+    for query_string, index in FILTERS.items():
+        plan = explain(query_string)
+        plans[query_string] = plan
+        assert index in plan, '{} does not use {}:\n{}'.format(
+            query_string, index, plan)
+    return plans
+
+
+def run(cards=50000, database_uri='sqlite://'):
+    app = create_bench_app(database_uri)
+    with app.app_context():
+        seed_catalog(characters=100, skills=100, cards=cards)
+        plans = check_plans()
+    for query_string, plan in plans.items():
+        print('GET /cards?' + query_string)
+        print('    ' + plan.replace('\n', '\n    '))
+    return plans
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 50000,
+        *sys.argv[2:3])
@@ -0,0 +1,388 @@
+"""Load test of every route of app.py.
+
+Seeds a synthetic catalog of `characters` characters, `skills` skills and
+`cards` cards, mints an RS256 token against a stub key set, then sends
+`requests` requests to each route of benchmarks.routes, after `warmup`
+unmeasured ones:
+
+    - through the Flask test client, one request at a time, in process,
+    - through a real gunicorn process with `workers` workers, from
+      `concurrency` client threads over HTTP.
+
+Reports requests per second and p50/p95/p99 latencies per route, saves
+them as JSON and compares them with a baseline saved by a previous run:
+a route whose throughput drops, or whose p95 latency rises, by more than
+`tolerance` is flagged as a regression and the run exits with status 1.
+Baselines only compare runs of the same catalog size, requests and
+machine.
+
+Runs on a temporary SQLite database by default. Given a database URI, its
+tables are dropped and recreated, use a database of its own.
+
+Usage:
+    python -m benchmarks.load [--mode {client,gunicorn,both}]
+        [--characters N] [--skills M] [--cards K] [--requests R]
+        [--database URI] [--baseline FILE] [--save-baseline]
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import APP, pull_pools, search_indexes
+from auth import auth
+from auth.jwks import JWKSCache
+from database.cache import catalog_cache
+from database.database import db, setup_db
+from .routes import build_routes, seed_load_catalog
+from .tokens import CONTRIBUTOR_PERMISSIONS, make_key, mint_token, write_jwks
+
+SUB = 'auth0|load'
+BASELINE = os.path.join(os.path.dirname(__file__), 'load_baseline.json')
+# Latency changes below this many milliseconds are noise, not regressions
+MIN_DELTA_MS = 2.0
+
+
+def percentile(ordered, p):
+    """Returns the nearest-rank p-th percentile of a sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(int(len(ordered) * p / 100.0 + 0.5), 1)
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(latencies, elapsed, errors):
+    """Returns the statistics of one route.
+
+    Args:
+        latencies: the seconds taken by each measured request.
+        elapsed: the wall clock seconds of the measured requests.
+        errors: the number of responses with an unexpected status.
+    """
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'errors': errors,
+        'rps': round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3)
+        if ordered else 0.0,
+        'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 3)
+    }
+
+
+def compare(results, baseline, tolerance=0.2):
+    """Returns the regressions of results against baseline.
+
+    Each regression is a (mode, route, metric, baseline, current) tuple,
+    for a throughput lower or a p95 latency higher by more than tolerance
+    (a fraction). Routes missing from either run are skipped.
+    """
+    regressions = []
+    for mode, routes in results.get('modes', {}).items():
+        base_routes = baseline.get('modes', {}).get(mode, {})
+        for name, current in routes.items():
+            base = base_routes.get(name)
+            if base is None:
+                continue
+            if current['rps'] < base['rps'] * (1 - tolerance):
+                regressions.append(
+                    (mode, name, 'rps', base['rps'], current['rps']))
+            if current['p95_ms'] > base['p95_ms'] * (1 + tolerance) and \
+                    current['p95_ms'] - base['p95_ms'] > MIN_DELTA_MS:
+                regressions.append(
+                    (mode, name, 'p95_ms', base['p95_ms'], current['p95_ms']))
+    return regressions
+
+
+def run_route(route, send, pools, requests, warmup, concurrency=1):
+    """Sends the warmup and measured requests of route.
+
+    Args:
+        route: the benchmarks.routes.Route.
+        send: function(method, path, body) returning the (status, json)
+            of the response.
+        pools: the ids created by earlier routes.
+        requests: the number of measured requests.
+        warmup: the number of requests sent first, not measured.
+        concurrency: the number of threads sending requests.
+    """
+    def one(i):
+        method, path, body = route.request(i, pools)
+        start = time.perf_counter()
+        status, response = send(method, path, body)
+        elapsed = time.perf_counter() - start
+        route.record(pools, response)
+        return elapsed, status
+
+    for i in range(warmup):
+        one(i)
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(concurrency) as executor:
+            timings = list(executor.map(
+                one, range(warmup, warmup + requests)))
+    else:
+        timings = [one(i) for i in range(warmup, warmup + requests)]
+    elapsed = time.perf_counter() - start
+    return summarize([latency for latency, _ in timings], elapsed,
+                     sum(1 for _, status in timings if status != 200))
+
+
+def _decode(data, content_type):
+    if content_type and content_type.startswith('application/json'):
+        return json.loads(data)
+    return None
+
+
+def client_sender(app, headers):
+    """Returns the send function of the Flask test client of app."""
+    client = app.test_client()
+
+    def send(method, path, body):
+        response = client.open(path, method=method, json=body,
+                               headers=headers)
+        # streamed responses are read to the end, as a client would
+        data = response.get_data()
+        response.close()
+        return response.status_code, _decode(data, response.content_type)
+    return send
+
+
+def http_sender(port, headers):
+    """Returns the send function of a server on localhost:port, one
+        keep-alive connection per client thread."""
+    local = threading.local()
+
+    def send(method, path, body):
+        data = None if body is None else json.dumps(body)
+        request_headers = dict(headers)
+        if data is not None:
+            request_headers['Content-Type'] = 'application/json'
+        for attempt in (0, 1):
+            if getattr(local, 'connection', None) is None:
+                local.connection = http.client.HTTPConnection(
+                    '127.0.0.1', port, timeout=60)
+            try:
+                local.connection.request(method, path, data, request_headers)
+                response = local.connection.getresponse()
+                payload = response.read()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                # the server closed the kept-alive connection
+                local.connection.close()
+                local.connection = None
+                if attempt:
+                    raise
+        return response.status, _decode(
+            payload, response.getheader('Content-Type'))
+    return send
+
+
+def run_routes(routes, send, requests, warmup, concurrency=1, mode=''):
+    results = {}
+    pools = {}
+    for route in routes:
+        results[route.name] = stats = run_route(
+            route, send, pools, requests, warmup, concurrency)
+        print('{:<8} {:<52} {:>9.1f} {:>9.2f} {:>9.2f} {:>9.2f} {:>6}'
+              .format(mode, route.name[:52], stats['rps'], stats['p50_ms'],
+                      stats['p95_ms'], stats['p99_ms'], stats['errors']))
+        sys.stdout.flush()
+    return results
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_gunicorn(database_uri, jwks_path, workers, threads, timeout=30):
+    """Starts gunicorn serving benchmarks.wsgi and waits until it answers.
+
+    Returns:
+        A tuple (process, port).
+    """
+    port = _free_port()
+    env = dict(os.environ, LOAD_DATABASE_URI=database_uri,
+               AUTH0_JWKS_SOURCE=jwks_path)
+    process = subprocess.Popen(
+        [sys.executable, '-c', 'from gunicorn.app.wsgiapp import run; run()',
+         '--workers', str(workers),
+         '--threads', str(threads), '--bind', '127.0.0.1:{}'.format(port),
+         '--log-level', 'warning', 'benchmarks.wsgi:app'],
+        env=env, cwd=os.path.dirname(os.path.dirname(__file__)))
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('gunicorn exited with status {}'.format(
+                process.returncode))
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port,
+                                                    timeout=1)
+            connection.request('GET', '/versions')
+            if connection.getresponse().status == 200:
+                return process, port
+        except OSError:
+            time.sleep(0.1)
+        finally:
+            connection.close()
+    process.terminate()
+    raise RuntimeError('gunicorn did not start within {}s'.format(timeout))
+
+
+def run(characters=100, skills=50, cards=5000, requests=200, warmup=20,
+        mode='both', workers=2, threads=1, concurrency=4, database_uri=None,
+        match=None):
+    """Seeds the catalog and load tests the routes.
+
+    Returns:
+        The results, {"meta": settings, "modes": {mode: {route: stats}}}.
+    """
+    pem, jwk = make_key('load')
+    fd, jwks_path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    write_jwks(jwks_path, [jwk])
+    database_path = None
+    if database_uri is None:
+        fd, database_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        database_uri = 'sqlite:///' + database_path
+    token = mint_token(pem, 'load', CONTRIBUTOR_PERMISSIONS, sub=SUB,
+                       expires_in=24 * 3600)
+    headers = {'Authorization': 'Bearer ' + token}
+
+    original_jwks_cache = auth.jwks_cache
+    auth.jwks_cache = JWKSCache(jwks_path)
+    setup_db(APP, database_uri)
+    results = {
+        'meta': {
+            'characters': characters,
+            'skills': skills,
+            'cards': cards,
+            'requests': requests,
+            'warmup': warmup,
+            'workers': workers,
+            'threads': threads,
+            'concurrency': concurrency,
+            'database': database_uri.split(':', 1)[0],
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count()
+        },
+        'modes': {}
+    }
+    modes = ('client', 'gunicorn') if mode == 'both' else (mode,)
+    print('{:<8} {:<52} {:>9} {:>9} {:>9} {:>9} {:>6}'.format(
+        'mode', 'route', 'req/s', 'p50 ms', 'p95 ms', 'p99 ms', 'errors'))
+    try:
+        for current in modes:
+            # every mode starts from the same catalog
+            with APP.app_context():
+                db.drop_all()
+                db.create_all()
+                seed_load_catalog(characters, skills, cards, SUB)
+                db.session.remove()
+                db.engine.dispose()
+            # the catalog versions start over with the new tables
+            for cache in (catalog_cache, pull_pools, search_indexes):
+                cache.clear()
+            routes = [route for route in build_routes(
+                characters, skills, cards)
+                if match is None or match in route.name]
+            if current == 'client':
+                results['modes'][current] = run_routes(
+                    routes, client_sender(APP, headers), requests, warmup,
+                    mode=current)
+                continue
+            process, port = start_gunicorn(database_uri, jwks_path,
+                                           workers, threads)
+            try:
+                results['modes'][current] = run_routes(
+                    routes, http_sender(port, headers), requests, warmup,
+                    concurrency, mode=current)
+            finally:
+                process.terminate()
+                process.wait()
+    finally:
+        auth.jwks_cache = original_jwks_cache
+        os.remove(jwks_path)
+        if database_path is not None:
+            os.remove(database_path)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.load',
+        description='Load test of every route of app.py.')
+    parser.add_argument('--mode', choices=('client', 'gunicorn', 'both'),
+                        default='both')
+    parser.add_argument('--characters', type=int, default=100)
+    parser.add_argument('--skills', type=int, default=50)
+    parser.add_argument('--cards', type=int, default=5000)
+    parser.add_argument('--requests', type=int, default=200,
+                        help='measured requests per route')
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=2,
+                        help='gunicorn worker processes')
+    parser.add_argument('--threads', type=int, default=1,
+                        help='threads of each gunicorn worker')
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help='client threads sending requests to gunicorn')
+    parser.add_argument('--database', default=None,
+                        help='database URI, its tables are recreated '
+                        '(default a temporary SQLite file)')
+    parser.add_argument('--routes', default=None,
+                        help='only the routes whose name contains this')
+    parser.add_argument('--output', default='load_results.json')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='save the results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='fraction of change flagged as a regression')
+    args = parser.parse_args(argv)
+
+    results = run(args.characters, args.skills, args.cards, args.requests,
+                  args.warmup, args.mode, args.workers, args.threads,
+                  args.concurrency, args.database, args.routes)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print('results saved to ' + args.output)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print('baseline saved to ' + args.baseline)
+        return 0
+    if not os.path.exists(args.baseline):
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    changed = [key for key in ('characters', 'skills', 'cards', 'requests')
+               if baseline['meta'].get(key) != results['meta'][key]]
+    if changed:
+        print('baseline skipped, it ran with other settings: ' +
+              ', '.join(changed))
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    for mode, name, metric, before, after in regressions:
+        print('REGRESSION {} {} {}: {} -> {}'.format(
+            mode, name, metric, before, after))
+    if not regressions:
+        print('no regression against ' + args.baseline)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
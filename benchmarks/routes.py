@@ -0,0 +1,208 @@
+"""Requests of the load test, covering every route of app.py.
+
+Each Route builds the path and json body of its i-th request. Routes which
+need rows of their own, the deletes and bulk updates, take the ids created
+by the responses of an earlier route of the same run: a route with
+`creates` adds the comma separated ids of the rows in its responses to a
+pool, named `pool` or after the key, a route with `takes` fills the
+`{ids}` of its path with one entry of that pool, and removes it with
+`consume=True`. Every route runs the same
+number of requests, so each delete finds a row created for it.
+"""
+import threading
+from urllib.parse import quote
+
+from database.banner import Banner, BannerRate
+from database.card import Card
+from database.database import db
+from database.inventory import record_pull
+from .catalog import seed_catalog
+
+BANNER_RATES = {'N': 60, 'R': 25, 'SR': 10, 'SSR': 4, 'UR': 1}
+SEARCHES = ('Card 42', 'card 1', 'character', 'skill 3', 'ca', 's')
+BULK_ITEMS = 10
+
+
+def _constant(value):
+    return lambda i: value
+
+
+class Route:
+    """One request of the load test.
+
+    Args:
+        method: the HTTP method.
+        path: the path, or a function(i) returning the path of the i-th
+            request, which may hold an `{ids}` placeholder.
+        body: the json body, or a function(i) returning it (optional).
+        name: the name of the results, defaults to 'METHOD path'.
+        creates: the json key of the rows created by the responses, whose
+            ids are pooled (optional).
+        pool: the name of the pool of created ids, defaults to creates.
+        takes: the key of the pool filling `{ids}` (optional).
+        consume: whether the ids taken are removed from their pool.
+    """
+
+    def __init__(self, method, path, body=None, name=None, creates=None,
+                 pool=None, takes=None, consume=False):
+        self.method = method
+        self.path = path if callable(path) else _constant(path)
+        self.body = body if callable(body) or body is None \
+            else _constant(body)
+        self.name = name or '{} {}'.format(
+            method, path if isinstance(path, str) else path(0)).replace(
+            '{ids}', '<ids>')
+        self.creates = creates
+        self.pool = pool or creates
+        self.takes = takes
+        self.consume = consume
+
+    def request(self, i, pools):
+        """Returns the (method, path, body) of the i-th request."""
+        path = self.path(i)
+        if self.takes is not None:
+            pool = pools.setdefault(self.takes, [])
+            ids = pool.pop() if self.consume else pool[i % len(pool)]
+            path = path.format(ids=ids)
+        body = self.body(i) if self.body is not None else None
+        return self.method, path, body
+
+    def record(self, pools, response):
+        """Pools the ids of the rows created by the json response."""
+        if self.creates is not None and response:
+            rows = response.get(self.creates) or []
+            pools.setdefault(self.pool, []).append(
+                ','.join(str(row['id']) for row in rows))
+
+
+def _unique(prefix):
+    # names stay unique across the threads of a run
+    lock = threading.Lock()
+    counter = iter(range(1 << 62))
+
+    def name():
+        with lock:
+            return '{} {}'.format(prefix, next(counter))
+    return name
+
+
+def build_routes(characters, skills, cards):
+    """Returns the routes of a catalog seeded by seed_load_catalog()."""
+    character_name = _unique('Load character')
+    skill_name = _unique('Load skill')
+    card_name = _unique('Load card')
+    banner_name = _unique('Load banner')
+
+    def card_body(i):
+        return {
+            'name': card_name(),
+            'character': i % characters + 1,
+            'skill': i % skills + 1,
+            'rarity': 'R',
+            'stat_1': i % 9000 + 1,
+            'stat_2': 100,
+            'stat_3': 200,
+            'stat_4': 300
+        }
+
+    def card_id(i):
+        return i % cards + 1
+
+    return [
+        # reads
+        Route('GET', '/characters?limit=100'),
+        Route('GET', lambda i: '/characters/{}'.format(i % characters + 1),
+              name='GET /characters/<id>'),
+        Route('GET', '/cards?limit=100'),
+        Route('GET', '/cards?limit=100&rarity=SSR'),
+        Route('GET', '/cards?limit=100&expand=character,skill'),
+        Route('GET', '/cards?limit=100&sort=score:desc'),
+        Route('GET', '/cards/top?n=50'),
+        Route('GET', lambda i: '/cards/{}'.format(card_id(i)),
+              name='GET /cards/<id>'),
+        Route('GET', lambda i: '/cards/{}?expand=character,skill'.format(
+            card_id(i)), name='GET /cards/<id>?expand=character,skill'),
+        Route('GET', '/cards/export?format=ndjson'),
+        Route('GET', '/skills?limit=100'),
+        Route('GET', lambda i: '/skills/{}'.format(i % skills + 1),
+              name='GET /skills/<id>'),
+        Route('GET', '/banners'),
+        Route('GET', '/banners/1'),
+        Route('GET', '/banners/1/analysis?rarity=SSR&sims=10000&seed=1'),
+        Route('GET', '/me/inventory'),
+        Route('GET', lambda i: '/search?q=' + quote(
+            SEARCHES[i % len(SEARCHES)]), name='GET /search?q=<q>'),
+        Route('GET', '/versions'),
+        Route('GET', '/stats'),
+        Route('GET', '/metrics'),
+        # writes
+        Route('POST', '/banners/1/pull?count=10'),
+        Route('POST', '/characters',
+              lambda i: {'name': character_name(), 'class_type': 'Cool'},
+              creates='character'),
+        Route('PATCH', lambda i: '/characters/{}'.format(
+            i % characters + 1), {'hobbies': 'Benchmarks'},
+            name='PATCH /characters/<id>'),
+        Route('DELETE', '/characters/{ids}', name='DELETE /characters/<id>',
+              takes='character', consume=True),
+        Route('POST', '/characters/bulk', lambda i: [
+            {'name': character_name(), 'class_type': 'Cute'}
+            for _ in range(BULK_ITEMS)], creates='character',
+            pool='character_bulk'),
+        Route('PATCH', '/characters/bulk?ids={ids}', {'hobbies': 'Bulk'},
+              takes='character_bulk'),
+        Route('DELETE', '/characters/bulk?ids={ids}',
+              takes='character_bulk', consume=True),
+        Route('POST', '/skills',
+              lambda i: {'name': skill_name(), 'description': 'Load'},
+              creates='skill'),
+        Route('PATCH', lambda i: '/skills/{}'.format(i % skills + 1),
+              {'description': 'Score increased by 10%'},
+              name='PATCH /skills/<id>'),
+        Route('DELETE', '/skills/{ids}', name='DELETE /skills/<id>',
+              takes='skill', consume=True),
+        Route('POST', '/skills/bulk', lambda i: [
+            {'name': skill_name(), 'description': 'Bulk'}
+            for _ in range(BULK_ITEMS)], creates='skill', pool='skill_bulk'),
+        Route('PATCH', '/skills/bulk?ids={ids}', {'description': 'Bulk'},
+              takes='skill_bulk'),
+        Route('DELETE', '/skills/bulk?ids={ids}', takes='skill_bulk',
+              consume=True),
+        Route('POST', '/cards', card_body, creates='card'),
+        Route('PATCH', lambda i: '/cards/{}'.format(card_id(i)),
+              lambda i: {'stat_1': i % 9000 + 1}, name='PATCH /cards/<id>'),
+        Route('DELETE', '/cards/{ids}', name='DELETE /cards/<id>',
+              takes='card', consume=True),
+        Route('POST', '/cards/bulk', lambda i: [
+            card_body(i + j) for j in range(BULK_ITEMS)],
+            creates='card', pool='card_bulk'),
+        Route('PATCH', '/cards/bulk?ids={ids}', {'stat_2': 150},
+              takes='card_bulk'),
+        Route('DELETE', '/cards/bulk?ids={ids}', takes='card_bulk',
+              consume=True),
+        Route('POST', '/banners', lambda i: {
+            'name': banner_name(), 'rates': BANNER_RATES},
+            creates='banner'),
+        Route('DELETE', '/banners/{ids}', name='DELETE /banners/<id>',
+              takes='banner', consume=True)
+    ]
+
+
+def seed_load_catalog(characters, skills, cards, sub, seed=0):
+    """Seeds the catalog of the load test.
+
+    Must be called inside an app context, on empty tables. Adds to the
+    rows of seed_catalog() banner 1, featuring the first SSR card, and one
+    10-pull of banner 1 to the inventory of the user sub.
+    """
+    seed_catalog(characters, skills, cards, seed)
+    featured = Card.query.filter(Card.rarity == 'SSR').limit(1).all()
+    banner = Banner(
+        name='Load banner',
+        featured_rate=0.5,
+        rates=[BannerRate(rarity=rarity, rate=rate)
+               for rarity, rate in BANNER_RATES.items()],
+        featured=featured)
+    db.session.add(banner)
+    db.session.commit()
+    record_pull(sub, banner.id, [i % cards + 1 for i in range(10)])
@@ -0,0 +1,68 @@
+import base64
+import json
+import time
+
+from Crypto.PublicKey import RSA
+from jose import jwt
+
+from auth import auth
+
+
+""" Stub signing keys and locally minted RS256 tokens """
+
+MEMBER_PERMISSIONS = [
+    'get:banner', 'get:banners', 'get:card', 'get:cards', 'get:character',
+    'get:characters', 'get:inventory', 'get:search', 'get:skill',
+    'get:skills', 'post:pull'
+]
+
+CONTRIBUTOR_PERMISSIONS = MEMBER_PERMISSIONS + [
+    'delete:banner', 'delete:card', 'delete:character', 'delete:skill',
+    'patch:card', 'patch:character', 'patch:skill',
+    'post:banner', 'post:card', 'post:character', 'post:skill'
+]
+
+
+def _b64url_uint(value):
+    data = value.to_bytes((value.bit_length() + 7) // 8, 'big')
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def make_key(kid='bench'):
+    """Generates an RSA key pair.
+
+    Returns:
+        A tuple (pem, jwk) of the PEM encoded private key and the public
+        key as a JWK.
+    """
+    private_key = RSA.generate(2048)
+    pem = private_key.exportKey('PEM').decode('ascii')
+    jwk = {
+        'kty': 'RSA',
+        'kid': kid,
+        'use': 'sig',
+        'alg': 'RS256',
+        'n': _b64url_uint(private_key.n),
+        'e': _b64url_uint(private_key.e)
+    }
+    return pem, jwk
+
+
+def write_jwks(path, jwks):
+    """Writes a stub jwks.json containing the given JWKs."""
+    with open(path, 'w') as f:
+        json.dump({'keys': list(jwks)}, f)
+
+
+def mint_token(pem, kid, permissions, sub='auth0|bench', expires_in=3600):
+    """Mints an RS256 token accepted by auth.verify_decode_jwt."""
+    now = int(time.time())
+    claims = {
+        'iss': 'https://' + auth.AUTH0_DOMAIN + '/',
+        'sub': sub,
+        'aud': auth.API_AUDIENCE,
+        'iat': now,
+        'exp': now + expires_in,
+        'permissions': list(permissions)
+    }
+    return jwt.encode(claims, pem, algorithm='RS256', headers={'kid': kid})
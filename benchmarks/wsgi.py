@@ -0,0 +1,15 @@
+"""WSGI entry point of the gunicorn load test.
+
+Serves app.py on the database of LOAD_DATABASE_URI, seeded by
+benchmarks.load, with the signing keys of AUTH0_JWKS_SOURCE.
+
+Usage:
+    LOAD_DATABASE_URI=sqlite:////tmp/load.db \\
+    AUTH0_JWKS_SOURCE=/tmp/jwks.json gunicorn benchmarks.wsgi:app
+"""
+import os
+
+from app import APP as app
+from database.database import setup_db
+
+setup_db(app, os.environ['LOAD_DATABASE_URI'])
@@ -0,0 +1,105 @@
+import json
+from sqlalchemy import String
+from sqlalchemy.orm import relationship
+from .database import db
+from .card import Card
+
+'''
+BannerCard
+    the featured cards of a banner
+
+'''
+
+BannerCard = db.Table(
+    'BannerCard',
+    db.Column('banner', db.Integer,
+              db.ForeignKey('Banner.id', ondelete='CASCADE'),
+              primary_key=True),
+    db.Column('card', db.Integer,
+              db.ForeignKey('Card.id', ondelete='CASCADE'),
+              primary_key=True)
+)
+
+'''
+BannerRate
+    the pull rate of one rarity on a banner
+
+'''
+
+
+class BannerRate(db.Model):
+    __tablename__ = 'BannerRate'
+    # Banner
+    banner = db.Column(db.Integer,
+                       db.ForeignKey('Banner.id', ondelete='CASCADE'),
+                       primary_key=True)
+    # Rarity, a Card.rarity value
+    rarity = db.Column(String(80), primary_key=True)
+    # Relative weight of the rarity, rates are normalized per banner
+    rate = db.Column(db.Float, nullable=False)
+
+
+'''
+Banner
+    a set of rarity rates and featured cards that pulls are drawn from
+    every card of a rarity with a rate can be drawn, featured cards share
+    featured_rate of the draws of their rarity
+    banners are immutable, so that the pull tables built from them only
+    depend on the banner and the Card catalog version
+
+'''
+
+
+class Banner(db.Model):
+    __tablename__ = 'Banner'
+    # Autoincrementing, unique primary key
+    id = db.Column(db.Integer, primary_key=True)
+    # Name
+    name = db.Column(String(80), nullable=False)
+    # Share of the draws of a rarity that go to its featured cards
+    featured_rate = db.Column(db.Float, nullable=False, default=0.5)
+    # Rates and featured cards are deleted by the database with the banner
+    rates = relationship("BannerRate", cascade="all, delete-orphan",
+                         passive_deletes=True, lazy="selectin")
+    featured = relationship("Card", secondary=BannerCard,
+                            passive_deletes=True, lazy="selectin")
+
+    '''
+    info()
+        info of the banner model
+    '''
+    def info(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'featured_rate': self.featured_rate,
+            'rates': {rate.rarity: rate.rate for rate in self.rates},
+            'featured': sorted(card.id for card in self.featured)
+        }
+
+    '''
+    insert()
+        inserts a new model into a database
+        the model must have a unique id or null id
+        EXAMPLE
+            banner = Banner(name=req_name, rates=[BannerRate(...)], ...)
+            banner.insert()
+    '''
+    def insert(self):
+        db.session.add(self)
+        db.session.commit()
+
+    '''
+    delete()
+        deletes a model in a database
+        the model must exist in the database
+        EXAMPLE
+            banner = Banner.query.get(banner_id)
+            banner.delete()
+    '''
+    def delete(self):
+        db.session.delete(self)
+        db.session.commit()
+
+    def __repr__(self):
+        return json.dumps(self.info())
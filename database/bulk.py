@@ -0,0 +1,257 @@
+from sqlalchemy import Integer, String, and_, or_, select
+from .database import db
+from .catalog_version import CASCADES, CatalogVersion
+
+# Rows per INSERT statement, well below the bind parameter limits
+BULK_CHUNK_SIZE = 1000
+
+'''
+to_integer(value)
+    converts a request value for an integer column, accepting integers and
+    integer strings, raises ValueError or TypeError for anything else,
+    including booleans and floats such as true or 1.9
+    EXAMPLE
+        stat_1 = to_integer(body['stat_1'])
+'''
+
+
+def to_integer(value):
+    if isinstance(value, bool) or isinstance(value, float):
+        raise ValueError()
+    return int(value)
+
+
+'''
+validate_items(model, items, fields, partial=False)
+    validates the request items of a bulk create against the columns of
+    model, fields are the accepted keys of each item
+    integer columns accept integers or integer strings, string columns
+    must fit their length and non-nullable columns are required
+    with partial=True only the fields present in an item are checked and
+    returned, as for the values of a bulk update or a filter
+    returns the rows to insert and a list of {"index": i, "errors": {...}}
+    for the invalid items, the rows are only complete if there are no errors
+    EXAMPLE
+        rows, errors = validate_items(Card, body, Card.info_fields[1:])
+'''
+
+
+def validate_items(model, items, fields, partial=False):
+    columns = model.__table__.c
+    rows = []
+    errors = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append({'index': index, 'errors': {
+                'item': 'must be an object'}})
+            continue
+        row = {}
+        item_errors = {}
+        for field in fields:
+            if partial and field not in item:
+                continue
+            column = columns[field]
+            value = item.get(field, None)
+            if value is None:
+                if not column.nullable:
+                    item_errors[field] = 'is required'
+                row[field] = None
+                continue
+            if isinstance(column.type, Integer):
+                try:
+                    value = to_integer(value)
+                except (TypeError, ValueError):
+                    item_errors[field] = 'must be an integer'
+            elif isinstance(column.type, String):
+                if not isinstance(value, str):
+                    item_errors[field] = 'must be a string'
+                elif column.type.length and len(value) > column.type.length:
+                    item_errors[field] = 'must be at most {} characters' \
+                        .format(column.type.length)
+            row[field] = value
+        unknown = set(item) - set(fields)
+        for field in unknown:
+            item_errors[field] = 'is not a field'
+        if item_errors:
+            errors.append({'index': index, 'errors': item_errors})
+        rows.append(row)
+    return rows, errors
+
+
+'''
+check_references(rows, field, model, errors)
+    appends an error for each row whose field references a missing row of
+    model, using a single query for the whole batch
+'''
+
+
+def check_references(rows, field, model, errors):
+    ids = {row[field] for row in rows if isinstance(row.get(field), int)}
+    if not ids:
+        return
+    existing = {row.id for row in db.session.query(model.id).filter(
+        model.id.in_(ids))}
+    invalid = {}
+    for index, row in enumerate(rows):
+        value = row.get(field)
+        if isinstance(value, int) and value not in existing:
+            invalid[index] = value
+    for error in errors:
+        if error['index'] in invalid:
+            error['errors'][field] = 'does not exist'
+            del invalid[error['index']]
+    for index in invalid:
+        errors.append({'index': index, 'errors': {field: 'does not exist'}})
+    errors.sort(key=lambda error: error['index'])
+
+
+'''
+check_unique(rows, field, model, errors)
+    appends an error for each row whose field duplicates another row of the
+    batch or an existing row of model, using a single query for the batch
+'''
+
+
+def check_unique(rows, field, model, errors):
+    values = [row.get(field) for row in rows]
+    existing = {row[0] for row in db.session.query(
+        getattr(model, field)).filter(
+        getattr(model, field).in_({v for v in values if v is not None}))}
+    seen = set()
+    invalid = set()
+    for index, value in enumerate(values):
+        if value is None:
+            continue
+        if value in existing or value in seen:
+            invalid.add(index)
+        seen.add(value)
+    for error in errors:
+        if error['index'] in invalid:
+            error['errors'][field] = 'is not unique'
+            invalid.discard(error['index'])
+    for index in invalid:
+        errors.append({'index': index, 'errors': {field: 'is not unique'}})
+    errors.sort(key=lambda error: error['index'])
+
+
+'''
+bulk_insert(model, rows)
+    inserts rows into the table of model in one transaction, with one
+    multi-row INSERT ... VALUES ... RETURNING id statement per
+    BULK_CHUNK_SIZE rows on databases supporting RETURNING and
+    bulk_insert_mappings elsewhere, bumps the catalog version of the table
+    and commits
+    returns the ids of the inserted rows in the order of rows
+    EXAMPLE
+        ids = bulk_insert(Card, rows)
+'''
+
+
+def bulk_insert(model, rows):
+    table = model.__table__
+    ids = []
+    try:
+        if db.engine.dialect.name == 'postgresql':
+            for start in range(0, len(rows), BULK_CHUNK_SIZE):
+                chunk = rows[start:start + BULK_CHUNK_SIZE]
+                result = db.session.execute(
+                    table.insert().values(chunk).returning(table.c.id))
+                ids.extend(row[0] for row in result)
+        else:
+            mappings = [dict(row) for row in rows]
+            db.session.bulk_insert_mappings(
+                model, mappings, return_defaults=True)
+            ids = [mapping['id'] for mapping in mappings]
+        CatalogVersion.bump(db.session, [table.name])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return ids
+
+
+'''
+bulk_where(model, ids=None, filters=None)
+    returns the WHERE clause selecting the rows of model whose id is in ids
+    and whose columns equal every value of filters, or None if neither is
+    given so that a missing selector never matches the whole table
+    EXAMPLE
+        where = bulk_where(Card, filters={'rarity': 'SSR', 'character': 5})
+'''
+
+
+def bulk_where(model, ids=None, filters=None):
+    clauses = []
+    if ids:
+        clauses.append(model.id.in_(ids))
+    for field, value in (filters or {}).items():
+        clauses.append(getattr(model, field) == value)
+    if not clauses:
+        return None
+    return and_(*clauses)
+
+
+'''
+bulk_update(model, where, values)
+    sets values on every row of model matching where with a single
+    UPDATE ... WHERE statement, recomputing the derived columns of the
+    cards whose stats change in the same statement, bumps the catalog
+    version of the table and commits
+    returns the number of updated rows
+    EXAMPLE
+        count = bulk_update(Card, bulk_where(Card, filters={'rarity': 'SSR'}),
+                            {'stat_1': 9000})
+'''
+
+
+def bulk_update(model, where, values):
+    table = model.__table__
+    if set(values) & set(getattr(model, 'derived_from', ())):
+        values = dict(values, **model.derived_values(values))
+    try:
+        count = db.session.execute(
+            table.update().where(where).values(values)).rowcount
+        if count:
+            CatalogVersion.bump(db.session, [table.name])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return count
+
+
+'''
+bulk_delete(model, where)
+    deletes every row of model matching where with a single
+    DELETE ... WHERE statement, after deleting the rows of the CASCADES
+    tables referencing them with one DELETE ... WHERE ... IN (SELECT ...)
+    per foreign key, the same rows the ORM delete cascade of
+    Character.cards and Skill.cards removes
+    bumps the catalog versions and commits
+    returns a dict of deleted row counts keyed by table name
+    EXAMPLE
+        counts = bulk_delete(Character, bulk_where(Character, ids=[1, 2]))
+'''
+
+
+def bulk_delete(model, where):
+    table = model.__table__
+    counts = {}
+    try:
+        selected = select([table.c.id]).where(where)
+        for name in CASCADES.get(table.name, ()):
+            child = db.metadata.tables[name]
+            child_where = or_(*[
+                key.parent.in_(selected) for key in child.foreign_keys
+                if key.column.table is table])
+            counts[name] = db.session.execute(
+                child.delete().where(child_where)).rowcount
+        counts[table.name] = db.session.execute(
+            table.delete().where(where)).rowcount
+        CatalogVersion.bump(db.session, [
+            name for name, deleted in counts.items() if deleted])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return counts
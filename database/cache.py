@@ -0,0 +1,242 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+'''
+Cache backends
+    a backend stores JSON-serializable values with a time to live
+        get(key), set(key, value, ttl)
+    entries are never invalidated, their keys hold the catalog version so
+    a per-process backend is as correct as a shared one, only less
+    effective
+
+MemoryBackend
+    a per-process LRU store, for single-process deployments, tests and as
+    the near cache in front of a shared backend
+'''
+
+
+class MemoryBackend:
+    name = 'memory'
+
+    def __init__(self, max_entries=10000, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self.clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def size(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+'''
+RedisBackend
+    a store shared by every gunicorn worker through any server speaking the
+    Redis protocol, values are stored as JSON under `prefix`, so an entry
+    loaded by one worker is a hit for all of them
+    requires the redis package, a client (e.g. a fakeredis client in tests)
+    can be passed instead of a URL
+'''
+
+
+class RedisBackend:
+    name = 'redis'
+
+    def __init__(self, url=None, client=None, prefix='gacha:'):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError(
+                    'The redis package is required for CACHE_URL=' + url)
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.set(
+            self.prefix + key, json.dumps(value), px=max(int(ttl * 1000), 1))
+
+    def size(self):
+        return None
+
+
+def create_backend(url):
+    """Returns the cache backend for a CACHE_URL.
+
+    Args:
+        url: 'memory://' for the per-process backend or a redis:// (or
+            rediss://, unix://) URL for the shared backend.
+    """
+    if url.startswith('memory://'):
+        return MemoryBackend(
+            max_entries=int(os.environ.get('CACHE_SIZE', 10000)))
+    return RedisBackend(url)
+
+
+'''
+CatalogCache
+    a read-through cache of serialized entities keyed by (model, catalog
+    version, id) and of list pages keyed by (model, catalog version, query
+    parameters), in front of a backend
+    every write bumps the CatalogVersion of the tables it touches, so
+    entries written before it are simply never read again and expire with
+    their time to live, whichever worker and backend served them
+    the version must be read before load() runs, so that a write racing
+    the load can only store newer rows under the older version
+    with a shared backend, a small per-process near cache with a short
+    time to live absorbs the hottest keys without a network round trip
+    backend errors are logged and treated as cache misses
+    EXAMPLE
+        card = catalog_cache.get_or_load(
+            'Card', card_id, CatalogVersion.current('Card')[0],
+            lambda: load_card(card_id))
+'''
+
+
+class CatalogCache:
+    def __init__(self, backend, ttl=300, near_cache_size=0, near_cache_ttl=5):
+        self.backend = backend
+        self.ttl = ttl
+        self.near = MemoryBackend(near_cache_size) \
+            if near_cache_size > 0 else None
+        self.near_cache_ttl = near_cache_ttl
+        self._lock = threading.Lock()
+        self._hits = {}
+        self._misses = {}
+
+    @staticmethod
+    def entity_key(model, version, entity_id):
+        return 'entity:{}:{}:{}'.format(model, version, entity_id)
+
+    def _count(self, counters, name):
+        with self._lock:
+            counters[name] = counters.get(name, 0) + 1
+
+    def _get(self, key):
+        if self.near is not None:
+            value = self.near.get(key)
+            if value is not None:
+                return value
+        try:
+            value = self.backend.get(key)
+        except Exception:
+            logger.exception('Cache backend get failed')
+            return None
+        if value is not None and self.near is not None:
+            self.near.set(key, value, self.near_cache_ttl)
+        return value
+
+    def _set(self, key, value):
+        try:
+            self.backend.set(key, value, self.ttl)
+        except Exception:
+            logger.exception('Cache backend set failed')
+
+    def _load(self, stat, key, load):
+        value = self._get(key)
+        if value is not None:
+            self._count(self._hits, stat)
+            return value
+        self._count(self._misses, stat)
+        value = load()
+        if value is not None:
+            self._set(key, value)
+        return value
+
+    '''
+    get_or_load(model, entity_id, version, load)
+        returns the cached entity for the catalog version of model or calls
+        load() and caches its result
+        None results are not cached
+    '''
+    def get_or_load(self, model, entity_id, version, load):
+        return self._load(
+            model, self.entity_key(model, version, entity_id), load)
+
+    '''
+    get_or_load_page(model, version, params, load)
+        returns the cached list page of model for the catalog version and
+        query parameters or calls load() and caches its result
+    '''
+    def get_or_load_page(self, model, version, params, load):
+        key = 'page:{}:{}:{}'.format(model, version, params)
+        return self._load(model + ' pages', key, load)
+
+    def clear(self):
+        if self.near is not None:
+            self.near.clear()
+        if isinstance(self.backend, MemoryBackend):
+            self.backend.clear()
+        with self._lock:
+            self._hits.clear()
+            self._misses.clear()
+
+    '''
+    stats()
+        hit/miss counters and hit ratio of this process per model
+    '''
+    def stats(self):
+        with self._lock:
+            models = {}
+            for name in set(self._hits) | set(self._misses):
+                hits = self._hits.get(name, 0)
+                misses = self._misses.get(name, 0)
+                models[name] = {
+                    'hits': hits,
+                    'misses': misses,
+                    'hit_ratio': hits / (hits + misses)
+                }
+        return {
+            'backend': self.backend.name,
+            'size': self.backend.size(),
+            'near_cache_size': self.near.size() if self.near else None,
+            'ttl': self.ttl,
+            'models': models
+        }
+
+
+CACHE_URL = os.environ.get('CACHE_URL', 'memory://')
+
+catalog_cache = CatalogCache(
+    create_backend(CACHE_URL),
+    ttl=float(os.environ.get('CACHE_TTL', 300)),
+    # the near cache only pays off in front of a shared backend
+    near_cache_size=0 if CACHE_URL.startswith('memory://')
+    else int(os.environ.get('CACHE_NEAR_SIZE', 1000)),
+    near_cache_ttl=float(os.environ.get('CACHE_NEAR_TTL', 5))
+)
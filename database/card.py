@@ -4,22 +4,63 @@ from flask_sqlalchemy import SQLAlchemy
 import json
 from .database import db
 
+'''
+STAT_FIELDS, SCORE_WEIGHTS
+    the stats of a card and their weights in its score, set
+    CARD_SCORE_WEIGHTS to four comma separated weights to change them, then
+    run flask rescore-cards to recompute the stored scores
+
+'''
+
+STAT_FIELDS = ('stat_1', 'stat_2', 'stat_3', 'stat_4')
+SCORE_WEIGHTS = tuple(float(weight) for weight in os.environ.get(
+    'CARD_SCORE_WEIGHTS', '1,1,1,1').split(','))
+if len(SCORE_WEIGHTS) != len(STAT_FIELDS):
+    raise ValueError('CARD_SCORE_WEIGHTS needs one weight per stat')
+
+
+def derived_default(field):
+    # Column default computing field from the stats of the inserted row,
+    # so Core and bulk inserts fill it too
+    def default(context):
+        values = context.get_current_parameters()
+        if any(values.get(stat) is None for stat in STAT_FIELDS):
+            return None
+        return Card.derived_values(values)[field]
+    return default
+
+
 '''
 Card
+    total_stats and score are stored, so that ranking cards is an index
+    scan, and derived from the stats on insert and update
 
 '''
 
 
 class Card(db.Model):
     __tablename__ = 'Card'
+    # Serve the GET /cards filters and the foreign key lookups of the delete
+    # cascades, the trailing id keeps each filtered page in index order
+    __table_args__ = (
+        db.Index('ix_Card_character_id', 'character', 'id'),
+        db.Index('ix_Card_skill_id', 'skill', 'id'),
+        db.Index('ix_Card_rarity_id', 'rarity', 'id'),
+        # Serve GET /cards/top and the total_stats sorts of GET /cards
+        db.Index('ix_Card_score_id', 'score', 'id'),
+        db.Index('ix_Card_rarity_score_id', 'rarity', 'score', 'id'),
+        db.Index('ix_Card_total_stats_id', 'total_stats', 'id'),
+    )
     # Autoincrementing, unique primary key
     id = db.Column(db.Integer, primary_key=True)
     # Card Name
     name = db.Column(String(80), nullable=False)
     # Card Character
-    character = db.Column(db.Integer, db.ForeignKey('Character.id'))
+    character = db.Column(
+        db.Integer, db.ForeignKey('Character.id', ondelete='CASCADE'))
     # Skill
-    skill = db.Column(db.Integer, db.ForeignKey('Skill.id'))
+    skill = db.Column(
+        db.Integer, db.ForeignKey('Skill.id', ondelete='CASCADE'))
     # Rarity
     rarity = db.Column(String(80), nullable=False)
     # Stat 1
@@ -30,6 +71,12 @@ class Card(db.Model):
     stat_3 = db.Column(db.Integer, nullable=False)
     # Stat 4
     stat_4 = db.Column(db.Integer, nullable=False)
+    # Sum of the stats
+    total_stats = db.Column(db.Integer, nullable=False,
+                            default=derived_default('total_stats'))
+    # Sum of the stats weighted by SCORE_WEIGHTS
+    score = db.Column(db.Float, nullable=False,
+                      default=derived_default('score'))
 
     '''
     info()
@@ -48,6 +95,71 @@ class Card(db.Model):
             'stat_4': self.stat_4
             }
 
+    '''
+    info_query()
+        a query selecting only the columns of the info() representation,
+        for read-only paths that do not need ORM instances
+        EXAMPLE
+            rows = Card.info_query().order_by(Card.id).all()
+            cards = [Card.info_from_row(row) for row in rows]
+    '''
+    info_fields = (
+        'id',
+        'name',
+        'character',
+        'skill',
+        'rarity',
+        'stat_1',
+        'stat_2',
+        'stat_3',
+        'stat_4'
+    )
+
+    # Columns GET /cards and the bulk endpoints filter on by equality
+    filter_fields = ('rarity', 'character', 'skill')
+    # Columns GET /cards filters on by range (<field>_min, <field>_max)
+    range_fields = ('stat_1', 'stat_2', 'stat_3', 'stat_4', 'total_stats',
+                    'score')
+    # Columns GET /cards can be sorted by
+    sort_fields = ('id', 'name', 'rarity', 'stat_1', 'stat_2', 'stat_3',
+                   'stat_4', 'total_stats', 'score')
+    # Columns added to info() by the ranking endpoints
+    rank_fields = ('total_stats', 'score')
+    # Columns the rank fields are derived from
+    derived_from = STAT_FIELDS
+
+    @classmethod
+    def info_query(cls):
+        return db.session.query(
+            *[getattr(cls, field) for field in cls.info_fields])
+
+    '''
+    info_from_row()
+        builds the info() representation from a row of info_query()
+    '''
+    @classmethod
+    def info_from_row(cls, row):
+        return dict(zip(cls.info_fields, row))
+
+    '''
+    derived_values(values)
+        the total_stats and score of a card with the stats of values,
+        taking each stat missing from values from its column so that the
+        result can be the SET clause of an UPDATE of some of the stats
+        EXAMPLE
+            values = {'stat_1': 9000}
+            values.update(Card.derived_values(values))
+    '''
+    @classmethod
+    def derived_values(cls, values):
+        stats = [values.get(field, getattr(cls, field))
+                 for field in STAT_FIELDS]
+        return {
+            'total_stats': sum(stats),
+            'score': sum(weight * stat
+                         for weight, stat in zip(SCORE_WEIGHTS, stats))
+        }
+
     '''
     insert()
         inserts a new model into a database
@@ -75,7 +187,8 @@ class Card(db.Model):
 
     '''
     update()
-        updates a model into a database
+        updates a model into a database, recomputing its total_stats and
+        score
         the model must exist in the database
         EXAMPLE
             card = Card.query.filter(Card.id == id).one_or_none()
@@ -83,6 +196,10 @@ class Card(db.Model):
             card.update()
     '''
     def update(self):
+        derived = self.derived_values(
+            {field: getattr(self, field) for field in STAT_FIELDS})
+        for field, value in derived.items():
+            setattr(self, field, value)
         db.session.commit()
 
     def __repr__(self):
@@ -0,0 +1,127 @@
+from datetime import datetime, timezone
+from sqlalchemy import String, event
+from sqlalchemy.dialects import postgresql
+from flask_sqlalchemy import SignallingSession
+from .database import db
+
+'''
+CatalogVersion
+    one row per catalog table holding a counter that is bumped in the same
+    transaction as every write to that table, so "has the Card table
+    changed since version N" is a single primary key lookup
+    the counters are used as cache keys and ETags throughout the app
+
+'''
+
+# tables whose rows are also removed when a row of the key table is deleted
+CASCADES = {
+    'Character': ('Card',),
+    'Skill': ('Card',)
+}
+CATALOG_TABLES = ('Character', 'Card', 'Skill', 'Banner')
+
+
+class CatalogVersion(db.Model):
+    __tablename__ = 'CatalogVersion'
+    # Name of the versioned table
+    table_name = db.Column(String(80), primary_key=True)
+    # Incremented on every write to the table
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    # Time of the last write (UTC)
+    modified = db.Column(db.DateTime)
+
+    '''
+    bump(session, tables)
+        increments the version of each table within the current transaction
+        of session, call it for writes that bypass the ORM unit of work
+        (bulk inserts, set-based updates and deletes)
+        the migration seeds a row per catalog table, a missing row is
+        created with an INSERT that ignores conflicts, so concurrent
+        writers bumping an unseeded table do not fail on its primary key
+        EXAMPLE
+            db.session.execute(Card.__table__.update()...)
+            CatalogVersion.bump(db.session, ['Card'])
+            db.session.commit()
+    '''
+    @classmethod
+    def bump(cls, session, tables):
+        table = cls.__table__
+        now = datetime.utcnow()
+        # a fixed order keeps concurrent writers from deadlocking
+        for name in sorted(set(tables)):
+            update = table.update().where(table.c.table_name == name).values(
+                version=table.c.version + 1, modified=now)
+            if session.execute(update).rowcount == 0:
+                session.execute(cls._insert_missing(session, name))
+                session.execute(update)
+
+    @classmethod
+    def _insert_missing(cls, session, name):
+        table = cls.__table__
+        if session.get_bind().dialect.name == 'postgresql':
+            return postgresql.insert(table).values(
+                table_name=name, version=0).on_conflict_do_nothing()
+        return table.insert().prefix_with('OR IGNORE').values(
+            table_name=name, version=0)
+
+    '''
+    current(*tables)
+        returns (version, modified) for tables, where version is a string
+        that changes on every write to any of them and modified is the unix
+        time of the last write or None
+        EXAMPLE
+            version, modified = CatalogVersion.current('Card', 'Skill')
+    '''
+    @classmethod
+    def current(cls, *tables):
+        rows = db.session.query(
+            cls.table_name, cls.version, cls.modified).filter(
+            cls.table_name.in_(tables)).all()
+        versions = {row.table_name: row for row in rows}
+        version = '.'.join(
+            str(versions[name].version if name in versions else 0)
+            for name in tables)
+        modified = [row.modified for row in rows if row.modified is not None]
+        if not modified:
+            return version, None
+        return version, int(
+            max(modified).replace(tzinfo=timezone.utc).timestamp())
+
+    '''
+    all()
+        the version and time of the last write of every catalog table
+    '''
+    @classmethod
+    def all(cls):
+        rows = {row.table_name: row for row in cls.query.all()}
+        return {
+            name: {
+                'version': rows[name].version if name in rows else 0,
+                'modified': rows[name].modified.isoformat() + 'Z'
+                if name in rows and rows[name].modified else None
+            } for name in CATALOG_TABLES
+        }
+
+
+'''
+bump_catalog_versions()
+    bumps the versions of the catalog tables written by a flush, including
+    the tables reached by delete cascades, in the flush's transaction
+'''
+
+
+@event.listens_for(SignallingSession, 'before_flush')
+def bump_catalog_versions(session, flush_context, instances):
+    tables = set()
+    for instance in session.new:
+        tables.add(getattr(instance, '__tablename__', None))
+    for instance in session.dirty:
+        if session.is_modified(instance, include_collections=False):
+            tables.add(getattr(instance, '__tablename__', None))
+    for instance in session.deleted:
+        name = getattr(instance, '__tablename__', None)
+        tables.add(name)
+        tables.update(CASCADES.get(name, ()))
+    tables.intersection_update(CATALOG_TABLES)
+    if tables:
+        CatalogVersion.bump(session, tables)
@@ -37,8 +37,9 @@ class Character(db.Model):
     hobbies = db.Column(db.String(80))
     # Class Type
     class_type = db.Column(String(80))
-    # Define delete cascade on card
-    cards = relationship("Card", cascade="delete")
+    # Cards are deleted by the database (ON DELETE CASCADE), passive_deletes
+    # keeps the ORM from loading them first
+    cards = relationship("Card", cascade="delete", passive_deletes=True)
 
     '''
     profile()
@@ -60,6 +61,42 @@ class Character(db.Model):
             'class_type': self.class_type,
         }
 
+    '''
+    profile_query()
+        a query selecting only the columns of the profile() representation,
+        for read-only paths that do not need ORM instances
+        EXAMPLE
+            rows = Character.profile_query().order_by(Character.id).all()
+            characters = [Character.profile_from_row(row) for row in rows]
+    '''
+    profile_fields = (
+        'id',
+        'name',
+        'age',
+        'height',
+        'weight',
+        'birthday',
+        'astrological_sign',
+        'bloodtype',
+        'three_sizes',
+        'handedness',
+        'hobbies',
+        'class_type'
+    )
+
+    @classmethod
+    def profile_query(cls):
+        return db.session.query(
+            *[getattr(cls, field) for field in cls.profile_fields])
+
+    '''
+    profile_from_row()
+        builds the profile() representation from a row of profile_query()
+    '''
+    @classmethod
+    def profile_from_row(cls, row):
+        return dict(zip(cls.profile_fields, row))
+
     '''
     insert()
         inserts a new model into a database
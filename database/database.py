@@ -1,32 +1,80 @@
 import os
-from sqlalchemy import Column, String, Integer
+import sqlite3
+from sqlalchemy import Column, String, Integer, event, orm
+from sqlalchemy.engine import Engine
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 import json
+from .pool import engine_options
+from .routing import RoutingSession, configure_from_environment, \
+    route_request, release_replica, mark_write
 
 project_dir = os.path.dirname(os.path.abspath(__file__))
 database_path = "postgres://{}/{}".format('', 'capstone_db')
 
-db = SQLAlchemy()
+
+class RoutingSQLAlchemy(SQLAlchemy):
+    # sessions bind the reads of GET requests to the replicas
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+
+db = RoutingSQLAlchemy()
 
 '''
 setup_db(app)
     binds a flask application and a SQLAlchemy service
+    the connection pool is configured by engine_options() from the
+    environment, options set in the DB_ENGINE_OPTIONS config win
+    GET requests are routed to the replicas of DB_REPLICA_URIS, see
+    database.routing.ReplicaRouter
+    calling it again on a bound app only switches the database, the engine
+    is recreated on next use
 '''
 
 
 def setup_db(app, database_path=database_path):
     app.config["SQLALCHEMY_DATABASE_URI"] = database_path
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    options = engine_options(database_path)
+    options.update(app.config.get("DB_ENGINE_OPTIONS", {}))
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
     db.app = app
-    migrate = Migrate(app, db)
 
     # import models
     from .character import Character
     from .card import Card
     from .skill import Skill
+    from .catalog_version import CatalogVersion
+    from .banner import Banner
+    from .inventory import Inventory, PullHistory
+
+    if 'sqlalchemy' not in app.extensions:
+        migrate = Migrate(app, db)
+        db.init_app(app)
+
+    configure_from_environment()
+    if 'replica_routing' not in app.extensions:
+        app.extensions['replica_routing'] = True
+        app.before_request(route_request)
+        app.after_request(mark_write)
+        app.teardown_request(release_replica)
+
+
+'''
+enforce_sqlite_foreign_keys()
+    SQLite ignores foreign keys, and so ON DELETE CASCADE, unless enabled
+    per connection, turn them on so local and test databases cascade
+    deletes like Postgres does
+'''
+
 
-    db.init_app(app)
+@event.listens_for(Engine, 'connect')
+def enforce_sqlite_foreign_keys(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
 
 
 '''
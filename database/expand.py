@@ -0,0 +1,88 @@
+from .card import Card
+from .character import Character
+from .skill import Skill
+
+'''
+EXPANSIONS
+    the related rows ?expand= can embed in the card.info() representation,
+    keyed by the Card foreign key column they replace, with the model and
+    the fields of its representation
+
+'''
+
+EXPANSIONS = {
+    'character': (Character, Character.profile_fields),
+    'skill': (Skill, Skill.info_fields)
+}
+
+'''
+parse_expand(value)
+    parses an expand=character,skill query parameter
+    returns the expanded columns in EXPANSIONS order, an empty tuple for no
+    expand parameter
+    raises ValueError for columns that cannot be expanded
+'''
+
+
+def parse_expand(value):
+    if not value:
+        return ()
+    names = set(value.split(','))
+    unknown = names - set(EXPANSIONS)
+    if unknown:
+        raise ValueError('cannot expand ' + ', '.join(sorted(unknown)))
+    return tuple(name for name in EXPANSIONS if name in names)
+
+
+'''
+expand_models(expand)
+    returns the model names read by an expanded card query, used for the
+    catalog versions of its cache keys and ETags
+'''
+
+
+def expand_models(expand):
+    return tuple(EXPANSIONS[name][0].__name__ for name in expand)
+
+
+'''
+expanded_card_query(expand)
+    Card.info_query() with the columns of each expanded row added through
+    a LEFT OUTER JOIN, so a page of cards and its related rows are read
+    with a single statement however many cards it holds
+    EXAMPLE
+        query = expanded_card_query(('character', 'skill'))
+        cards = [expanded_card_from_row(row, ('character', 'skill'))
+                 for row in query.order_by(Card.id).limit(100)]
+'''
+
+
+def expanded_card_query(expand):
+    query = Card.info_query()
+    for name in expand:
+        model, fields = EXPANSIONS[name]
+        query = query.add_columns(*[
+            getattr(model, field).label('{}_{}'.format(name, field))
+            for field in fields
+        ]).outerjoin(model, getattr(Card, name) == model.id)
+    return query
+
+
+'''
+expanded_card_from_row(row, expand)
+    builds the card.info() representation from a row of
+    expanded_card_query(expand), with each expanded column holding the
+    related row (or None) instead of its id
+'''
+
+
+def expanded_card_from_row(row, expand):
+    offset = len(Card.info_fields)
+    card = Card.info_from_row(row[:offset])
+    for name in expand:
+        fields = EXPANSIONS[name][1]
+        values = row[offset:offset + len(fields)]
+        offset += len(fields)
+        card[name] = dict(zip(fields, values)) \
+            if values[0] is not None else None
+    return card
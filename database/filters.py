@@ -0,0 +1,76 @@
+import math
+from sqlalchemy import Float, Integer
+
+'''
+parse_filters(model, args, fields, range_fields)
+    compiles the filter query parameters of a list endpoint into SQL
+    clauses on the columns of model
+        <field>=<value> or <field>=<v1>,<v2> for each of fields
+        <field>_min=<n> and <field>_max=<n> for each of range_fields
+    values of integer columns must be integers and values of float columns
+    finite numbers, other query parameters are ignored
+    returns the list of clauses and the normalized parameters, sorted so
+    that they can be used as part of a cache key
+    raises ValueError for invalid values
+    EXAMPLE
+        clauses, params = parse_filters(
+            Card, request.args, Card.filter_fields, Card.range_fields)
+        query = Card.info_query().filter(*clauses)
+'''
+
+
+def _convert(column, value):
+    if isinstance(column.type, Integer):
+        return int(value)
+    if isinstance(column.type, Float):
+        value = float(value)
+        if not math.isfinite(value):
+            raise ValueError('invalid number')
+    return value
+
+
+def parse_filters(model, args, fields, range_fields):
+    clauses = []
+    params = []
+    for field in fields:
+        value = args.get(field)
+        if value is None or value == '':
+            continue
+        column = getattr(model, field)
+        values = [_convert(column, v) for v in value.split(',')]
+        if len(values) == 1:
+            clauses.append(column == values[0])
+        else:
+            clauses.append(column.in_(values))
+        params.append((field, ','.join(str(v) for v in values)))
+    for field in range_fields:
+        column = getattr(model, field)
+        for suffix, compare in (('_min', column.__ge__),
+                                ('_max', column.__le__)):
+            value = args.get(field + suffix)
+            if value is None or value == '':
+                continue
+            value = _convert(column, value)
+            clauses.append(compare(value))
+            params.append((field + suffix, str(value)))
+    return clauses, sorted(params)
+
+
+'''
+parse_sort(model, value, fields)
+    parses a sort=<field>[:asc|:desc] query parameter
+    returns the column of model and whether the order is descending, or
+    (None, False) for no sort parameter
+    raises ValueError for unknown fields or directions
+    EXAMPLE
+        column, descending = parse_sort(Card, 'stat_3:desc', Card.sort_fields)
+'''
+
+
+def parse_sort(model, value, fields):
+    if not value:
+        return None, False
+    field, _, direction = value.partition(':')
+    if field not in fields or direction not in ('', 'asc', 'desc'):
+        raise ValueError('invalid sort ' + value)
+    return getattr(model, field), direction == 'desc'
@@ -0,0 +1,140 @@
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import String, text
+from sqlalchemy.dialects import postgresql
+from .database import db
+
+'''
+Inventory
+    the number of copies of each card a user owns, keyed by the sub claim
+    of the user's access token
+
+'''
+
+
+class Inventory(db.Model):
+    __tablename__ = 'Inventory'
+    # User, the sub claim of the access token
+    sub = db.Column(String(128), primary_key=True)
+    # Card
+    card = db.Column(db.Integer,
+                     db.ForeignKey('Card.id', ondelete='CASCADE'),
+                     primary_key=True)
+    # Number of copies owned
+    count = db.Column(db.Integer, nullable=False)
+
+    '''
+    info()
+        info of the inventory model
+    '''
+    def info(self):
+        return {
+            'card': self.card,
+            'count': self.count
+        }
+
+    '''
+    info_query(sub)
+        a query selecting only the columns of the info() representation of
+        the inventory of sub, served by the (sub, card) primary key
+        EXAMPLE
+            rows = Inventory.info_query(sub).order_by(Inventory.card).all()
+            inventory = [Inventory.info_from_row(row) for row in rows]
+    '''
+    info_fields = (
+        'card',
+        'count'
+    )
+
+    @classmethod
+    def info_query(cls, sub):
+        return db.session.query(
+            *[getattr(cls, field) for field in cls.info_fields]).filter(
+            cls.sub == sub)
+
+    '''
+    info_from_row()
+        builds the info() representation from a row of info_query()
+    '''
+    @classmethod
+    def info_from_row(cls, row):
+        return dict(zip(cls.info_fields, row))
+
+
+'''
+PullHistory
+    an append-only log of every card drawn by every pull, rows are never
+    updated or deleted, and card and banner are plain ids so that the log
+    outlives them
+
+'''
+
+
+class PullHistory(db.Model):
+    __tablename__ = 'PullHistory'
+    __table_args__ = (
+        db.Index('ix_PullHistory_sub_id', 'sub', 'id'),
+    )
+    # Autoincrementing, unique primary key
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'),
+                   primary_key=True)
+    # User, the sub claim of the access token
+    sub = db.Column(String(128), nullable=False)
+    # Banner pulled from
+    banner = db.Column(db.Integer, nullable=False)
+    # Card drawn
+    card = db.Column(db.Integer, nullable=False)
+    # Time of the pull (UTC)
+    pulled_at = db.Column(db.DateTime, nullable=False)
+
+
+'''
+record_pull(sub, banner_id, card_ids)
+    appends the cards drawn by a pull to the pull history of sub and adds
+    them to its inventory in one transaction, with one multi-row INSERT for
+    the history and one multi-row INSERT ... ON CONFLICT DO UPDATE for the
+    counts, however many cards were drawn
+    EXAMPLE
+        record_pull(payload['sub'], banner_id, [card['id'] for card in cards])
+'''
+
+
+def record_pull(sub, banner_id, card_ids):
+    now = datetime.utcnow()
+    history = PullHistory.__table__
+    inventory = Inventory.__table__
+    counts = sorted(Counter(card_ids).items())
+    try:
+        db.session.execute(history.insert().values([{
+            'sub': sub,
+            'banner': banner_id,
+            'card': card_id,
+            'pulled_at': now
+        } for card_id in card_ids]))
+        if db.engine.dialect.name == 'postgresql':
+            statement = postgresql.insert(inventory).values([{
+                'sub': sub,
+                'card': card_id,
+                'count': count
+            } for card_id, count in counts])
+            db.session.execute(statement.on_conflict_do_update(
+                index_elements=[inventory.c.sub, inventory.c.card],
+                set_={'count': inventory.c.count + statement.excluded.count}))
+        else:
+            # SQLite 3.24+ has the same clause, which SQLAlchemy 1.3 does
+            # not build for it
+            params = {'sub': sub}
+            values = []
+            for i, (card_id, count) in enumerate(counts):
+                values.append('(:sub, :card_{0}, :count_{0})'.format(i))
+                params['card_{}'.format(i)] = card_id
+                params['count_{}'.format(i)] = count
+            db.session.execute(text(
+                'INSERT INTO "Inventory" (sub, card, count) VALUES {} '
+                'ON CONFLICT (sub, card) DO UPDATE '
+                'SET count = "Inventory".count + excluded.count'
+                .format(', '.join(values))), params)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
@@ -0,0 +1,83 @@
+import math
+
+from sqlalchemy import Float, Integer, tuple_
+
+'''
+keyset_page(query, column, after, limit)
+    fetches one page of query ordered by column, starting after the cursor
+    value, with a WHERE column > :after ORDER BY column LIMIT :n query so the
+    cost of a page does not depend on how deep the client has paged
+    returns the rows of the page and the cursor of the next page, or None if
+    this is the last page
+    EXAMPLE
+        cards, next_cursor = keyset_page(Card.query, Card.id, 0, 100)
+'''
+
+
+def keyset_page(query, column, after, limit):
+    if after is not None:
+        query = query.filter(column > after)
+    # one extra row tells whether another page follows
+    rows = query.order_by(column).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, getattr(rows[-1], column.key)
+
+
+'''
+sorted_keyset_page(query, column, unique, descending, after, limit)
+    fetches one page of query ordered by column and then by the unique
+    column (the primary key) breaking ties, in descending order if
+    descending, with a WHERE (column, unique) > (:value, :id) row value
+    comparison so that deep pages stay as cheap as the first one
+    after is the (value, id) cursor of the previous page or None
+    returns the rows of the page and the (value, id) cursor of the next
+    page, or None if this is the last page
+    EXAMPLE
+        cards, next_cursor = sorted_keyset_page(
+            Card.query, Card.stat_3, Card.id, True, None, 100)
+'''
+
+
+def sorted_keyset_page(query, column, unique, descending, after, limit):
+    keys = tuple_(column, unique)
+    if after is not None:
+        position = tuple_(*after)
+        query = query.filter(keys < position if descending
+                             else keys > position)
+    order = (column.desc(), unique.desc()) if descending else (column, unique)
+    rows = query.order_by(*order).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (getattr(rows[-1], column.key),
+                  getattr(rows[-1], unique.key))
+
+
+'''
+encode_cursor(cursor), decode_cursor(value, column)
+    convert a (value, id) cursor of sorted_keyset_page to and from the
+    "<value>:<id>" string handed to clients as next_cursor
+    decode_cursor raises ValueError for malformed cursors and for values
+    that do not match the type of the sort column
+'''
+
+
+def encode_cursor(cursor):
+    if cursor is None:
+        return None
+    return '{}:{}'.format(*cursor)
+
+
+def decode_cursor(value, column):
+    value, _, unique = value.rpartition(':')
+    if not _:
+        raise ValueError('invalid cursor')
+    if isinstance(column.type, Integer):
+        value = int(value)
+    elif isinstance(column.type, Float):
+        value = float(value)
+        if not math.isfinite(value):
+            raise ValueError('invalid cursor')
+    return value, int(unique)
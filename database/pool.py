@@ -0,0 +1,164 @@
+import os
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.pool import Pool, QueuePool
+
+'''
+engine_options(database_uri, environ=os.environ)
+    the SQLALCHEMY_ENGINE_OPTIONS of the connection pool of database_uri,
+    read from the environment
+        DB_POOL_SIZE        connections kept open (default 5)
+        DB_MAX_OVERFLOW     connections opened above the pool size under
+                            bursts (default 10)
+        DB_POOL_TIMEOUT     seconds a request waits for a connection
+                            (default 30)
+        DB_POOL_PRE_PING    1 to test connections on checkout, so a
+                            connection closed by the server is replaced
+                            instead of failing a request (default 1)
+        DB_POOL_RECYCLE     seconds after which a connection is reopened,
+                            below the server and proxy idle timeouts
+                            (default 1800, -1 never)
+        DB_STATEMENT_TIMEOUT_MS
+                            PostgreSQL statement_timeout of every
+                            connection (default 0, no timeout)
+    SQLite databases keep the defaults of SQLAlchemy, their pools have no
+    size and their connections are not closed by a server
+    EXAMPLE
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(
+            app.config['SQLALCHEMY_DATABASE_URI'])
+'''
+
+
+def engine_options(database_uri, environ=os.environ):
+    url = make_url(database_uri)
+    if url.get_backend_name() == 'sqlite':
+        return {}
+    options = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': int(environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': float(environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_pre_ping': environ.get('DB_POOL_PRE_PING', '1') == '1',
+        'pool_recycle': int(environ.get('DB_POOL_RECYCLE', 1800))
+    }
+    statement_timeout = int(environ.get('DB_STATEMENT_TIMEOUT_MS', 0))
+    if statement_timeout and \
+            url.get_backend_name() in ('postgres', 'postgresql'):
+        options['connect_args'] = {
+            'options': '-c statement_timeout={}'.format(statement_timeout)
+        }
+    return options
+
+
+'''
+PoolMetrics
+    counters of the connection pools of this process, collected by the
+    pool event listeners below and by InstrumentedQueuePool
+    stats() reports them with the current state of a pool
+'''
+
+
+class PoolMetrics:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidations = 0
+            self.timeouts = 0
+            self.waits = 0
+            self.wait_seconds = 0.0
+            self.max_wait_seconds = 0.0
+            self.max_overflow_used = 0
+
+    def count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def record_wait(self, seconds, overflow):
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+            self.max_overflow_used = max(self.max_overflow_used, overflow)
+
+    def stats(self, pool=None):
+        with self._lock:
+            stats = {
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'invalidations': self.invalidations,
+                'timeouts': self.timeouts,
+                'wait_seconds_total': self.wait_seconds,
+                'wait_seconds_mean':
+                    self.wait_seconds / self.waits if self.waits else 0.0,
+                'wait_seconds_max': self.max_wait_seconds,
+                'max_overflow_used': self.max_overflow_used
+            }
+        if isinstance(pool, QueuePool):
+            stats.update({
+                'size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'idle': pool.checkedin(),
+                'overflow': max(pool.overflow(), 0)
+            })
+        return stats
+
+
+pool_metrics = PoolMetrics()
+
+'''
+InstrumentedQueuePool
+    a QueuePool timing how long each checkout waits for a connection, the
+    one measure the pool events do not give, and recording the overflow
+    connections in use after it
+'''
+
+
+class InstrumentedQueuePool(QueuePool):
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.count('timeouts')
+            raise
+        pool_metrics.record_wait(time.perf_counter() - start,
+                                 max(self.overflow(), 0))
+        return connection
+
+
+'''
+pool event listeners
+    count the connections opened, checked out, returned and invalidated
+    (by a failed pre-ping or a disconnect error) by every pool
+'''
+
+
+@event.listens_for(Pool, 'connect')
+def count_connect(dbapi_connection, connection_record):
+    pool_metrics.count('connects')
+
+
+@event.listens_for(Pool, 'checkout')
+def count_checkout(dbapi_connection, connection_record, connection_proxy):
+    pool_metrics.count('checkouts')
+
+
+@event.listens_for(Pool, 'checkin')
+def count_checkin(dbapi_connection, connection_record):
+    pool_metrics.count('checkins')
+
+
+@event.listens_for(Pool, 'invalidate')
+def count_invalidate(dbapi_connection, connection_record, exception):
+    pool_metrics.count('invalidations')
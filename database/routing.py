@@ -0,0 +1,158 @@
+import hashlib
+import os
+import threading
+from flask import g, has_app_context, request
+from flask_sqlalchemy import SignallingSession
+from sqlalchemy import create_engine
+from .cache import catalog_cache
+from .pool import engine_options
+
+'''
+ReplicaRouter
+    picks the database engine of each request: GET and HEAD requests read
+    from a replica, every other request, and the reads of a client for
+    sticky_seconds after one of its writes, go to the primary so that a
+    client always reads its own writes despite replication lag
+    replicas are chosen round-robin, or with the least requests in flight
+    for policy='least-connections'
+    a client is identified by its Authorization header, or its address
+    without one, and its last write is kept in the backend of the catalog
+    cache, shared by every worker when it is Redis
+    configured by setup_db() from the environment
+        DB_REPLICA_URIS     comma separated replica database URIs, none
+                            routes everything to the primary (default)
+        DB_REPLICA_POLICY   round-robin (default) or least-connections
+        DB_STICKY_SECONDS   seconds a client reads from the primary after
+                            a write (default 5)
+'''
+
+READ_METHODS = ('GET', 'HEAD')
+
+
+class ReplicaRouter:
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.configure(())
+
+    def configure(self, uris, policy='round-robin', sticky_seconds=5):
+        if policy not in ('round-robin', 'least-connections'):
+            raise ValueError('unknown replica policy ' + policy)
+        self.engines = [create_engine(uri, **engine_options(uri))
+                        for uri in uris]
+        self.policy = policy
+        self.sticky_seconds = sticky_seconds
+        self._lock = threading.Lock()
+        self._next = 0
+        self._in_flight = [0] * len(self.engines)
+        self._routed = [0] * len(self.engines)
+        self._sticky_reads = 0
+
+    @staticmethod
+    def client_key():
+        client = request.headers.get('Authorization') or \
+            request.remote_addr or ''
+        return 'sticky:' + hashlib.sha256(client.encode('utf-8')).hexdigest()
+
+    def is_sticky(self):
+        if not self.engines or self.sticky_seconds <= 0:
+            return False
+        if (self.backend or catalog_cache.backend).get(
+                self.client_key()) is None:
+            return False
+        with self._lock:
+            self._sticky_reads += 1
+        return True
+
+    def mark_write(self):
+        if self.engines and self.sticky_seconds > 0:
+            (self.backend or catalog_cache.backend).set(
+                self.client_key(), 1, self.sticky_seconds)
+
+    def acquire(self):
+        """Returns the index of the replica of a read, None without
+        replicas."""
+        if not self.engines:
+            return None
+        with self._lock:
+            if self.policy == 'least-connections':
+                # ties go to the replica after the last one picked
+                count = len(self.engines)
+                index = min(
+                    ((self._next + i) % count for i in range(count)),
+                    key=lambda i: self._in_flight[i])
+            else:
+                index = self._next % len(self.engines)
+            self._next = index + 1
+            self._in_flight[index] += 1
+            self._routed[index] += 1
+        return index
+
+    def release(self, index):
+        with self._lock:
+            self._in_flight[index] -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'policy': self.policy,
+                'sticky_seconds': self.sticky_seconds,
+                'sticky_reads': self._sticky_reads,
+                'replicas': [{
+                    'url': repr(engine.url),
+                    'in_flight': in_flight,
+                    'routed': routed
+                } for engine, in_flight, routed in zip(
+                    self.engines, self._in_flight, self._routed)]
+            }
+
+
+replica_router = ReplicaRouter()
+
+'''
+RoutingSession
+    the session of db, binding the statements of a request to the replica
+    chosen for it by route_request() and everything else to the primary
+'''
+
+
+class RoutingSession(SignallingSession):
+
+    def get_bind(self, mapper=None, clause=None):
+        if has_app_context():
+            index = g.get('replica')
+            if index is not None:
+                return replica_router.engines[index]
+        return super().get_bind(mapper, clause)
+
+
+'''
+route_request(), release_replica(response), mark_write(response)
+    the request hooks installed by setup_db()
+'''
+
+
+def route_request():
+    if request.method in READ_METHODS and not replica_router.is_sticky():
+        g.replica = replica_router.acquire()
+
+
+def release_replica(exception=None):
+    index = g.pop('replica', None)
+    if index is not None:
+        replica_router.release(index)
+
+
+def mark_write(response):
+    if request.method not in READ_METHODS + ('OPTIONS',) and \
+            response.status_code < 400:
+        replica_router.mark_write()
+    return response
+
+
+def configure_from_environment(environ=os.environ):
+    uris = [uri for uri in environ.get('DB_REPLICA_URIS', '').split(',')
+            if uri]
+    replica_router.configure(
+        uris, environ.get('DB_REPLICA_POLICY', 'round-robin'),
+        float(environ.get('DB_STICKY_SECONDS', 5)))
@@ -0,0 +1,201 @@
+from bisect import bisect_left
+from collections import defaultdict
+from sqlalchemy import case, func
+from .database import db
+from .card import Card
+from .character import Character
+from .skill import Skill
+
+'''
+SEARCH_FIELDS
+    the searched columns, keyed by the result type, with the weight of a
+    match in each column: a match in a name outranks any match in a skill
+    description
+    on PostgreSQL each column has a trigram GIN index on lower(column),
+    created by the search migration with the pg_trgm extension, which
+    serves the substring matches of queries of three characters or more
+
+'''
+
+SEARCH_FIELDS = (
+    ('card', Card, (('name', 1.0),)),
+    ('character', Character, (('name', 1.0),)),
+    ('skill', Skill, (('name', 1.0), ('description', 0.25)))
+)
+
+# Tables read by a search, for the catalog versions of its cache keys
+SEARCH_TABLES = tuple(model.__name__ for _, model, _ in SEARCH_FIELDS)
+
+# Match levels of a column, multiplied by the weight of the column
+EXACT = 3
+PREFIX = 2
+SUBSTRING = 1
+
+'''
+normalize(q)
+    lower cases q and collapses its whitespace, so that searches are case
+    insensitive
+'''
+
+
+def normalize(q):
+    return ' '.join(q.lower().split())
+
+
+'''
+match_rank(text, q)
+    the match level of the normalized q in the normalized text, 0 if q is
+    not a substring of text
+'''
+
+
+def match_rank(text, q):
+    if text == q:
+        return EXACT
+    if text.startswith(q):
+        return PREFIX
+    if q in text:
+        return SUBSTRING
+    return 0
+
+
+def _rank_results(matches, limit):
+    # matches are (score, length, type, id, name, field) tuples, keep the
+    # best match of each row, highest score then shortest text first
+    best = {}
+    for match in matches:
+        key = match[2:4]
+        if key not in best or match[:2] < best[key][:2]:
+            best[key] = match
+    ranked = sorted(best.values())[:limit]
+    return [{
+        'type': kind,
+        'id': row_id,
+        'name': name,
+        'match': field,
+        'score': -score
+    } for score, _, kind, row_id, name, field in ranked]
+
+
+'''
+NgramIndex
+    an in-process trigram index of the searched columns, used instead of
+    the trigram GIN indexes of PostgreSQL on other databases
+    texts are stored in result order (length, type, id), so a search can
+    stop as soon as no later text can enter its results
+    a query of three characters or more only checks the texts holding its
+    rarest trigram, the results of the one and two character queries typed
+    while a name is being entered are computed when the index is built,
+    keeping at most max_results texts per match level
+    EXAMPLE
+        index = NgramIndex.build()
+        results = index.search('kirari', 20)
+'''
+
+
+class NgramIndex:
+    N = 3
+
+    def __init__(self, documents, max_results=100):
+        # documents are (type, id, name, field, weight, text) tuples with
+        # the text normalized
+        self.documents = sorted(
+            documents, key=lambda d: (len(d[5]), d[0], d[1]))
+        self.max_results = max_results
+        self.top_weight = max([d[4] for d in documents] or [1.0])
+        # the sorted texts of the highest weight, to count the exact and
+        # prefix matches a search can expect
+        self.names = sorted(d[5] for d in documents
+                            if d[4] == self.top_weight)
+        self.postings = defaultdict(list)
+        # short[q][score] holds the first max_results positions whose text
+        # matches the one or two character q with that score
+        self.short = defaultdict(lambda: defaultdict(list))
+        for position, document in enumerate(self.documents):
+            weight, text = document[4:]
+            for gram in {text[i:i + self.N]
+                         for i in range(len(text) - self.N + 1)}:
+                self.postings[gram].append(position)
+            for gram in {text[i:i + n] for n in range(1, self.N)
+                         for i in range(len(text) - n + 1)}:
+                matches = self.short[gram][
+                    match_rank(text, gram) * weight]
+                if len(matches) < max_results:
+                    matches.append(position)
+
+    @classmethod
+    def build(cls, max_results=100):
+        documents = []
+        for kind, model, fields in SEARCH_FIELDS:
+            columns = [model.id, model.name] + [
+                getattr(model, field) for field, _ in fields]
+            for row in db.session.query(*columns):
+                for (field, weight), value in zip(fields, row[2:]):
+                    if value:
+                        documents.append((kind, row[0], row[1], field,
+                                          weight, normalize(value)))
+        return cls(documents, max_results)
+
+    def _match(self, position, score):
+        kind, row_id, name, field = self.documents[position][:4]
+        return (-score, len(self.documents[position][5]), kind, row_id,
+                name, field)
+
+    def search(self, q, limit):
+        if len(q) < self.N:
+            levels = self.short.get(q, {})
+            return _rank_results([
+                self._match(position, score)
+                for score in sorted(levels, reverse=True)
+                for position in levels[score]], limit)
+        grams = {q[i:i + self.N] for i in range(len(q) - self.N + 1)}
+        candidates = min((self.postings.get(gram, ()) for gram in grams),
+                         key=len)
+        # exact and prefix matches of the highest weight, which no later,
+        # longer, text can outrank
+        strong_total = bisect_left(self.names, q + '\U0010ffff') - \
+            bisect_left(self.names, q)
+        strong = substring = 0
+        levels = defaultdict(list)
+        for position in candidates:
+            weight, text = self.documents[position][4:]
+            if len(text) > len(q) and (strong >= limit or (
+                    strong == strong_total and strong + substring >= limit)):
+                break
+            score = match_rank(text, q) * weight
+            if score and len(levels[score]) < limit:
+                levels[score].append(position)
+                if score >= PREFIX * self.top_weight:
+                    strong += 1
+                elif score == SUBSTRING * self.top_weight:
+                    substring += 1
+        return _rank_results([
+            self._match(position, score)
+            for score, positions in levels.items()
+            for position in positions], limit)
+
+
+'''
+sql_search(q, limit)
+    the search of the normalized q run by the database, with one query per
+    searched column ranked by the same match levels as NgramIndex, each
+    LIKE '%q%' served by the trigram index of its column on PostgreSQL
+'''
+
+
+def sql_search(q, limit):
+    matches = []
+    for kind, model, fields in SEARCH_FIELDS:
+        for field, weight in fields:
+            text = func.lower(getattr(model, field))
+            rank = case([
+                (text == q, EXACT),
+                (text.startswith(q, autoescape=True), PREFIX)
+            ], else_=SUBSTRING)
+            rows = db.session.query(
+                model.id, model.name, rank, func.length(text)).filter(
+                text.contains(q, autoescape=True)).order_by(
+                rank.desc(), func.length(text), model.id).limit(limit)
+            matches.extend((-row[2] * weight, row[3], kind, row[0], row[1],
+                            field) for row in rows)
+    return _rank_results(matches, limit)
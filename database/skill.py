@@ -19,8 +19,9 @@ class Skill(db.Model):
     name = db.Column(String(80), nullable=False)
     # Description
     description = db.Column(String(160))
-    # Define delete cascade on card
-    cards = relationship("Card", cascade="delete")
+    # Cards are deleted by the database (ON DELETE CASCADE), passive_deletes
+    # keeps the ORM from loading them first
+    cards = relationship("Card", cascade="delete", passive_deletes=True)
 
     '''
     info()
@@ -33,6 +34,33 @@ class Skill(db.Model):
             'description': self.description
         }
 
+    '''
+    info_query()
+        a query selecting only the columns of the info() representation,
+        for read-only paths that do not need ORM instances
+        EXAMPLE
+            rows = Skill.info_query().order_by(Skill.id).all()
+            skills = [Skill.info_from_row(row) for row in rows]
+    '''
+    info_fields = (
+        'id',
+        'name',
+        'description'
+    )
+
+    @classmethod
+    def info_query(cls):
+        return db.session.query(
+            *[getattr(cls, field) for field in cls.info_fields])
+
+    '''
+    info_from_row()
+        builds the info() representation from a row of info_query()
+    '''
+    @classmethod
+    def info_from_row(cls, row):
+        return dict(zip(cls.info_fields, row))
+
     '''
     insert()
         inserts a new model into a database
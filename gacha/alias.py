@@ -0,0 +1,72 @@
+""" Alias table """
+
+"""
+Vose's alias method: after an O(n) build, each draw from a discrete
+distribution over n outcomes costs one random number and one table lookup,
+however many outcomes there are
+"""
+
+
+class AliasTable:
+    """Samples indexes 0..n-1 with probabilities proportional to weights.
+
+    Args:
+        weights: non-negative weights, at least one of them positive.
+
+    Raises:
+        ValueError: for an empty list, negative weights or a zero total.
+    """
+
+    def __init__(self, weights):
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0 or min(weights) < 0:
+            raise ValueError('weights must be non-negative with a positive '
+                             'sum')
+        scaled = [weight * n / total for weight in weights]
+        prob = [0.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            prob[less] = scaled[less]
+            alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+        # what is left is 1.0 up to rounding errors
+        for i in small + large:
+            prob[i] = 1.0
+        self.n = n
+        self.prob = prob
+        self.alias = alias
+
+    def sample(self, count, rng):
+        """Draws count indexes.
+
+        The integer part of a single uniform number in [0, n) picks a
+        column and its fractional part decides between the column and its
+        alias.
+
+        Args:
+            count: the number of draws.
+            rng: a random.Random instance, seed it for reproducible draws.
+
+        Returns:
+            A list of count indexes.
+        """
+        n = self.n
+        prob = self.prob
+        alias = self.alias
+        random = rng.random
+        draws = []
+        append = draws.append
+        for _ in range(count):
+            u = random() * n
+            i = int(u)
+            append(i if u - i < prob[i] else alias[i])
+        return draws
@@ -0,0 +1,149 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+""" Monte Carlo pull analysis """
+
+"""
+Simulates how many pulls it takes to get a target on a banner, under a
+hard pity rule: the `pity`-th pull since the last pull of the pity rarity
+is guaranteed to be of that rarity.
+
+The pity counter resets at every pull of the pity rarity, so a sequence of
+pulls is a series of cycles that each end with a pull of the pity rarity.
+A cycle lasts min(Geometric(p_rarity), pity) pulls, and the pull ending it
+is the target with probability p_target / p_rarity. The number of cycles
+until the target is then Geometric(p_target / p_rarity). Both are drawn
+with NumPy, with no Python loop over pulls or simulations.
+
+A simulation takes p_rarity / p_target cycles on average, 200 for a
+non-featured card holding 0.5% of its rarity, so the cycle lengths are
+drawn in batches of their own rather than all at once for a batch of
+simulations. Memory is then bounded by BATCH_SIZE and CYCLE_BATCH_SIZE
+however rare the target is.
+"""
+
+# Simulations drawn per NumPy batch
+BATCH_SIZE = 100000
+# Cycle lengths drawn per NumPy batch
+CYCLE_BATCH_SIZE = 1000000
+
+DEFAULT_PERCENTILES = (50, 75, 90, 95, 99)
+
+
+def simulate_pulls(p_target, p_rarity, pity=None, sims=100000, seed=None):
+    """Returns the number of pulls it took to get the target in each of
+    sims simulated pull sequences.
+
+    Args:
+        p_target: the probability that a pull is the target.
+        p_rarity: the probability that a pull is of the pity rarity, the
+            rarity of the target (p_target <= p_rarity).
+        pity: the pull, counted since the last pull of the pity rarity,
+            that is guaranteed to be of it, None for no pity.
+        sims: the number of simulations.
+        seed: an int or np.random.SeedSequence seeding the simulations.
+
+    Returns:
+        An int64 NumPy array of sims pull counts.
+
+    Raises:
+        ValueError: for probabilities outside (0, 1], p_target >
+            p_rarity or a pity below 1.
+    """
+    if not 0 < p_target <= p_rarity <= 1:
+        raise ValueError('expected 0 < p_target <= p_rarity <= 1')
+    if pity is not None and pity < 1:
+        raise ValueError('pity must be at least 1')
+    rng = np.random.default_rng(seed)
+    pulls = np.empty(sims, dtype=np.int64)
+    for start in range(0, sims, BATCH_SIZE):
+        size = min(BATCH_SIZE, sims - start)
+        if pity is None:
+            pulls[start:start + size] = rng.geometric(p_target, size)
+            continue
+        cycles = rng.geometric(p_target / p_rarity, size)
+        pulls[start:start + size] = _sum_cycles(rng, cycles, p_rarity, pity)
+    return pulls
+
+
+def _sum_cycles(rng, cycles, p_rarity, pity):
+    # The lengths of all cycles form one stream, the simulations taking
+    # consecutive runs of cycles[i] of them. The running total of the
+    # stream is kept at the end of each run, and differences of these
+    # totals are the pulls of each simulation.
+    ends = np.cumsum(cycles)
+    totals = np.empty(cycles.size, dtype=np.int64)
+    drawn, total, first = 0, 0, 0
+    while drawn < ends[-1]:
+        size = min(CYCLE_BATCH_SIZE, int(ends[-1]) - drawn)
+        running = np.cumsum(np.minimum(rng.geometric(p_rarity, size), pity))
+        running += total
+        # the simulations whose runs end in this batch
+        last = int(np.searchsorted(ends, drawn + size, side='right'))
+        totals[first:last] = running[ends[first:last] - drawn - 1]
+        drawn, total, first = drawn + size, int(running[-1]), last
+    return np.diff(totals, prepend=0)
+
+
+def _simulate_chunk(args):
+    return simulate_pulls(*args)
+
+
+def run_simulations(p_target, p_rarity, pity=None, sims=100000, seed=None,
+                    processes=1):
+    """simulate_pulls() split over a pool of processes.
+
+    Each process simulates an equal share of sims from its own child of
+    the seed sequence, so results are reproducible for a given seed and
+    number of processes.
+
+    Args:
+        processes: the number of worker processes, 1 simulates in the
+            calling process.
+    """
+    if processes <= 1:
+        return simulate_pulls(p_target, p_rarity, pity, sims, seed)
+    seeds = np.random.SeedSequence(seed).spawn(processes)
+    shares = [sims // processes + (i < sims % processes)
+              for i in range(processes)]
+    with ProcessPoolExecutor(processes) as executor:
+        chunks = executor.map(_simulate_chunk, [
+            (p_target, p_rarity, pity, share, child)
+            for share, child in zip(shares, seeds)])
+        return np.concatenate(list(chunks))
+
+
+def summarize(pulls, percentiles=DEFAULT_PERCENTILES, pull_cost=None):
+    """Summarizes simulated pull counts.
+
+    Args:
+        pulls: the array returned by simulate_pulls().
+        percentiles: the percentiles to report.
+        pull_cost: the cost of one pull, to also report the distribution
+            of spend.
+
+    Returns:
+        A dict {"sims", "mean", "std", "min", "max", "percentiles"} where
+        percentiles maps each percentile to its number of pulls, with a
+        "spend" dict of the same shape when pull_cost is given.
+    """
+    values = np.percentile(pulls, percentiles)
+    summary = {
+        'sims': int(pulls.size),
+        'mean': float(pulls.mean()),
+        'std': float(pulls.std()),
+        'min': int(pulls.min()),
+        'max': int(pulls.max()),
+        'percentiles': {
+            str(p): float(v) for p, v in zip(percentiles, values)
+        }
+    }
+    if pull_cost is not None:
+        summary['spend'] = {
+            'mean': summary['mean'] * pull_cost,
+            'percentiles': {
+                p: v * pull_cost for p, v in summary['percentiles'].items()
+            }
+        }
+    return summary
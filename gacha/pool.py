@@ -0,0 +1,94 @@
+from .alias import AliasTable
+
+""" Pull pools """
+
+"""
+The cards a banner can draw, flattened into one alias table so that a draw
+picks a card directly instead of a rarity and then a card of that rarity
+"""
+
+
+def card_weights(rates, featured_rate, cards, featured):
+    """Returns the draw probability of each card of a banner.
+
+    A draw first picks a rarity with probability proportional to its rate.
+    If the rarity has featured cards, featured_rate of its draws are shared
+    equally by them and the rest by its other cards; if all of its cards
+    are featured they share every draw.
+
+    Args:
+        rates: a dict of rarity to rate.
+        featured_rate: the share of a rarity's draws that go to its featured
+            cards, between 0 and 1.
+        cards: the card.info() of every card of the rarities of rates.
+        featured: the set of ids of the featured cards.
+
+    Returns:
+        A list of weights aligned with cards.
+
+    Raises:
+        ValueError: if a rarity with a positive rate has no card.
+    """
+    total = float(sum(rates.values()))
+    counts = {}
+    for card in cards:
+        key = (card['rarity'], card['id'] in featured)
+        counts[key] = counts.get(key, 0) + 1
+    empty = [rarity for rarity, rate in rates.items() if rate > 0 and
+             not counts.get((rarity, True)) and
+             not counts.get((rarity, False))]
+    if empty:
+        raise ValueError('no card of rarity ' + ', '.join(sorted(empty)))
+
+    weights = []
+    for card in cards:
+        rarity = card['rarity']
+        is_featured = card['id'] in featured
+        share = rates.get(rarity, 0) / total
+        if counts.get((rarity, True)) and counts.get((rarity, False)):
+            share *= featured_rate if is_featured else 1 - featured_rate
+        weights.append(share / counts[(rarity, is_featured)])
+    return weights
+
+
+class Pool:
+    """The cards of a banner with the alias table of their probabilities.
+
+    Args:
+        cards: the card.info() of every card of the banner's rarities.
+        weights: the draw weight of each card, from card_weights().
+    """
+
+    def __init__(self, cards, weights):
+        self.cards = cards
+        self.weights = weights
+        self.table = AliasTable(weights)
+
+    def pull(self, count, rng):
+        """Returns count cards drawn with replacement using rng."""
+        cards = self.cards
+        return [cards[i] for i in self.table.sample(count, rng)]
+
+    def probabilities(self, card_id=None, rarity=None):
+        """Returns the probabilities (p_target, p_rarity) that a pull is
+        the target and that it is of the target's rarity, the target being
+        the card card_id or else any card of rarity.
+
+        Raises:
+            ValueError: if the target cannot be pulled.
+        """
+        total = float(sum(self.weights))
+        if card_id is not None:
+            matches = [card for card in self.cards if card['id'] == card_id]
+            if not matches:
+                raise ValueError('card {} is not on the banner'
+                                 .format(card_id))
+            rarity = matches[0]['rarity']
+        p_rarity = sum(weight for card, weight in zip(self.cards, self.weights)
+                       if card['rarity'] == rarity) / total
+        p_target = p_rarity if card_id is None else sum(
+            weight for card, weight in zip(self.cards, self.weights)
+            if card['id'] == card_id) / total
+        if p_target <= 0:
+            raise ValueError('the target cannot be pulled')
+        return p_target, p_rarity
@@ -0,0 +1,126 @@
+import time
+from flask import g, has_request_context, request
+from flask.json import JSONEncoder
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from .registry import registry, COUNT_BUCKETS
+from . import queries
+
+
+""" Request instrumentation """
+
+"""
+The metric families of the API and the hooks recording them: request count
+and latency per endpoint and status, the time requires_auth spends reading
+the signing keys and verifying tokens, and the queries, database time and
+JSON serialization time of each request.
+"""
+
+registry.counter(
+    'http_requests_total', 'Requests handled.', ['endpoint', 'status'])
+registry.histogram(
+    'http_request_duration_seconds', 'Request latency.',
+    ['endpoint', 'status'])
+registry.histogram(
+    'auth_duration_seconds',
+    'Time spent in requires_auth, by step: jwks (signing key lookup, '
+    'fetching the key set when stale), decode (RS256 verification of a '
+    'token missing from the token cache) and total.', ['step'])
+registry.counter(
+    'db_queries_total', 'SQL statements executed.')
+registry.histogram(
+    'db_query_duration_seconds', 'SQL statement execution time.')
+registry.histogram(
+    'db_request_queries', 'SQL statements executed per request.',
+    ['endpoint'], COUNT_BUCKETS)
+registry.histogram(
+    'db_request_duration_seconds',
+    'Time spent executing SQL statements per request.', ['endpoint'])
+registry.histogram(
+    'serialization_duration_seconds',
+    'Time spent encoding JSON responses per request.', ['endpoint'])
+
+
+class timed:
+    """Records the time spent in a with block in the histogram name.
+
+    Example:
+        with timed('auth_duration_seconds', ('decode',)):
+            payload = jwt.decode(...)
+    """
+    __slots__ = ('name', 'labels', 'start')
+
+    def __init__(self, name, labels=()):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        registry.observe(self.name, self.labels,
+                         time.perf_counter() - self.start)
+
+
+class TimedJSONEncoder(JSONEncoder):
+    """The Flask JSON encoder, adding its encoding time to the request."""
+
+    def encode(self, o):
+        start = time.perf_counter()
+        try:
+            return super().encode(o)
+        finally:
+            if has_request_context():
+                g.serialization_seconds = g.get(
+                    'serialization_seconds', 0.0) + \
+                    time.perf_counter() - start
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def start_query(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def end_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start'].pop()
+    registry.inc('db_queries_total')
+    registry.observe('db_query_duration_seconds', (), elapsed)
+    if 0 < queries.SLOW_QUERY_SECONDS <= elapsed:
+        queries.log_slow_query(conn, statement, parameters, executemany,
+                               elapsed)
+    if has_request_context():
+        g.db_queries = g.get('db_queries', 0) + 1
+        g.db_seconds = g.get('db_seconds', 0.0) + elapsed
+
+
+def start_request():
+    g.request_start = time.perf_counter()
+
+
+def record_request(response):
+    start = g.get('request_start')
+    if start is None:
+        return response
+    endpoint = request.endpoint or 'unmatched'
+    labels = (endpoint, str(response.status_code))
+    registry.inc('http_requests_total', labels)
+    registry.observe('http_request_duration_seconds', labels,
+                     time.perf_counter() - start)
+    registry.observe('db_request_queries', (endpoint,),
+                     g.get('db_queries', 0))
+    registry.observe('db_request_duration_seconds', (endpoint,),
+                     g.get('db_seconds', 0.0))
+    registry.observe('serialization_duration_seconds', (endpoint,),
+                     g.get('serialization_seconds', 0.0))
+    return response
+
+
+def init_app(app):
+    """Installs the request hooks and the timed JSON encoder on app, with
+        the query headers and statement budgets of metrics.queries."""
+    app.json_encoder = TimedJSONEncoder
+    app.before_request(start_request)
+    app.after_request(record_request)
+    app.after_request(queries.check_query_budget)
@@ -0,0 +1,104 @@
+import logging
+import os
+from flask import current_app, g, has_request_context, request
+
+
+""" Statement budgets and slow query log """
+
+"""
+Debugging aids built on the per-request statement counts of
+metrics.instrument: a log of slow statements with their parameters and
+query plan, X-Query-Count and X-DB-Time-Ms response headers, and statement
+budgets declared on the endpoints, so that an extra query per row (a lazy
+relationship read in a loop) fails the tests of the endpoint instead of
+slowing it down in production.
+"""
+
+logger = logging.getLogger(__name__)
+
+# Statements slower than this are logged with their plan (0 disables)
+SLOW_QUERY_SECONDS = float(os.environ.get('SLOW_QUERY_MS', 200)) / 1000
+# Add the query count and time headers to every response, they are always
+# added in debug and testing mode
+QUERY_HEADERS = os.environ.get('QUERY_HEADERS') == '1'
+# Fail requests over their statement budget instead of logging them, set
+# in tests, always on in testing mode
+QUERY_BUDGET_STRICT = os.environ.get('QUERY_BUDGET_STRICT') == '1'
+
+EXPLAIN_PREFIXES = {
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'postgresql': 'EXPLAIN '
+}
+EXPLAINABLE = ('SELECT', 'WITH', 'UPDATE', 'DELETE')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in strict mode by a request running more statements than the
+        budget of its endpoint."""
+
+
+def query_budget(statements):
+    """Returns the decorator which declares the maximum number of SQL
+        statements of a request to the decorated endpoint.
+
+    Requests over budget are logged, or fail with QueryBudgetExceeded in
+    testing mode and with QUERY_BUDGET_STRICT=1. The budget is kept on the
+    function, and carried to the wrappers of decorators using wraps().
+
+    Args:
+        statements: the statement budget (int).
+    """
+    def query_budget_decorator(f):
+        f.query_budget = statements
+        return f
+    return query_budget_decorator
+
+
+def explain(conn, statement, parameters):
+    """Returns the query plan of statement as a list of lines, read with a
+        raw DBAPI cursor so it is neither timed nor counted."""
+    prefix = EXPLAIN_PREFIXES.get(conn.dialect.name)
+    if prefix is None or \
+            not statement.lstrip().upper().startswith(EXPLAINABLE):
+        return []
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return [' '.join(str(column) for column in row)
+                for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def log_slow_query(conn, statement, parameters, executemany, elapsed):
+    """Logs a statement slower than SLOW_QUERY_SECONDS with its parameters
+        and plan."""
+    try:
+        plan = [] if executemany else explain(conn, statement, parameters)
+    except Exception:
+        plan = ['(plan unavailable)']
+    logger.warning(
+        'Slow query (%.1f ms)%s: %s\nParameters: %r%s',
+        elapsed * 1000,
+        ' in ' + str(request.endpoint) if has_request_context() else '',
+        statement, parameters,
+        ''.join('\n    ' + line for line in plan))
+
+
+def check_query_budget(response):
+    """After request hook adding the query headers and enforcing the
+        statement budget of the endpoint."""
+    queries = g.get('db_queries', 0)
+    if QUERY_HEADERS or current_app.debug or current_app.testing:
+        response.headers['X-Query-Count'] = str(queries)
+        response.headers['X-DB-Time-Ms'] = '{:.2f}'.format(
+            g.get('db_seconds', 0.0) * 1000)
+    view = current_app.view_functions.get(request.endpoint)
+    budget = getattr(view, 'query_budget', None)
+    if budget is not None and queries > budget:
+        message = '{} ran {} SQL statements, over its budget of {}'.format(
+            request.endpoint, queries, budget)
+        if QUERY_BUDGET_STRICT or current_app.testing:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+    return response
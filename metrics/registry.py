@@ -0,0 +1,187 @@
+import threading
+from bisect import bisect_left
+
+
+""" Metrics registry """
+
+"""
+Counters and histograms rendered in the Prometheus text format.
+
+Every thread updates its own shard of the values, a plain dict only that
+thread writes to, so recording takes no lock: the lock is only taken once
+per thread, to register its shard, and when the shards are summed for
+render(). The shards of threads that have exited are folded into retired
+totals at both points, so servers starting a thread per request or
+recycling their threads do not accumulate shards. Values are per process,
+each gunicorn worker reports its own.
+"""
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                    1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Family:
+    """A named metric with its help text and label names.
+
+    Args:
+        kind: 'counter', 'gauge' or 'histogram'.
+        buckets: the upper bounds of the histogram buckets.
+        collect: for gauges, a function returning the current value.
+    """
+
+    def __init__(self, name, kind, documentation, labelnames=(),
+                 buckets=None, collect=None):
+        self.name = name
+        self.kind = kind
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) if buckets is not None else None
+        self.collect = collect
+
+
+class Registry:
+    """Holds the metric families and the per-thread shards of their values.
+
+    Example:
+        registry.counter('jobs_total', 'Jobs run.', ['queue'])
+        registry.inc('jobs_total', ('default',))
+    """
+
+    def __init__(self):
+        self.families = {}
+        # (thread, shard) of each live thread that recorded a value
+        self._shards = []
+        # summed values of the threads that have exited
+        self._retired = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def counter(self, name, documentation, labelnames=()):
+        self.families[name] = Family(name, 'counter', documentation,
+                                     labelnames)
+
+    def histogram(self, name, documentation, labelnames=(),
+                  buckets=DURATION_BUCKETS):
+        self.families[name] = Family(name, 'histogram', documentation,
+                                     labelnames, buckets)
+
+    def gauge(self, name, documentation, collect):
+        self.families[name] = Family(name, 'gauge', documentation,
+                                     collect=collect)
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._retire()
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _retire(self):
+        # called with the lock held, a thread that has exited no longer
+        # writes to its shard
+        alive = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                _add(self._retired, shard)
+        self._shards = alive
+
+    def inc(self, name, labels=(), value=1):
+        """Adds value to the counter name with labels, a tuple of label
+            values in the order of its label names."""
+        shard = self._shard()
+        key = (name, labels)
+        shard[key] = shard.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        """Records value in the histogram name with labels."""
+        shard = self._shard()
+        key = (name, labels)
+        entry = shard.get(key)
+        if entry is None:
+            buckets = self.families[name].buckets
+            entry = shard[key] = [[0] * (len(buckets) + 1), 0.0]
+        entry[0][bisect_left(self.families[name].buckets, value)] += 1
+        entry[1] += value
+
+    def clear(self):
+        with self._lock:
+            self._retired.clear()
+            for thread, shard in self._shards:
+                shard.clear()
+
+    def collect(self):
+        """Returns the values of every shard summed, keyed by (name,
+            labels), histograms as [bucket counts, sum]."""
+        totals = {}
+        with self._lock:
+            self._retire()
+            _add(totals, self._retired)
+            shards = [shard for thread, shard in self._shards]
+        for shard in shards:
+            _add(totals, shard)
+        return totals
+
+    def render(self):
+        """Returns the families in the Prometheus text exposition format."""
+        totals = self.collect()
+        series = {}
+        for (name, labels), value in totals.items():
+            series.setdefault(name, []).append((labels, value))
+        lines = []
+        for family in self.families.values():
+            lines.append('# HELP {} {}'.format(
+                family.name, family.documentation))
+            lines.append('# TYPE {} {}'.format(family.name, family.kind))
+            if family.kind == 'gauge':
+                lines.append('{} {}'.format(family.name, family.collect()))
+                continue
+            for labels, value in sorted(series.get(family.name, ())):
+                pairs = list(zip(family.labelnames, labels))
+                if family.kind == 'counter':
+                    lines.append(_sample(family.name, pairs, value))
+                    continue
+                counts, total = value
+                cumulative = 0
+                bounds = [repr(float(b)) for b in family.buckets] + ['+Inf']
+                for bound, count in zip(bounds, counts):
+                    cumulative += count
+                    lines.append(_sample(family.name + '_bucket',
+                                         pairs + [('le', bound)],
+                                         cumulative))
+                lines.append(_sample(family.name + '_sum', pairs, total))
+                lines.append(_sample(family.name + '_count', pairs,
+                                     cumulative))
+        return '\n'.join(lines) + '\n'
+
+
+def _add(totals, shard):
+    # list() copies the items without running Python code, so the owning
+    # thread cannot resize the dict while it is read
+    for key, value in list(shard.items()):
+        if isinstance(value, list):
+            total = totals.setdefault(key, [[0] * len(value[0]), 0.0])
+            for i, count in enumerate(list(value[0])):
+                total[0][i] += count
+            total[1] += value[1]
+        else:
+            totals[key] = totals.get(key, 0) + value
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n') \
+        .replace('"', '\\"')
+
+
+def _sample(name, pairs, value):
+    if not pairs:
+        return '{} {}'.format(name, value)
+    return '{}{{{}}} {}'.format(name, ','.join(
+        '{}="{}"'.format(label, _escape(v)) for label, v in pairs), value)
+
+
+registry = Registry()
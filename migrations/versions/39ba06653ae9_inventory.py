@@ -0,0 +1,41 @@
+"""inventory and pull history
+
+Revision ID: 39ba06653ae9
+Revises: d554a086252e
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '39ba06653ae9'
+down_revision = 'd554a086252e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('Inventory',
+    sa.Column('sub', sa.String(length=128), nullable=False),
+    sa.Column('card', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['card'], ['Card.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('sub', 'card')
+    )
+    op.create_table('PullHistory',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('sub', sa.String(length=128), nullable=False),
+    sa.Column('banner', sa.Integer(), nullable=False),
+    sa.Column('card', sa.Integer(), nullable=False),
+    sa.Column('pulled_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_PullHistory_sub_id', 'PullHistory', ['sub', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_PullHistory_sub_id', table_name='PullHistory')
+    op.drop_table('PullHistory')
+    op.drop_table('Inventory')
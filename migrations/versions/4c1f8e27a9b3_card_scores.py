@@ -0,0 +1,40 @@
+"""card total_stats and score
+
+Revision ID: 4c1f8e27a9b3
+Revises: 39ba06653ae9
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c1f8e27a9b3'
+down_revision = '39ba06653ae9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('Card', sa.Column('total_stats', sa.Integer(),
+                                    nullable=True))
+    op.add_column('Card', sa.Column('score', sa.Float(), nullable=True))
+    # Scores use the default weights, run flask rescore-cards when
+    # CARD_SCORE_WEIGHTS is set
+    op.execute('UPDATE "Card" SET total_stats = stat_1 + stat_2 + stat_3 '
+               '+ stat_4, score = stat_1 + stat_2 + stat_3 + stat_4')
+    op.alter_column('Card', 'total_stats', nullable=False)
+    op.alter_column('Card', 'score', nullable=False)
+    op.create_index('ix_Card_score_id', 'Card', ['score', 'id'])
+    op.create_index('ix_Card_rarity_score_id', 'Card',
+                    ['rarity', 'score', 'id'])
+    op.create_index('ix_Card_total_stats_id', 'Card', ['total_stats', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_Card_total_stats_id', table_name='Card')
+    op.drop_index('ix_Card_rarity_score_id', table_name='Card')
+    op.drop_index('ix_Card_score_id', table_name='Card')
+    op.drop_column('Card', 'score')
+    op.drop_column('Card', 'total_stats')
@@ -0,0 +1,34 @@
+"""catalog version counters
+
+Revision ID: 586a53fd6fd2
+Revises: 635ea643867f
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '586a53fd6fd2'
+down_revision = '635ea643867f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    catalog_version = op.create_table('CatalogVersion',
+    sa.Column('table_name', sa.String(length=80), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('modified', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+    op.bulk_insert(catalog_version, [
+        {'table_name': 'Character', 'version': 0},
+        {'table_name': 'Card', 'version': 0},
+        {'table_name': 'Skill', 'version': 0}
+    ])
+
+
+def downgrade():
+    op.drop_table('CatalogVersion')
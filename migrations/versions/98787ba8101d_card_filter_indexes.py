@@ -0,0 +1,28 @@
+"""card filter indexes
+
+Revision ID: 98787ba8101d
+Revises: 586a53fd6fd2
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '98787ba8101d'
+down_revision = '586a53fd6fd2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_Card_character_id', 'Card', ['character', 'id'])
+    op.create_index('ix_Card_skill_id', 'Card', ['skill', 'id'])
+    op.create_index('ix_Card_rarity_id', 'Card', ['rarity', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_Card_rarity_id', table_name='Card')
+    op.drop_index('ix_Card_skill_id', table_name='Card')
+    op.drop_index('ix_Card_character_id', table_name='Card')
@@ -0,0 +1,36 @@
+"""search trigram indexes
+
+Revision ID: b7e2d9c41f60
+Revises: 4c1f8e27a9b3
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2d9c41f60'
+down_revision = '4c1f8e27a9b3'
+branch_labels = None
+depends_on = None
+
+# The columns of database.search.SEARCH_FIELDS
+INDEXES = (
+    ('ix_Card_name_trgm', 'Card', 'name'),
+    ('ix_Character_name_trgm', 'Character', 'name'),
+    ('ix_Skill_name_trgm', 'Skill', 'name'),
+    ('ix_Skill_description_trgm', 'Skill', 'description'),
+)
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in INDEXES:
+        op.execute('CREATE INDEX "{}" ON "{}" USING gin '
+                   '(lower({}) gin_trgm_ops)'.format(name, table, column))
+
+
+def downgrade():
+    for name, table, column in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
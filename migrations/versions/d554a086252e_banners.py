@@ -0,0 +1,49 @@
+"""banners
+
+Revision ID: d554a086252e
+Revises: ed676de5be0d
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd554a086252e'
+down_revision = 'ed676de5be0d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('Banner',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=80), nullable=False),
+    sa.Column('featured_rate', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('BannerRate',
+    sa.Column('banner', sa.Integer(), nullable=False),
+    sa.Column('rarity', sa.String(length=80), nullable=False),
+    sa.Column('rate', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['banner'], ['Banner.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('banner', 'rarity')
+    )
+    op.create_table('BannerCard',
+    sa.Column('banner', sa.Integer(), nullable=False),
+    sa.Column('card', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['banner'], ['Banner.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['card'], ['Card.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('banner', 'card')
+    )
+    op.execute(
+        "INSERT INTO \"CatalogVersion\" (table_name, version) "
+        "VALUES ('Banner', 0)")
+
+
+def downgrade():
+    op.execute("DELETE FROM \"CatalogVersion\" WHERE table_name = 'Banner'")
+    op.drop_table('BannerCard')
+    op.drop_table('BannerRate')
+    op.drop_table('Banner')
@@ -0,0 +1,36 @@
+"""card foreign keys on delete cascade
+
+Revision ID: ed676de5be0d
+Revises: 98787ba8101d
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ed676de5be0d'
+down_revision = '98787ba8101d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # the constraints were created unnamed in 635ea643867f, these are the
+    # names Postgres generated for them
+    op.drop_constraint('Card_character_fkey', 'Card', type_='foreignkey')
+    op.drop_constraint('Card_skill_fkey', 'Card', type_='foreignkey')
+    op.create_foreign_key('Card_character_fkey', 'Card', 'Character',
+                          ['character'], ['id'], ondelete='CASCADE')
+    op.create_foreign_key('Card_skill_fkey', 'Card', 'Skill',
+                          ['skill'], ['id'], ondelete='CASCADE')
+
+
+def downgrade():
+    op.drop_constraint('Card_skill_fkey', 'Card', type_='foreignkey')
+    op.drop_constraint('Card_character_fkey', 'Card', type_='foreignkey')
+    op.create_foreign_key('Card_character_fkey', 'Card', 'Character',
+                          ['character'], ['id'])
+    op.create_foreign_key('Card_skill_fkey', 'Card', 'Skill',
+                          ['skill'], ['id'])
@@ -0,0 +1,252 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from flask import Flask
+
+from auth import auth
+from auth.auth import AuthError, requires_auth, verify_decode_jwt
+from auth.jwks import JWKSCache
+from auth.token_cache import TokenCache
+from benchmarks.tokens import make_key, mint_token, write_jwks
+
+# ----------------------------------------------------------------------------#
+# Setup
+# ----------------------------------------------------------------------------#
+
+
+class CountingJWKSCache(JWKSCache):
+    """JWKSCache that records how often the source is read."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.loads = 0
+
+    def load(self):
+        self.loads += 1
+        return super().load()
+
+
+class JWKSCacheTestCase(unittest.TestCase):
+    """This class represents the JWKS cache test case"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pem, cls.jwk = make_key('key-1')
+        cls.rotated_pem, cls.rotated_jwk = make_key('key-2')
+
+    def setUp(self):
+        fd, self.jwks_path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        self.write_jwks([self.jwk])
+        self.cache = CountingJWKSCache(
+            self.jwks_path, ttl=60, refresh_margin=0, min_refetch_interval=0)
+        self.original_cache = auth.jwks_cache
+        auth.jwks_cache = self.cache
+
+    def tearDown(self):
+        auth.jwks_cache = self.original_cache
+        os.remove(self.jwks_path)
+
+    def write_jwks(self, keys):
+        write_jwks(self.jwks_path, keys)
+
+    # ------------------------------------------------------------------------#
+    # Tests
+    # ------------------------------------------------------------------------#
+
+    def test_key_set_fetched_once(self):
+        for _ in range(5):
+            self.assertEqual(self.cache.get_key('key-1'), self.jwk)
+        self.assertEqual(self.cache.loads, 1)
+
+    def test_file_url_source(self):
+        cache = JWKSCache('file://' + self.jwks_path)
+        self.assertEqual(cache.get_key('key-1'), self.jwk)
+
+    def test_unknown_kid_forces_single_refetch(self):
+        self.cache.get_key('key-1')
+        self.assertIsNone(self.cache.get_key('missing'))
+        self.assertEqual(self.cache.loads, 2)
+
+    def test_unknown_kid_refetch_is_rate_limited(self):
+        self.cache.min_refetch_interval = 60
+        self.cache.get_key('key-1')
+        for _ in range(5):
+            self.assertIsNone(self.cache.get_key('missing'))
+        self.assertEqual(self.cache.loads, 1)
+
+    def test_rotated_key_is_picked_up(self):
+        self.cache.get_key('key-1')
+        self.write_jwks([self.jwk, self.rotated_jwk])
+        self.assertEqual(self.cache.get_key('key-2'), self.rotated_jwk)
+        self.assertEqual(self.cache.loads, 2)
+
+    def test_expired_key_set_is_refetched(self):
+        self.cache.ttl = 0
+        self.cache.get_key('key-1')
+        self.cache.get_key('key-1')
+        self.assertEqual(self.cache.loads, 2)
+
+    def test_background_refresh_before_expiry(self):
+        self.cache.refresh_margin = 60
+        self.cache.get_key('key-1')
+        self.cache.get_key('key-1')
+        self.cache._background.join(5)
+        self.assertEqual(self.cache.loads, 2)
+
+    def test_single_background_refresh(self):
+        self.cache.refresh_margin = 60
+        self.cache.get_key('key-1')
+        load = self.cache.load
+
+        def slow_load():
+            time.sleep(0.2)
+            return load()
+        self.cache.load = slow_load
+        barrier = threading.Barrier(8)
+
+        def lookup():
+            barrier.wait()
+            self.cache.get_key('key-1')
+
+        threads = [threading.Thread(target=lookup) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.cache._background.join(5)
+        self.assertEqual(self.cache.loads, 2)
+
+    def test_failed_refresh_serves_cached_keys(self):
+        self.cache.get_key('key-1')
+        os.remove(self.jwks_path)
+        self.cache.ttl = 0
+        self.cache._expires_at = 0
+        self.assertEqual(self.cache.get_key('key-1'), self.jwk)
+        self.write_jwks([self.jwk])
+
+    def test_verify_decode_jwt_with_stub_key_set(self):
+        token = mint_token(self.pem, 'key-1', ['get:cards'])
+        payload = verify_decode_jwt(token)
+        self.assertEqual(payload['permissions'], ['get:cards'])
+        verify_decode_jwt(token)
+        self.assertEqual(self.cache.loads, 1)
+
+    def test_verify_decode_jwt_unknown_key(self):
+        token = mint_token(self.rotated_pem, 'key-2', ['get:cards'])
+        with self.assertRaises(AuthError) as context:
+            verify_decode_jwt(token)
+        self.assertEqual(context.exception.status_code, 400)
+
+
+class TokenCacheTestCase(unittest.TestCase):
+    """This class represents the verified token cache test case"""
+
+    def setUp(self):
+        self.now = 1000
+        self.cache = TokenCache(max_entries=2, clock=lambda: self.now)
+
+    def test_hit_and_miss_counters(self):
+        self.assertIsNone(self.cache.get('token-a'))
+        self.cache.put('token-a', {'exp': 2000})
+        self.assertEqual(self.cache.get('token-a'), {'exp': 2000})
+        stats = self.cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_entry_expires_at_exp_claim(self):
+        self.cache.put('token-a', {'exp': 2000})
+        self.now = 2000
+        self.assertIsNone(self.cache.get('token-a'))
+        self.assertEqual(self.cache.stats()['size'], 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.cache.put('token-a', {'exp': 2000})
+        self.cache.put('token-b', {'exp': 2000})
+        self.cache.get('token-a')
+        self.cache.put('token-c', {'exp': 2000})
+        self.assertIsNone(self.cache.get('token-b'))
+        self.assertIsNotNone(self.cache.get('token-a'))
+        self.assertIsNotNone(self.cache.get('token-c'))
+
+    def test_cached_payload_permissions(self):
+        self.cache.put('token-a', {'exp': 2000, 'permissions': ['get:cards']})
+        payload = self.cache.get('token-a')
+        self.assertTrue(auth.check_permissions('get:cards', payload))
+        with self.assertRaises(AuthError):
+            auth.check_permissions('post:card', payload)
+
+    def test_missing_permissions_claim(self):
+        self.cache.put('token-a', {'exp': 2000})
+        payload = self.cache.get('token-a')
+        with self.assertRaises(AuthError) as context:
+            auth.check_permissions('get:cards', payload)
+        self.assertEqual(context.exception.status_code, 400)
+
+    def test_token_without_exp_is_not_cached(self):
+        self.cache.put('token-a', {})
+        self.assertIsNone(self.cache.get('token-a'))
+
+
+class RequiresAuthTestCase(unittest.TestCase):
+    """This class represents the requires_auth decorator test case"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pem, cls.jwk = make_key('key-1')
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.original_verify = auth.verify_decode_jwt
+        self.original_cache = auth.token_cache
+        self.verified = 0
+        auth.token_cache = TokenCache()
+
+        def counting_verify(token):
+            self.verified += 1
+            return self.original_verify(token)
+        auth.verify_decode_jwt = counting_verify
+
+        fd, self.jwks_path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        write_jwks(self.jwks_path, [self.jwk])
+        self.original_jwks_cache = auth.jwks_cache
+        auth.jwks_cache = JWKSCache(self.jwks_path)
+
+    def tearDown(self):
+        auth.verify_decode_jwt = self.original_verify
+        auth.token_cache = self.original_cache
+        auth.jwks_cache = self.original_jwks_cache
+        os.remove(self.jwks_path)
+
+    def call(self, view, token):
+        headers = {'Authorization': 'Bearer {0}'.format(token)}
+        with self.app.test_request_context(headers=headers):
+            return view()
+
+    def test_repeated_token_is_verified_once(self):
+        view = requires_auth('get:cards')(lambda payload: payload['sub'])
+        token = mint_token(
+            self.pem, 'key-1', ['get:cards'], sub='auth0|test')
+        for _ in range(3):
+            self.assertEqual(self.call(view, token), 'auth0|test')
+        self.assertEqual(self.verified, 1)
+        self.assertEqual(auth.token_cache.stats()['hits'], 2)
+
+    def test_cached_payload_still_checks_permissions(self):
+        allowed = requires_auth('get:cards')(lambda payload: True)
+        denied = requires_auth('post:card')(lambda payload: True)
+        token = mint_token(self.pem, 'key-1', ['get:cards'])
+        self.assertTrue(self.call(allowed, token))
+        with self.assertRaises(Exception) as context:
+            self.call(denied, token)
+        self.assertEqual(getattr(context.exception, 'code', None), 401)
+        self.assertEqual(self.verified, 1)
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,203 @@
+import unittest
+
+from benchmarks.catalog import create_bench_app, seed_catalog
+from database.cache import CatalogCache, MemoryBackend, RedisBackend
+from database.catalog_version import CatalogVersion
+from database.character import Character
+from database.database import db
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+# ----------------------------------------------------------------------------#
+# Setup
+# ----------------------------------------------------------------------------#
+
+
+class MemoryBackendTestCase(unittest.TestCase):
+    """This class represents the in-memory cache backend test case"""
+
+    def setUp(self):
+        self.now = 0
+        self.backend = MemoryBackend(max_entries=2, clock=lambda: self.now)
+
+    # ------------------------------------------------------------------------#
+    # Tests
+    # ------------------------------------------------------------------------#
+
+    def test_entry_expires_after_ttl(self):
+        self.backend.set('a', {'id': 1}, 10)
+        self.assertEqual(self.backend.get('a'), {'id': 1})
+        self.now = 10
+        self.assertIsNone(self.backend.get('a'))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.backend.set('a', 1, 10)
+        self.backend.set('b', 2, 10)
+        self.backend.get('a')
+        self.backend.set('c', 3, 10)
+        self.assertIsNone(self.backend.get('b'))
+        self.assertEqual(self.backend.get('a'), 1)
+
+
+class CatalogCacheTestCase(unittest.TestCase):
+    """This class represents the catalog cache test case"""
+
+    def setUp(self):
+        self.cache = CatalogCache(MemoryBackend())
+        self.loads = 0
+
+    def load(self, value):
+        def loader():
+            self.loads += 1
+            return value
+        return loader
+
+    def test_read_through(self):
+        for _ in range(3):
+            self.assertEqual(self.cache.get_or_load(
+                'Card', 1, '1', self.load({'id': 1})), {'id': 1})
+        self.assertEqual(self.loads, 1)
+        stats = self.cache.stats()['models']['Card']
+        self.assertEqual(stats['hits'], 2)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_missing_entity_is_not_cached(self):
+        self.assertIsNone(
+            self.cache.get_or_load('Card', 1, '1', self.load(None)))
+        self.assertEqual(self.cache.stats()['size'], 0)
+
+    def test_entities_are_keyed_by_version(self):
+        self.cache.get_or_load('Card', 1, '1', self.load({'id': 1}))
+        self.cache.get_or_load('Skill', 1, '1', self.load({'id': 1}))
+        self.cache.get_or_load('Card', 1, '2', self.load({'id': 1}))
+        self.cache.get_or_load('Skill', 1, '1', self.load({'id': 1}))
+        self.assertEqual(self.loads, 3)
+
+    def test_list_pages_are_keyed_by_version(self):
+        self.cache.get_or_load_page('Card', '1', 'after=None', self.load({}))
+        self.cache.get_or_load_page('Card', '1', 'after=None', self.load({}))
+        self.assertEqual(self.loads, 1)
+        self.cache.get_or_load_page('Card', '2', 'after=None', self.load({}))
+        self.assertEqual(self.loads, 2)
+
+    def test_backend_errors_are_cache_misses(self):
+        class BrokenBackend(MemoryBackend):
+            def get(self, key):
+                raise ConnectionError()
+
+        cache = CatalogCache(BrokenBackend())
+        self.assertEqual(cache.get_or_load(
+            'Card', 1, '1', self.load({'id': 1})), {'id': 1})
+        self.assertEqual(cache.get_or_load_page(
+            'Card', '1', 'after=None', self.load({})), {})
+
+
+class CatalogVersionTestCase(unittest.TestCase):
+    """This class represents the catalog version counters test case"""
+
+    def setUp(self):
+        self.app = create_bench_app()
+        self.context = self.app.app_context()
+        self.context.push()
+
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+
+    def test_bump_creates_missing_rows(self):
+        CatalogVersion.bump(db.session, ['Card', 'Skill'])
+        CatalogVersion.bump(db.session, ['Card'])
+        db.session.commit()
+        self.assertEqual(CatalogVersion.current('Card', 'Skill')[0], '2.1')
+
+    def test_insert_missing_ignores_existing_row(self):
+        CatalogVersion.bump(db.session, ['Card'])
+        # a concurrent writer created the row first
+        db.session.execute(CatalogVersion._insert_missing(db.session, 'Card'))
+        db.session.commit()
+        self.assertEqual(CatalogVersion.current('Card')[0], '1')
+
+
+class CatalogVersionKeysTestCase(unittest.TestCase):
+    """This class represents the version keyed entity entries test case,
+    with two in-memory caches standing in for two gunicorn workers"""
+
+    def setUp(self):
+        self.app = create_bench_app()
+        self.context = self.app.app_context()
+        self.context.push()
+        seed_catalog(characters=3, skills=1, cards=3)
+        self.worker_a = CatalogCache(MemoryBackend())
+        self.worker_b = CatalogCache(MemoryBackend())
+
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+
+    def read(self, cache, character_id, load=None):
+        # the version is read before the row, as app.py does
+        version = CatalogVersion.current('Character')[0]
+        return cache.get_or_load(
+            'Character', character_id, version,
+            load or (lambda: Character.query.get(character_id).profile()))
+
+    def rename(self, character_id, name):
+        character = Character.query.get(character_id)
+        character.name = name
+        character.update()
+
+    def test_write_is_seen_by_other_workers(self):
+        self.read(self.worker_a, 1)
+        self.read(self.worker_b, 1)
+        # worker a takes the write, worker b keeps its old entry
+        self.rename(1, 'Renamed')
+        self.assertEqual(self.read(self.worker_b, 1)['name'], 'Renamed')
+        self.assertEqual(self.read(self.worker_a, 1)['name'], 'Renamed')
+
+    def test_write_racing_a_load(self):
+        def racing_load():
+            profile = Character.query.get(1).profile()
+            self.rename(1, 'Renamed')
+            return profile
+        self.assertEqual(
+            self.read(self.worker_a, 1, racing_load)['name'], 'Character 0')
+        self.assertEqual(self.read(self.worker_a, 1)['name'], 'Renamed')
+
+
+@unittest.skipIf(fakeredis is None, 'fakeredis is not installed')
+class RedisBackendTestCase(unittest.TestCase):
+    """This class represents the shared cache backend test case, with two
+    caches on one fake Redis server standing in for two gunicorn workers"""
+
+    def setUp(self):
+        server = fakeredis.FakeServer()
+        self.worker_a = CatalogCache(
+            RedisBackend(client=fakeredis.FakeRedis(server=server)),
+            near_cache_size=100, near_cache_ttl=60)
+        self.worker_b = CatalogCache(
+            RedisBackend(client=fakeredis.FakeRedis(server=server)),
+            near_cache_size=100, near_cache_ttl=60)
+
+    def test_entries_are_shared_between_workers(self):
+        self.worker_a.get_or_load('Card', 1, '1', lambda: {'id': 1})
+        self.assertEqual(
+            self.worker_b.get_or_load('Card', 1, '1', lambda: None),
+            {'id': 1})
+
+    def test_new_version_bypasses_near_caches(self):
+        self.worker_a.get_or_load('Card', 1, '1', lambda: {'id': 1})
+        self.worker_b.get_or_load('Card', 1, '1', lambda: None)
+        self.assertEqual(
+            self.worker_b.get_or_load('Card', 1, '2', lambda: {'id': 2}),
+            {'id': 2})
+        self.assertEqual(
+            self.worker_a.get_or_load('Card', 1, '2', lambda: None),
+            {'id': 2})
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+
+from benchmarks.catalog import create_bench_app, seed_catalog
+from database.bulk import bulk_update, bulk_where
+from database.card import Card, SCORE_WEIGHTS
+from database.database import db
+
+# ----------------------------------------------------------------------------#
+# Setup
+# ----------------------------------------------------------------------------#
+
+
+class CardScoreTestCase(unittest.TestCase):
+    """This class represents the stored card total_stats and score test
+    case"""
+
+    def setUp(self):
+        self.app = create_bench_app()
+        self.context = self.app.app_context()
+        self.context.push()
+        seed_catalog(cards=20)
+
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+
+    def assertDerived(self, card):
+        stats = [card.stat_1, card.stat_2, card.stat_3, card.stat_4]
+        self.assertEqual(card.total_stats, sum(stats))
+        self.assertAlmostEqual(card.score, sum(
+            weight * stat for weight, stat in zip(SCORE_WEIGHTS, stats)))
+
+    # ------------------------------------------------------------------------#
+    # Tests
+    # ------------------------------------------------------------------------#
+
+    def test_derived_on_insert(self):
+        Card(name='Kirari', character=1, skill=1, rarity='SSR', stat_1=1,
+             stat_2=2, stat_3=3, stat_4=4).insert()
+        for card in Card.query.all():
+            self.assertDerived(card)
+
+    def test_derived_on_update(self):
+        card = Card.query.get(1)
+        card.stat_2 = 9999
+        card.update()
+        self.assertDerived(Card.query.get(1))
+
+    def test_derived_on_bulk_update(self):
+        bulk_update(Card, bulk_where(Card, ids=[1, 2, 3]), {'stat_3': 1})
+        db.session.expire_all()
+        for card in Card.query.all():
+            self.assertDerived(card)
+
+    def test_rescore(self):
+        db.session.execute(Card.__table__.update().values(score=0))
+        bulk_update(Card, bulk_where(Card, ids=[1, 2]),
+                    Card.derived_values({}))
+        db.session.expire_all()
+        self.assertDerived(Card.query.get(1))
+        self.assertEqual(Card.query.get(3).score, 0)
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+from sqlalchemy import event
+
+from benchmarks.catalog import create_bench_app, seed_catalog
+from database.database import db
+from database.card import Card
+from database.expand import expanded_card_query, expanded_card_from_row, \
+    parse_expand
+
+# ----------------------------------------------------------------------------#
+# Setup
+# ----------------------------------------------------------------------------#
+
+
+class ExpandTestCase(unittest.TestCase):
+    """This class represents the ?expand= card representation test case"""
+
+    def setUp(self):
+        self.app = create_bench_app()
+        self.context = self.app.app_context()
+        self.context.push()
+        seed_catalog(characters=50, skills=50, cards=500)
+        self.statements = []
+        event.listen(db.engine, 'before_cursor_execute', self.count)
+
+    def tearDown(self):
+        event.remove(db.engine, 'before_cursor_execute', self.count)
+        db.session.remove()
+        self.context.pop()
+
+    def count(self, conn, cursor, statement, parameters, context,
+              executemany):
+        self.statements.append(statement)
+
+    def load(self, expand, limit):
+        self.statements.clear()
+        rows = expanded_card_query(expand).order_by(Card.id).limit(limit)
+        return [expanded_card_from_row(row, expand) for row in rows]
+
+    # ------------------------------------------------------------------------#
+    # Tests
+    # ------------------------------------------------------------------------#
+
+    def test_parse_expand(self):
+        self.assertEqual(parse_expand(None), ())
+        self.assertEqual(parse_expand('skill,character'),
+                         ('character', 'skill'))
+        with self.assertRaises(ValueError):
+            parse_expand('character,owner')
+
+    def test_related_rows_are_embedded(self):
+        card = self.load(('character', 'skill'), 1)[0]
+        self.assertEqual(card['character']['id'], 1)
+        self.assertEqual(card['character']['name'], 'Character 0')
+        self.assertEqual(card['skill']['name'], 'Skill 0')
+        self.assertEqual(self.load(('skill',), 1)[0]['character'], 1)
+
+    def test_query_count_does_not_grow_with_cards(self):
+        expand = ('character', 'skill')
+        self.assertEqual(len(self.load(expand, 10)), 10)
+        small_page = len(self.statements)
+        self.assertEqual(len(self.load(expand, 500)), 500)
+        self.assertEqual(len(self.statements), small_page)
+        self.assertEqual(small_page, 1)
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+
+from werkzeug.datastructures import MultiDict
+
+from benchmarks.catalog import create_bench_app, seed_catalog
+from benchmarks.explain_filters import check_plans
+from database.card import Card
+from database.filters import parse_filters, parse_sort
+from database.pagination import decode_cursor, encode_cursor
+
+# ----------------------------------------------------------------------------#
+# Setup
+# ----------------------------------------------------------------------------#
+
+
+class CardFiltersTestCase(unittest.TestCase):
+    """This class represents the GET /cards filters test case"""
+
+    def parse(self, **args):
+        return parse_filters(
+            Card, MultiDict(args), Card.filter_fields, Card.range_fields)
+
+    # ------------------------------------------------------------------------#
+    # Tests
+    # ------------------------------------------------------------------------#
+
+    def test_filters_are_compiled_to_clauses(self):
+        clauses, params = self.parse(
+            rarity='SSR', character='5,6', stat_3_min='100', limit='10')
+        self.assertEqual(len(clauses), 3)
+        self.assertEqual(params, [
+            ('character', '5,6'), ('rarity', 'SSR'), ('stat_3_min', '100')])
+
+    def test_invalid_integer_filter_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.parse(character='five')
+        with self.assertRaises(ValueError):
+            self.parse(stat_1_max='high')
+
+    def test_float_range_filter(self):
+        clauses, params = self.parse(score_min='1.5', score_max='250')
+        self.assertEqual(len(clauses), 2)
+        self.assertEqual(params, [('score_max', '250.0'),
+                                  ('score_min', '1.5')])
+        with self.assertRaises(ValueError):
+            self.parse(score_min='nan')
+        with self.assertRaises(ValueError):
+            self.parse(score_max='high')
+
+    def test_sort(self):
+        self.assertEqual(parse_sort(Card, None, Card.sort_fields),
+                         (None, False))
+        self.assertEqual(parse_sort(Card, 'stat_3:desc', Card.sort_fields),
+                         (Card.stat_3, True))
+        with self.assertRaises(ValueError):
+            parse_sort(Card, 'stat_3:sideways', Card.sort_fields)
+        with self.assertRaises(ValueError):
+            parse_sort(Card, 'character', Card.sort_fields)
+
+    def test_sorted_cursor_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor((9000, 12)),
+                                       Card.stat_3), (9000, 12))
+        self.assertEqual(decode_cursor(encode_cursor(('S:R', 3)),
+                                       Card.rarity), ('S:R', 3))
+
+    def test_malformed_sorted_cursor(self):
+        for value, column in (('garbage', Card.name),
+                              ('high:12', Card.stat_3),
+                              ('nan:12', Card.score),
+                              ('9000:last', Card.stat_3)):
+            with self.assertRaises(ValueError):
+                decode_cursor(value, column)
+
+    def test_common_filters_use_indexes(self):
+        app = create_bench_app()
+        with app.app_context():
+            seed_catalog(characters=20, skills=20, cards=2000)
+            check_plans()
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import random
+import tracemalloc
+import unittest
+from collections import Counter
+
+from gacha import montecarlo
+from gacha.alias import AliasTable
+from gacha.montecarlo import run_simulations, simulate_pulls, summarize
+from gacha.pool import Pool, card_weights
+
+# ----------------------------------------------------------------------------#
+# Setup
+# ----------------------------------------------------------------------------#
+
+
+class AliasTableTestCase(unittest.TestCase):
+    """This class represents the alias table sampler test case"""
+
+    # ------------------------------------------------------------------------#
+    # Tests
+    # ------------------------------------------------------------------------#
+
+    def test_draws_are_reproducible_with_a_seed(self):
+        table = AliasTable([1, 2, 3, 4])
+        self.assertEqual(table.sample(20, random.Random(7)),
+                         table.sample(20, random.Random(7)))
+
+    def test_draw_frequencies_match_weights(self):
+        weights = [50, 30, 15, 4.5, 0.5, 0]
+        counts = Counter(AliasTable(weights).sample(200000, random.Random(1)))
+        for index, weight in enumerate(weights):
+            self.assertAlmostEqual(
+                counts[index] / 200000, weight / 100, delta=0.005)
+        self.assertEqual(counts[5], 0)
+
+    def test_invalid_weights_are_rejected(self):
+        for weights in ([], [0, 0], [1, -1]):
+            with self.assertRaises(ValueError):
+                AliasTable(weights)
+
+
+class PoolTestCase(unittest.TestCase):
+    """This class represents the banner pull pool test case"""
+
+    def setUp(self):
+        self.cards = [
+            {'id': 1, 'rarity': 'SSR'},
+            {'id': 2, 'rarity': 'SSR'},
+            {'id': 3, 'rarity': 'SSR'},
+            {'id': 4, 'rarity': 'R'},
+            {'id': 5, 'rarity': 'R'},
+        ]
+
+    def test_featured_cards_share_featured_rate(self):
+        weights = card_weights({'SSR': 10, 'R': 90}, 0.5, self.cards, {1})
+        self.assertAlmostEqual(weights[0], 0.05)
+        self.assertAlmostEqual(weights[1], 0.025)
+        self.assertAlmostEqual(weights[3], 0.45)
+        self.assertAlmostEqual(sum(weights), 1.0)
+
+    def test_rarity_without_cards_is_rejected(self):
+        with self.assertRaises(ValueError):
+            card_weights({'UR': 1, 'R': 99}, 0.5, self.cards[3:], set())
+
+    def test_seeded_pulls_are_deterministic(self):
+        weights = card_weights({'SSR': 10, 'R': 90}, 0.5, self.cards, {1})
+        pool = Pool(self.cards, weights)
+        pulled = pool.pull(10, random.Random(3))
+        self.assertEqual(pulled, pool.pull(10, random.Random(3)))
+        self.assertEqual([card['id'] for card in pulled],
+                         [card['id'] for card in Pool(self.cards, weights)
+                          .pull(10, random.Random(3))])
+
+    def test_target_probabilities(self):
+        weights = card_weights({'SSR': 10, 'R': 90}, 0.5, self.cards, {1})
+        pool = Pool(self.cards, weights)
+        p_target, p_rarity = pool.probabilities(card_id=1)
+        self.assertAlmostEqual(p_target, 0.05)
+        self.assertAlmostEqual(p_rarity, 0.1)
+        self.assertEqual(pool.probabilities(rarity='R'), (0.9, 0.9))
+        with self.assertRaises(ValueError):
+            pool.probabilities(card_id=6)
+
+
+class MonteCarloTestCase(unittest.TestCase):
+    """This class represents the pull simulation test case"""
+
+    def test_simulations_are_reproducible_with_a_seed(self):
+        self.assertTrue((simulate_pulls(0.01, 0.03, 90, 1000, seed=5) ==
+                         simulate_pulls(0.01, 0.03, 90, 1000, seed=5)).all())
+
+    def test_mean_without_pity_is_geometric(self):
+        pulls = simulate_pulls(0.02, 0.02, None, 200000, seed=1)
+        self.assertAlmostEqual(pulls.mean(), 50, delta=1)
+
+    def test_pity_caps_pulls_for_a_rarity(self):
+        pulls = simulate_pulls(0.03, 0.03, 90, 100000, seed=1)
+        self.assertEqual(pulls.max(), 90)
+        # P(no SSR in 89 pulls) = 0.97 ** 89, all of them stop at 90
+        self.assertAlmostEqual((pulls == 90).mean(), 0.97 ** 89, delta=0.005)
+
+    def test_cycle_batches_do_not_change_the_simulations(self):
+        pulls = simulate_pulls(0.001, 0.02, 90, 5000, seed=3)
+        original = montecarlo.CYCLE_BATCH_SIZE
+        montecarlo.CYCLE_BATCH_SIZE = 777
+        try:
+            self.assertTrue(
+                (simulate_pulls(0.001, 0.02, 90, 5000, seed=3) == pulls).all())
+        finally:
+            montecarlo.CYCLE_BATCH_SIZE = original
+
+    def test_rare_target_memory_is_bounded(self):
+        # a non-featured SSR holding 0.5% of the rarity, 200 cycles per
+        # simulation or 32MB of cycle lengths if drawn at once
+        original = montecarlo.CYCLE_BATCH_SIZE
+        montecarlo.CYCLE_BATCH_SIZE = 100000
+        tracemalloc.start()
+        try:
+            simulate_pulls(0.0001, 0.02, 90, 20000, seed=1)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            montecarlo.CYCLE_BATCH_SIZE = original
+        self.assertLess(peak, 8 * 1024 * 1024)
+
+    def test_process_pool_matches_size(self):
+        pulls = run_simulations(0.01, 0.03, 90, 1001, seed=2, processes=2)
+        self.assertEqual(pulls.size, 1001)
+
+    def test_summary_percentiles_and_spend(self):
+        summary = summarize(simulate_pulls(0.03, 0.03, 90, 10000, seed=1),
+                            pull_cost=160)
+        self.assertEqual(summary['sims'], 10000)
+        self.assertLessEqual(summary['percentiles']['99'], 90)
+        self.assertEqual(summary['spend']['percentiles']['50'],
+                         summary['percentiles']['50'] * 160)
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
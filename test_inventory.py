@@ -0,0 +1,61 @@
+import unittest
+
+from benchmarks.catalog import create_bench_app, seed_catalog
+from database.database import db
+from database.inventory import Inventory, PullHistory, record_pull
+from database.pagination import keyset_page
+
+# ----------------------------------------------------------------------------#
+# Setup
+# ----------------------------------------------------------------------------#
+
+
+class InventoryTestCase(unittest.TestCase):
+    """This class represents the inventory and pull history test case"""
+
+    def setUp(self):
+        self.app = create_bench_app()
+        self.context = self.app.app_context()
+        self.context.push()
+        seed_catalog(cards=20)
+
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+
+    def counts(self, sub):
+        return {row.card: row.count for row in Inventory.info_query(sub)}
+
+    # ------------------------------------------------------------------------#
+    # Tests
+    # ------------------------------------------------------------------------#
+
+    def test_pulls_add_up_in_inventory(self):
+        record_pull('auth0|a', 1, [3, 3, 5])
+        record_pull('auth0|a', 1, [5, 7])
+        record_pull('auth0|b', 2, [3])
+        self.assertEqual(self.counts('auth0|a'), {3: 2, 5: 2, 7: 1})
+        self.assertEqual(self.counts('auth0|b'), {3: 1})
+
+    def test_every_drawn_card_is_logged(self):
+        record_pull('auth0|a', 1, [3, 3, 5])
+        record_pull('auth0|a', 2, [7])
+        history = PullHistory.query.filter(
+            PullHistory.sub == 'auth0|a').order_by(PullHistory.id).all()
+        self.assertEqual([(row.banner, row.card) for row in history],
+                         [(1, 3), (1, 3), (1, 5), (2, 7)])
+
+    def test_inventory_pages(self):
+        record_pull('auth0|a', 1, list(range(1, 11)))
+        rows, cursor = keyset_page(
+            Inventory.info_query('auth0|a'), Inventory.card, None, 4)
+        self.assertEqual([row.card for row in rows], [1, 2, 3, 4])
+        rows, cursor = keyset_page(
+            Inventory.info_query('auth0|a'), Inventory.card, cursor, 10)
+        self.assertEqual([row.card for row in rows], list(range(5, 11)))
+        self.assertIsNone(cursor)
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from app import APP
+from benchmarks.load import compare, percentile, run, summarize
+from benchmarks.routes import build_routes
+
+# ----------------------------------------------------------------------------#
+# Setup
+# ----------------------------------------------------------------------------#
+
+
+class LoadTestCase(unittest.TestCase):
+    """This class represents the load test suite test case"""
+
+    def results(self, rps, p95_ms):
+        return {'modes': {'client': {'GET /cards': {
+            'rps': rps, 'p95_ms': p95_ms}}}}
+
+    # ------------------------------------------------------------------------#
+    # Tests
+    # ------------------------------------------------------------------------#
+
+    def test_percentiles(self):
+        latencies = [i / 1000.0 for i in range(1, 101)]
+        self.assertEqual(percentile(latencies, 50), 0.05)
+        self.assertEqual(percentile(latencies, 99), 0.099)
+        stats = summarize(latencies, 2.0, 1)
+        self.assertEqual(stats['rps'], 50.0)
+        self.assertEqual(stats['p95_ms'], 95.0)
+        self.assertEqual(stats['errors'], 1)
+
+    def test_compare_flags_regressions(self):
+        baseline = self.results(500.0, 10.0)
+        self.assertEqual(compare(self.results(450.0, 11.0), baseline), [])
+        self.assertEqual(compare(self.results(300.0, 10.0), baseline), [
+            ('client', 'GET /cards', 'rps', 500.0, 300.0)])
+        self.assertEqual(compare(self.results(500.0, 15.0), baseline), [
+            ('client', 'GET /cards', 'p95_ms', 10.0, 15.0)])
+        # latency changes of a few milliseconds are noise
+        self.assertEqual(compare(self.results(500.0, 2.5),
+                                 self.results(500.0, 1.0)), [])
+
+    def test_routes_cover_app(self):
+        adapter = APP.url_map.bind('localhost')
+        covered = set()
+        for route in build_routes(10, 10, 10):
+            path = route.path(0).format(ids=1).split('?')[0]
+            covered.add(adapter.match(path, route.method)[0])
+        endpoints = {rule.endpoint for rule in APP.url_map.iter_rules()
+                     if rule.endpoint != 'static'}
+        self.assertEqual(endpoints - covered, set())
+
+    def test_client_run(self):
+        with redirect_stdout(io.StringIO()):
+            results = run(characters=5, skills=5, cards=50, requests=3,
+                          warmup=1, mode='client')
+        routes = results['modes']['client']
+        self.assertEqual(len(routes), len(build_routes(5, 5, 50)))
+        for name, stats in routes.items():
+            self.assertEqual(stats['errors'], 0, name)
+            self.assertEqual(stats['requests'], 3)
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
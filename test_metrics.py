@@ -0,0 +1,109 @@
+import threading
+import unittest
+
+from flask import Flask, jsonify
+
+from metrics.instrument import init_app, timed
+from metrics.registry import Registry, registry
+
+# ----------------------------------------------------------------------------#
+# Setup
+# ----------------------------------------------------------------------------#
+
+
+class MetricsTestCase(unittest.TestCase):
+    """This class represents the metrics registry and request
+    instrumentation test case"""
+
+    def setUp(self):
+        self.registry = Registry()
+        self.registry.counter('jobs_total', 'Jobs run.', ['queue'])
+        self.registry.histogram('job_seconds', 'Job time.', (), (0.1, 1.0))
+
+    def lines(self, registry):
+        return [line for line in registry.render().splitlines()
+                if not line.startswith('#')]
+
+    # ------------------------------------------------------------------------#
+    # Tests
+    # ------------------------------------------------------------------------#
+
+    def test_render_counter_and_histogram(self):
+        self.registry.inc('jobs_total', ('default',))
+        self.registry.inc('jobs_total', ('default',), 2)
+        for value in (0.05, 0.5, 5):
+            self.registry.observe('job_seconds', (), value)
+        self.assertEqual(self.lines(self.registry), [
+            'jobs_total{queue="default"} 3',
+            'job_seconds_bucket{le="0.1"} 1',
+            'job_seconds_bucket{le="1.0"} 2',
+            'job_seconds_bucket{le="+Inf"} 3',
+            'job_seconds_sum 5.55',
+            'job_seconds_count 3'
+        ])
+
+    def test_threads_are_summed(self):
+        def work():
+            for _ in range(1000):
+                self.registry.inc('jobs_total', ('default',))
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.registry.collect()[
+            ('jobs_total', ('default',))], 4000)
+
+    def test_exited_threads_are_retired(self):
+        def work():
+            self.registry.inc('jobs_total', ('default',))
+            self.registry.observe('job_seconds', (), 0.5)
+
+        # a thread per request, as werkzeug and waitress serve
+        for _ in range(50):
+            threads = [threading.Thread(target=work) for _ in range(10)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertLessEqual(len(self.registry._shards), 10)
+        totals = self.registry.collect()
+        self.assertEqual(len(self.registry._shards), 0)
+        self.assertEqual(totals[('jobs_total', ('default',))], 500)
+        self.assertEqual(totals[('job_seconds', ())], [[0, 500, 0], 250.0])
+
+    def test_timed(self):
+        registry.clear()
+        with timed('auth_duration_seconds', ('total',)):
+            pass
+        counts, total = registry.collect()[
+            ('auth_duration_seconds', ('total',))]
+        self.assertEqual(sum(counts), 1)
+        self.assertGreaterEqual(total, 0)
+
+    def test_request_metrics(self):
+        app = Flask(__name__)
+        init_app(app)
+
+        @app.route('/ping')
+        def ping():
+            return jsonify({'pong': True})
+
+        registry.clear()
+        client = app.test_client()
+        client.get('/ping')
+        client.get('/missing')
+        totals = registry.collect()
+        self.assertEqual(
+            totals[('http_requests_total', ('ping', '200'))], 1)
+        self.assertEqual(
+            totals[('http_requests_total', ('unmatched', '404'))], 1)
+        counts, total = totals[('serialization_duration_seconds', ('ping',))]
+        self.assertEqual(sum(counts), 1)
+        self.assertGreater(total, 0)
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
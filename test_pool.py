@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import create_engine, exc
+
+from database.pool import InstrumentedQueuePool, engine_options, \
+    pool_metrics
+
+# ----------------------------------------------------------------------------#
+# Setup
+# ----------------------------------------------------------------------------#
+
+
+class PoolTestCase(unittest.TestCase):
+    """This class represents the connection pool configuration and metrics
+    test case"""
+
+    def setUp(self):
+        pool_metrics.reset()
+        handle, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        self.engine = create_engine(
+            'sqlite:///' + self.path, poolclass=InstrumentedQueuePool,
+            pool_size=1, max_overflow=1, pool_timeout=0.05)
+
+    def tearDown(self):
+        self.engine.dispose()
+        os.remove(self.path)
+
+    # ------------------------------------------------------------------------#
+    # Tests
+    # ------------------------------------------------------------------------#
+
+    def test_engine_options_from_environment(self):
+        options = engine_options('postgresql://db/capstone_db', {
+            'DB_POOL_SIZE': '20',
+            'DB_MAX_OVERFLOW': '0',
+            'DB_POOL_PRE_PING': '0',
+            'DB_POOL_RECYCLE': '300',
+            'DB_STATEMENT_TIMEOUT_MS': '5000'
+        })
+        self.assertEqual(options['pool_size'], 20)
+        self.assertEqual(options['max_overflow'], 0)
+        self.assertFalse(options['pool_pre_ping'])
+        self.assertEqual(options['pool_recycle'], 300)
+        self.assertEqual(options['connect_args'],
+                         {'options': '-c statement_timeout=5000'})
+
+    def test_engine_options_defaults(self):
+        options = engine_options('postgresql://db/capstone_db', {})
+        self.assertEqual(options['pool_size'], 5)
+        self.assertTrue(options['pool_pre_ping'])
+        self.assertNotIn('connect_args', options)
+        self.assertEqual(engine_options('sqlite://', {}), {})
+
+    def test_checkouts_and_overflow(self):
+        first = self.engine.connect()
+        second = self.engine.connect()
+        stats = pool_metrics.stats(self.engine.pool)
+        self.assertEqual(stats['checkouts'], 2)
+        self.assertEqual(stats['checked_out'], 2)
+        self.assertEqual(stats['overflow'], 1)
+        self.assertEqual(stats['max_overflow_used'], 1)
+        first.close()
+        second.close()
+        stats = pool_metrics.stats(self.engine.pool)
+        self.assertEqual(stats['checkins'], 2)
+        self.assertEqual(stats['checked_out'], 0)
+
+    def test_timeout_when_exhausted(self):
+        connections = [self.engine.connect(), self.engine.connect()]
+        with self.assertRaises(exc.TimeoutError):
+            self.engine.connect()
+        self.assertEqual(pool_metrics.stats()['timeouts'], 1)
+        for connection in connections:
+            connection.close()
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
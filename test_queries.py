@@ -0,0 +1,78 @@
+import unittest
+
+from flask import jsonify
+
+from benchmarks.catalog import create_bench_app, seed_catalog
+from database.character import Character
+from metrics import queries
+from metrics.instrument import init_app
+from metrics.queries import QueryBudgetExceeded, query_budget
+
+# ----------------------------------------------------------------------------#
+# Setup
+# ----------------------------------------------------------------------------#
+
+
+class QueriesTestCase(unittest.TestCase):
+    """This class represents the statement budget and slow query log test
+    case"""
+
+    def setUp(self):
+        self.app = create_bench_app()
+        init_app(self.app)
+        with self.app.app_context():
+            seed_catalog(characters=3, skills=1, cards=3)
+
+        @self.app.route('/characters')
+        @query_budget(1)
+        def characters():
+            return jsonify([c.name for c in Character.query.all()])
+
+        @self.app.route('/characters/lazy')
+        @query_budget(1)
+        def lazy_characters():
+            # one statement per row, the pattern the budgets catch
+            return jsonify([Character.query.get(i).name for i in (1, 2, 3)])
+
+        self.client = self.app.test_client()
+        self.slow_query_seconds = queries.SLOW_QUERY_SECONDS
+
+    def tearDown(self):
+        queries.SLOW_QUERY_SECONDS = self.slow_query_seconds
+
+    # ------------------------------------------------------------------------#
+    # Tests
+    # ------------------------------------------------------------------------#
+
+    def test_query_headers(self):
+        self.app.testing = True
+        res = self.client.get('/characters')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.headers['X-Query-Count'], '1')
+        self.assertGreaterEqual(float(res.headers['X-DB-Time-Ms']), 0)
+
+    def test_budget_exceeded_fails_in_testing(self):
+        self.app.testing = True
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get('/characters/lazy')
+
+    def test_budget_exceeded_logged_in_production(self):
+        with self.assertLogs('metrics.queries', 'WARNING') as logs:
+            res = self.client.get('/characters/lazy')
+        self.assertEqual(res.status_code, 200)
+        self.assertNotIn('X-Query-Count', res.headers)
+        self.assertIn('over its budget of 1', logs.output[0])
+
+    def test_slow_query_logged_with_plan(self):
+        queries.SLOW_QUERY_SECONDS = 1e-9
+        with self.assertLogs('metrics.queries', 'WARNING') as logs:
+            self.client.get('/characters')
+        self.assertIn('in characters', logs.output[0])
+        self.assertIn('FROM "Character"', logs.output[0])
+        # EXPLAIN QUERY PLAN of SQLite
+        self.assertIn('SCAN', logs.output[0])
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,358 @@
+import os
+import tempfile
+import unittest
+
+import app
+from app import APP, pull_pools, search_indexes
+from auth import auth
+from auth.jwks import JWKSCache
+from benchmarks.routes import seed_load_catalog
+from benchmarks.tokens import CONTRIBUTOR_PERMISSIONS, make_key, \
+    mint_token, write_jwks
+from database.cache import CatalogCache, MemoryBackend, catalog_cache
+from database.card import Card
+from database.database import db, setup_db
+
+# ----------------------------------------------------------------------------#
+# Setup
+# ----------------------------------------------------------------------------#
+
+SUB = 'auth0|routes'
+
+
+class RouteTestCase(unittest.TestCase):
+    """Base test case running app.py on a seeded SQLite catalog, with
+    tokens signed by a stub key set"""
+
+    @classmethod
+    def setUpClass(cls):
+        pem, jwk = make_key('routes')
+        fd, cls.jwks_path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        write_jwks(cls.jwks_path, [jwk])
+        cls.token = mint_token(pem, 'routes', CONTRIBUTOR_PERMISSIONS,
+                               sub=SUB)
+
+    @classmethod
+    def tearDownClass(cls):
+        os.remove(cls.jwks_path)
+
+    def setUp(self):
+        fd, self.database_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        setup_db(APP, 'sqlite:///' + self.database_path)
+        with APP.app_context():
+            db.create_all()
+            seed_load_catalog(characters=5, skills=5, cards=20, sub=SUB)
+            db.session.remove()
+        for cache in (catalog_cache, pull_pools, search_indexes):
+            cache.clear()
+        self.original_jwks_cache = auth.jwks_cache
+        auth.jwks_cache = JWKSCache(self.jwks_path)
+        self.client = APP.test_client()
+
+    def tearDown(self):
+        auth.jwks_cache = self.original_jwks_cache
+        with APP.app_context():
+            db.session.remove()
+            db.engine.dispose()
+        os.remove(self.database_path)
+
+    def request(self, method, path, **kwargs):
+        headers = {'Authorization': 'Bearer ' + self.token}
+        return self.client.open(path, method=method, headers=headers,
+                                **kwargs)
+
+    def get(self, path):
+        return self.request('GET', path)
+
+
+class PaginationTestCase(RouteTestCase):
+    """This class represents the keyset pagination cursor test case"""
+
+    # ------------------------------------------------------------------------#
+    # Tests
+    # ------------------------------------------------------------------------#
+
+    def test_next_cursor_continues_the_list(self):
+        res = self.get('/characters?limit=2')
+        data = res.get_json()
+        self.assertEqual([c['id'] for c in data['character']], [1, 2])
+        res = self.get(
+            '/characters?limit=2&after={}'.format(data['next_cursor']))
+        self.assertEqual([c['id'] for c in res.get_json()['character']],
+                         [3, 4])
+
+    def test_malformed_cursor(self):
+        for path in ('/characters', '/cards', '/skills', '/me/inventory'):
+            res = self.get(path + '?after=garbage')
+            self.assertEqual(res.status_code, 400, path)
+            self.assertEqual(res.get_json()['error'], 400)
+            self.assertFalse(res.get_json()['success'])
+
+    def test_fractional_score_filter(self):
+        res = self.get('/cards?score_min=1.5&score_max=1e9')
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.get_json()['card'])
+        self.assertEqual(self.get('/cards?score_min=nan').status_code, 422)
+
+    def test_malformed_limit(self):
+        for path in ('/characters', '/cards', '/skills', '/me/inventory'):
+            for limit in ('abc', '1.5', '0'):
+                res = self.get('{}?limit={}'.format(path, limit))
+                self.assertEqual(res.status_code, 422, path)
+
+    def test_malformed_sorted_cursor(self):
+        for query in ('sort=name&after=garbage',
+                      'sort=stat_3:desc&after=high:12',
+                      'sort=score&after=1.5:first'):
+            res = self.get('/cards?' + query)
+            self.assertEqual(res.status_code, 400, query)
+
+    def test_sorted_cursor_continues_the_list(self):
+        res = self.get('/cards?sort=stat_3:desc&limit=5')
+        data = res.get_json()
+        res = self.get('/cards?sort=stat_3:desc&limit=5&after={}'.format(
+            data['next_cursor']))
+        self.assertEqual(res.status_code, 200)
+        first, second = data['card'], res.get_json()['card']
+        self.assertGreaterEqual(first[-1]['stat_3'], second[0]['stat_3'])
+        self.assertFalse({c['id'] for c in first} & {c['id'] for c in second})
+
+
+class CatalogCacheTestCase(RouteTestCase):
+    """This class represents the read, write and re-read test case of the
+    cached catalog endpoints"""
+
+    def assertName(self, path, name, expanded=None):
+        res = self.get(path)
+        self.assertEqual(res.status_code, 200, path)
+        # the json key is the singular of the collection
+        entity = res.get_json()[path.split('/')[1][:-1]][0]
+        if expanded is not None:
+            entity = entity[expanded]
+        self.assertEqual(entity['name'], name, path)
+
+    def assertNotFound(self, *paths):
+        for path in paths:
+            self.assertEqual(self.get(path).status_code, 404, path)
+
+    # ------------------------------------------------------------------------#
+    # Tests
+    # ------------------------------------------------------------------------#
+
+    def test_patch_character(self):
+        self.assertName('/characters/1', 'Character 0')
+        self.assertName('/cards/1?expand=character', 'Character 0',
+                        'character')
+        res = self.request('PATCH', '/characters/1', json={'name': 'Izumi'})
+        self.assertEqual(res.status_code, 200)
+        self.assertName('/characters/1', 'Izumi')
+        self.assertName('/cards/1?expand=character', 'Izumi', 'character')
+
+    def test_delete_character(self):
+        paths = ('/characters/2', '/cards/2', '/cards/7',
+                 '/cards/2?expand=character')
+        for path in paths:
+            self.assertEqual(self.get(path).status_code, 200, path)
+        self.assertEqual(
+            self.request('DELETE', '/characters/2').status_code, 200)
+        self.assertNotFound(*paths)
+
+    def test_patch_skill(self):
+        self.assertName('/skills/1', 'Skill 0')
+        self.assertName('/cards/1?expand=skill', 'Skill 0', 'skill')
+        res = self.request('PATCH', '/skills/1', json={'name': 'Kirari'})
+        self.assertEqual(res.status_code, 200)
+        self.assertName('/skills/1', 'Kirari')
+        self.assertName('/cards/1?expand=skill', 'Kirari', 'skill')
+
+    def test_delete_skill(self):
+        paths = ('/skills/3', '/cards/3', '/cards/8', '/cards/3?expand=skill')
+        for path in paths:
+            self.assertEqual(self.get(path).status_code, 200, path)
+        self.assertEqual(self.request('DELETE', '/skills/3').status_code, 200)
+        self.assertNotFound(*paths)
+
+    def test_patch_and_delete_card(self):
+        self.assertName('/cards/4', 'Card 3')
+        res = self.request('PATCH', '/cards/4', json={'name': 'Kirari'})
+        self.assertEqual(res.status_code, 200)
+        self.assertName('/cards/4', 'Kirari')
+        self.assertEqual(self.request('DELETE', '/cards/4').status_code, 200)
+        self.assertNotFound('/cards/4', '/cards/4?expand=character')
+
+    def test_bulk_writes(self):
+        self.assertName('/cards/5', 'Card 4')
+        self.assertName('/cards/10', 'Card 9')
+        res = self.request('PATCH', '/cards/bulk?ids=5',
+                           json={'name': 'Kirari'})
+        self.assertEqual(res.status_code, 200)
+        self.assertName('/cards/5', 'Kirari')
+        res = self.request('DELETE', '/characters/bulk?ids=5')
+        self.assertEqual(res.status_code, 200)
+        self.assertNotFound('/characters/5', '/cards/5', '/cards/10')
+
+
+class CardStatsTestCase(RouteTestCase):
+    """This class represents the stats and derived values test case of the
+    card write endpoints"""
+
+    def assertDerived(self, card_id):
+        # total_stats is stored but not part of card.info()
+        with APP.app_context():
+            card = Card.query.get(card_id)
+            stats = [card.stat_1, card.stat_2, card.stat_3, card.stat_4]
+            self.assertEqual(card.total_stats, sum(stats))
+            db.session.remove()
+        return stats
+
+    # ------------------------------------------------------------------------#
+    # Tests
+    # ------------------------------------------------------------------------#
+
+    def test_patch_numeric_string_stat(self):
+        res = self.request('PATCH', '/cards/1', json={'stat_1': '41'})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.get_json()['card'][0]['stat_1'], 41)
+        self.assertEqual(self.assertDerived(1)[0], 41)
+
+    def test_patch_non_integer_stat(self):
+        stat_1 = self.get('/cards/1').get_json()['card'][0]['stat_1']
+        for value in ('abc', True, 1.9, '1.9'):
+            res = self.request('PATCH', '/cards/1', json={'stat_1': value})
+            self.assertEqual(res.status_code, 422, value)
+        self.assertEqual(
+            self.get('/cards/1').get_json()['card'][0]['stat_1'], stat_1)
+
+    def test_post_non_integer_stat_like_bulk(self):
+        card = {'name': 'Kirari', 'character': 1, 'skill': 1,
+                'rarity': 'SSR', 'stat_1': 10, 'stat_2': 20, 'stat_3': 30,
+                'stat_4': 40}
+        for value in (True, 1.9):
+            item = dict(card, stat_2=value)
+            self.assertEqual(self.request(
+                'POST', '/cards', json=item).status_code, 422, value)
+            self.assertEqual(self.request(
+                'POST', '/cards/bulk', json=[item]).status_code, 422, value)
+
+    def test_post_numeric_string_stats(self):
+        res = self.request('POST', '/cards', json={
+            'name': 'Kirari', 'character': 1, 'skill': 1, 'rarity': 'SSR',
+            'stat_1': '10', 'stat_2': 20, 'stat_3': '30', 'stat_4': 40})
+        self.assertEqual(res.status_code, 200)
+        card = res.get_json()['card'][0]
+        self.assertEqual(self.assertDerived(card['id']), [10, 20, 30, 40])
+
+
+class PullTestCase(RouteTestCase):
+    """This class represents the banner pull query parameters test case"""
+
+    def inventory_total(self):
+        res = self.get('/me/inventory?limit=500')
+        return sum(item['count'] for item in res.get_json()['inventory'])
+
+    # ------------------------------------------------------------------------#
+    # Tests
+    # ------------------------------------------------------------------------#
+
+    def test_pull_count(self):
+        total = self.inventory_total()
+        res = self.request('POST', '/banners/1/pull?count=3')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.get_json()['card']), 3)
+        self.assertEqual(self.inventory_total(), total + 3)
+
+    def test_malformed_pull_count(self):
+        total = self.inventory_total()
+        for count in ('abc', '1.5', '0'):
+            res = self.request('POST', '/banners/1/pull?count=' + count)
+            self.assertEqual(res.status_code, 422, count)
+        # nothing was drawn or recorded
+        self.assertEqual(self.inventory_total(), total)
+
+
+class AnalysisTestCase(RouteTestCase):
+    """This class represents the banner analysis query parameters test
+    case"""
+
+    # ------------------------------------------------------------------------#
+    # Tests
+    # ------------------------------------------------------------------------#
+
+    def test_analysis(self):
+        res = self.get('/banners/1/analysis?rarity=SSR&pity=90&sims=1000'
+                       '&cost=160&seed=1')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.get_json()['analysis']['sims'], 1000)
+
+    def test_malformed_analysis_parameters(self):
+        for query in ('card=abc', 'rarity=SSR&pity=abc',
+                      'rarity=SSR&sims=abc', 'rarity=SSR&sims=1.5',
+                      'rarity=SSR&cost=abc', 'rarity=SSR&cost=nan',
+                      'rarity=SSR&seed=abc'):
+            res = self.get('/banners/1/analysis?' + query)
+            self.assertEqual(res.status_code, 422, query)
+
+
+class ConditionalTestCase(RouteTestCase):
+    """This class represents the ETag test case across gunicorn workers,
+    each with its own in-memory catalog cache"""
+
+    def setUp(self):
+        super().setUp()
+        self.original_catalog_cache = app.catalog_cache
+
+    def tearDown(self):
+        app.catalog_cache = self.original_catalog_cache
+        super().tearDown()
+
+    def worker(self):
+        app.catalog_cache = CatalogCache(MemoryBackend())
+
+    def conditional_get(self, path, etag):
+        headers = {'Authorization': 'Bearer ' + self.token,
+                   'If-None-Match': etag}
+        return self.client.get(path, headers=headers)
+
+    # ------------------------------------------------------------------------#
+    # Tests
+    # ------------------------------------------------------------------------#
+
+    def test_deleting_a_featured_card_changes_banner_etag(self):
+        paths = ('/banners/1', '/banners')
+        featured = self.get('/banners/1').get_json()['banner'][0]['featured']
+        self.assertTrue(featured)
+        etags = [self.get(path).headers['ETag'].strip('"') for path in paths]
+
+        # the delete also removes the card from the featured cards
+        res = self.request('DELETE', '/cards/{}'.format(featured[0]))
+        self.assertEqual(res.status_code, 200)
+        for path, etag in zip(paths, etags):
+            res = self.conditional_get(path, etag)
+            self.assertEqual(res.status_code, 200, path)
+            self.assertEqual(res.get_json()['banner'][0]['featured'], [])
+
+    def test_write_in_another_worker_changes_etag(self):
+        for path, write in (('/cards/1', '/cards/1'), ('/cards', '/cards/2'),
+                            ('/characters/1', '/characters/1')):
+            self.worker()
+            res = self.get(path)
+            etag = res.headers['ETag'].strip('"')
+            self.assertEqual(
+                self.conditional_get(path, etag).status_code, 304, path)
+
+            # another worker takes the write
+            self.worker()
+            res = self.request('PATCH', write, json={'name': 'Izumi'})
+            self.assertEqual(res.status_code, 200)
+            self.worker()
+            res = self.conditional_get(path, etag)
+            self.assertEqual(res.status_code, 200, path)
+            self.assertNotEqual(res.headers['ETag'].strip('"'), etag)
+            self.assertIn(b'Izumi', res.data)
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+
+from flask import jsonify
+
+from benchmarks.catalog import create_bench_app
+from database.cache import MemoryBackend
+from database.card import Card
+from database.database import db
+from database.routing import replica_router
+
+# ----------------------------------------------------------------------------#
+# Setup
+# ----------------------------------------------------------------------------#
+
+
+class RoutingTestCase(unittest.TestCase):
+    """This class represents the read replica routing test case, with a
+    primary and replicas in separate SQLite files, so a row written to one
+    database is not seen by the others"""
+
+    def setUp(self):
+        self.paths = []
+        for _ in range(3):
+            handle, path = tempfile.mkstemp(suffix='.db')
+            os.close(handle)
+            self.paths.append(path)
+        primary, *replicas = ['sqlite:///' + path for path in self.paths]
+        self.app = create_bench_app(primary)
+        replica_router.configure(replicas)
+        replica_router.backend = MemoryBackend()
+        with self.app.app_context():
+            for engine in replica_router.engines:
+                db.metadata.create_all(engine)
+
+        @self.app.route('/cards', methods=['GET'])
+        def count_cards():
+            return jsonify({'count': Card.query.count()})
+
+        @self.app.route('/cards', methods=['POST'])
+        def create_card():
+            Card(name='Kirari', rarity='SSR', stat_1=1, stat_2=1, stat_3=1,
+                 stat_4=1).insert()
+            return jsonify({'success': True})
+
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        replica_router.backend = None
+        replica_router.configure(())
+        for path in self.paths:
+            os.remove(path)
+
+    def count(self, token='a'):
+        res = self.client.get('/cards', headers={'Authorization': token})
+        return res.get_json()['count']
+
+    # ------------------------------------------------------------------------#
+    # Tests
+    # ------------------------------------------------------------------------#
+
+    def test_reads_go_to_replicas_and_writes_to_primary(self):
+        self.client.post('/cards', headers={'Authorization': 'a'})
+        # another client reads a replica, which has not replicated it
+        self.assertEqual(self.count('b'), 0)
+        with self.app.app_context():
+            self.assertEqual(Card.query.count(), 1)
+
+    def test_read_your_writes(self):
+        self.client.post('/cards', headers={'Authorization': 'a'})
+        self.assertEqual(self.count('a'), 1)
+        self.assertEqual(replica_router.stats()['sticky_reads'], 1)
+        replica_router.sticky_seconds = 0
+        self.assertEqual(self.count('a'), 0)
+
+    def test_round_robin(self):
+        replica_router.engines[0].execute(Card.__table__.insert().values(
+            name='Rika', rarity='SR', stat_1=1, stat_2=1, stat_3=1,
+            stat_4=1))
+        self.assertEqual([self.count() for _ in range(4)], [1, 0, 1, 0])
+        self.assertEqual([replica['routed'] for replica in
+                          replica_router.stats()['replicas']], [2, 2])
+
+    def test_least_connections(self):
+        replica_router.configure(
+            [str(engine.url) for engine in replica_router.engines],
+            policy='least-connections')
+        first = replica_router.acquire()
+        second = replica_router.acquire()
+        self.assertNotEqual(first, second)
+        replica_router.release(first)
+        self.assertEqual(replica_router.acquire(), first)
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+from benchmarks.catalog import create_bench_app, seed_catalog
+from database.character import Character
+from database.database import db
+from database.search import NgramIndex, normalize, sql_search
+from database.skill import Skill
+
+# ----------------------------------------------------------------------------#
+# Setup
+# ----------------------------------------------------------------------------#
+
+
+class SearchTestCase(unittest.TestCase):
+    """This class represents the search test case"""
+
+    def setUp(self):
+        self.app = create_bench_app()
+        self.context = self.app.app_context()
+        self.context.push()
+        seed_catalog(cards=50)
+        db.session.add(Character(name='Kirari Moroboshi',
+                                 class_type='Passion'))
+        db.session.add(Character(name='Kirari', class_type='Passion'))
+        db.session.add(Skill(name='Happy Beam',
+                             description='Kirari makes everyone happy'))
+        db.session.commit()
+        self.index = NgramIndex.build()
+
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+
+    def search(self, q, limit=20):
+        return [(result['type'], result['name'])
+                for result in self.index.search(normalize(q), limit)]
+
+    # ------------------------------------------------------------------------#
+    # Tests
+    # ------------------------------------------------------------------------#
+
+    def test_ranks_exact_prefix_then_description(self):
+        self.assertEqual(self.search('KIRARI'), [
+            ('character', 'Kirari'),
+            ('character', 'Kirari Moroboshi'),
+            ('skill', 'Happy Beam')
+        ])
+
+    def test_partial_and_short_queries(self):
+        self.assertEqual(self.search('robo'),
+                         [('character', 'Kirari Moroboshi')])
+        self.assertEqual(len(self.search('ca', limit=5)), 5)
+        self.assertEqual(self.search('no such name'), [])
+
+    def test_matches_sql_search(self):
+        for q in ('kirari', 'card 4', 'ard', 'skill', 'ha', 's', '%'):
+            self.assertEqual(self.index.search(normalize(q), 20),
+                             sql_search(normalize(q), 20))
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
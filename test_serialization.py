@@ -0,0 +1,65 @@
+import unittest
+
+from benchmarks.catalog import create_bench_app, seed_catalog
+from database.database import db
+from database.card import Card
+from database.character import Character
+from database.inventory import Inventory
+from database.skill import Skill
+
+# ----------------------------------------------------------------------------#
+# Setup
+# ----------------------------------------------------------------------------#
+
+
+class SerializationTestCase(unittest.TestCase):
+    """This class represents the column-projected serializers test case"""
+
+    def setUp(self):
+        self.app = create_bench_app()
+        self.context = self.app.app_context()
+        self.context.push()
+        seed_catalog(characters=5, skills=5, cards=20)
+        db.session.add_all([Inventory(sub='auth0|test', card=card, count=2)
+                            for card in (3, 7, 11)])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+
+    def assertRowsMatch(self, query, from_row, load):
+        rows = query.all()
+        self.assertTrue(rows)
+        for row in rows:
+            representation = from_row(row)
+            self.assertEqual(representation, load(representation))
+
+    # ------------------------------------------------------------------------#
+    # Tests
+    # ------------------------------------------------------------------------#
+
+    def test_character_profile_from_row(self):
+        self.assertRowsMatch(
+            Character.profile_query(), Character.profile_from_row,
+            lambda c: Character.query.get(c['id']).profile())
+
+    def test_skill_info_from_row(self):
+        self.assertRowsMatch(
+            Skill.info_query(), Skill.info_from_row,
+            lambda s: Skill.query.get(s['id']).info())
+
+    def test_card_info_from_row(self):
+        self.assertRowsMatch(
+            Card.info_query(), Card.info_from_row,
+            lambda c: Card.query.get(c['id']).info())
+
+    def test_inventory_info_from_row(self):
+        self.assertRowsMatch(
+            Inventory.info_query('auth0|test'), Inventory.info_from_row,
+            lambda i: Inventory.query.get(('auth0|test', i['card'])).info())
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()